@@ -21,6 +21,9 @@ import re
 import subprocess
 import sys
 import contextlib
+import functools
+import lzma
+import zlib
 from pipes import quote
 
 from devlib.collector import (CollectorBase, CollectorOutput,
@@ -47,6 +50,15 @@ DEFAULT_EVENTS = [
 ]
 TIMEOUT = 180
 
+# Compressors that can be used on the target to speed up the transfer of the
+# trace, in order of preference, along with the matching streaming
+# decompressor on the host.
+TRANSFER_DECOMPRESSORS = {
+    'gzip': lambda: zlib.decompressobj(16 + zlib.MAX_WBITS),
+    'xz': lzma.LZMADecompressor,
+}
+TRANSFER_CHUNK_SIZE = 1024 * 1024
+
 # Regexps for parsing of function profiling data
 CPU_RE = re.compile(r'  Function \(CPU([0-9]+)\)')
 STATS_RE = re.compile(r'([^ ]*) +([0-9]+) +([0-9.]+) us +([0-9.]+) us +([0-9.]+) us')
@@ -70,6 +82,7 @@ class FtraceCollector(CollectorBase):
                  report_on_target=False,
                  trace_clock='local',
                  saved_cmdlines_nr=4096,
+                 transfer_compression=None,
                  ):
         super(FtraceCollector, self).__init__(target)
         self.events = events if events is not None else DEFAULT_EVENTS
@@ -96,8 +109,13 @@ class FtraceCollector(CollectorBase):
         self.function_string = None
         self.trace_clock = trace_clock
         self.saved_cmdlines_nr = saved_cmdlines_nr
+        self.transfer_compression = transfer_compression
         self._reset_needed = True
 
+        if transfer_compression not in (None, 'auto', *TRANSFER_DECOMPRESSORS):
+            raise ValueError('Unsupported transfer compression "{}". Supported: {}'.format(
+                transfer_compression, ', '.join(['auto', *TRANSFER_DECOMPRESSORS])))
+
         # pylint: disable=bad-whitespace
         # Setup tracing paths
         self.available_events_file    = self.target.path.join(self.tracing_path, 'available_events')
@@ -222,6 +240,41 @@ class FtraceCollector(CollectorBase):
         """
         return self.target.read_value(self.available_functions_file).splitlines()
 
+    @property
+    @memoized
+    def transfer_compressor(self):
+        """
+        Tuple of the name of the compressor used to transfer the trace and of
+        the target command to run it, or ``None`` if the trace is transferred
+        uncompressed.
+        """
+        if self.transfer_compression is None:
+            return None
+        elif self.transfer_compression == 'auto':
+            names = list(TRANSFER_DECOMPRESSORS)
+        else:
+            names = [self.transfer_compression]
+
+        for name in names:
+            cmds = [name]
+            if self.target.busybox:
+                cmds.append('{} {}'.format(quote(self.target.busybox), name))
+
+            for cmd in cmds:
+                try:
+                    self.target.execute('{} -c </dev/null >/dev/null'.format(cmd))
+                except TargetStableError:
+                    continue
+                else:
+                    return (name, cmd)
+
+        message = 'No compressor available on the target among: {}'.format(', '.join(names))
+        if self.strict:
+            raise TargetStableError(message)
+        else:
+            self.logger.warning(message + ', the trace will be transferred uncompressed')
+            return None
+
     def reset(self):
         if self.buffer_size:
             self._set_buffer_size()
@@ -312,15 +365,21 @@ class FtraceCollector(CollectorBase):
     def get_data(self):
         if self.output_path is None:
             raise RuntimeError("Output path was not set.")
-        self.target.execute('{0} extract -o {1}; chmod 666 {1}'.format(self.target_binary,
-                                                                       self.target_output_file),
-                            timeout=TIMEOUT, as_root=True)
 
         # The size of trace.dat will depend on how long trace-cmd was running.
         # Therefore timout for the pull command must also be adjusted
         # accordingly.
         pull_timeout = 10 * (self.stop_time - self.start_time)
-        self.target.pull(self.target_output_file, self.output_path, timeout=pull_timeout)
+
+        compressor = self.transfer_compressor
+        if compressor is None:
+            self.target.execute('{0} extract -o {1}; chmod 666 {1}'.format(self.target_binary,
+                                                                           self.target_output_file),
+                                timeout=TIMEOUT, as_root=True)
+            self.target.pull(self.target_output_file, self.output_path, timeout=pull_timeout)
+        else:
+            self._get_compressed_data(compressor, timeout=TIMEOUT + pull_timeout)
+
         output = CollectorOutput()
         if not os.path.isfile(self.output_path):
             self.logger.warning('Binary trace not pulled from device.')
@@ -339,6 +398,43 @@ class FtraceCollector(CollectorBase):
                 self.view(self.output_path)
         return output
 
+    def _get_compressed_data(self, compressor, timeout):
+        name, compress_cmd = compressor
+        decompressor = TRANSFER_DECOMPRESSORS[name]()
+
+        # Extract and compress in a single command, and stream the result so
+        # it is decompressed on the host while being transferred instead of
+        # storing the compressed trace on either side.
+        command = '{binary} extract -o {output} >&2 && chmod 666 {output} && {compress} -c {output}'.format(
+            binary=self.target_binary,
+            output=quote(self.target_output_file),
+            compress=compress_cmd,
+        )
+        self.logger.debug('Transferring trace compressed with {}'.format(name))
+
+        try:
+            with self.target.background(command, as_root=True, timeout=timeout) as bg:
+                with open(self.output_path, 'wb') as f:
+                    read = functools.partial(bg.stdout.read, TRANSFER_CHUNK_SIZE)
+                    for chunk in iter(read, b''):
+                        f.write(decompressor.decompress(chunk))
+
+                # trace-cmd only writes a few lines on stderr, so it cannot
+                # block on it while we are reading stdout
+                error = bg.stderr.read()
+                if isinstance(error, bytes):
+                    error = error.decode('utf-8', 'replace')
+                ret = bg.wait()
+
+            if ret:
+                raise TargetStableError('Could not extract the trace (exit code {}): {}'.format(ret, error))
+            if not decompressor.eof:
+                raise TargetStableError('Truncated trace received from the target')
+        except BaseException:
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(self.output_path)
+            raise
+
     def get_stats(self, outfile):
         if not (self.functions and self.tracer is None):
             return
@@ -136,6 +136,7 @@ class LocalConnection(ConnectionBase):
 
         popen = subprocess.Popen(
             command,
+            stdin=subprocess.PIPE,
             stdout=stdout,
             stderr=stderr,
             shell=True,
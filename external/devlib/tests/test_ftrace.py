@@ -0,0 +1,105 @@
+import logging
+import os
+import shutil
+import stat
+import tempfile
+from unittest import TestCase
+
+from devlib import LocalLinuxTarget
+from devlib.collector.ftrace import FtraceCollector, TRANSFER_CHUNK_SIZE
+from devlib.exception import TargetStableError
+
+
+FAKE_TRACE_CMD = """#!/bin/sh
+# Fake "trace-cmd extract -o <file>" copying a pre-made trace
+[ "$1" = extract ] && [ "$2" = -o ] || exit 1
+{exit}
+cp {trace} "$3"
+"""
+
+# transfer_compressor is memoized based on id(), so keep the collectors alive
+# to avoid a new collector getting the cached value of a dead one
+_COLLECTORS = []
+
+
+class TestFtraceTransfer(TestCase):
+
+    def setUp(self):
+        self.target = LocalLinuxTarget(connection_settings={'unrooted': True})
+        if not self.target.is_rooted:
+            self.skipTest('Requires running as root')
+
+        self.tempdir = tempfile.mkdtemp(prefix='devlib-test-')
+        # Spans several transfer chunks
+        self.data = os.urandom(TRANSFER_CHUNK_SIZE) * 3 + b'end'
+        self.trace = os.path.join(self.tempdir, 'trace.in.dat')
+        with open(self.trace, 'wb') as f:
+            f.write(self.data)
+
+    def tearDown(self):
+        shutil.rmtree(self.tempdir, ignore_errors=True)
+
+    def _make_collector(self, transfer_compression, fail=False):
+        binary = os.path.join(self.tempdir, 'trace-cmd')
+        with open(binary, 'w') as f:
+            f.write(FAKE_TRACE_CMD.format(
+                exit='exit 42' if fail else '',
+                trace=self.trace,
+            ))
+        os.chmod(binary, os.stat(binary).st_mode | stat.S_IXUSR)
+
+        # Skip __init__() as it installs trace-cmd and requires ftrace
+        collector = FtraceCollector.__new__(FtraceCollector)
+        _COLLECTORS.append(collector)
+        collector.target = self.target
+        collector.logger = logging.getLogger('ftrace')
+        collector.strict = False
+        collector.autoreport = False
+        collector.autoview = False
+        collector.start_time = 0
+        collector.stop_time = 1
+        collector.target_binary = binary
+        collector.target_output_file = os.path.join(self.tempdir, 'trace.target.dat')
+        collector.output_path = os.path.join(self.tempdir, 'trace.dat')
+        collector.transfer_compression = transfer_compression
+        return collector
+
+    def _get_output(self, collector):
+        with open(collector.output_path, 'rb') as f:
+            return f.read()
+
+    def test_compressed_transfer(self):
+        for name in ('gzip', 'xz'):
+            with self.subTest(compression=name):
+                collector = self._make_collector(name)
+                self.assertEqual(collector.transfer_compressor[0], name)
+                collector.get_data()
+                self.assertEqual(self._get_output(collector), self.data)
+
+    def test_compressed_transfer_error(self):
+        collector = self._make_collector('gzip', fail=True)
+        with self.assertRaises(TargetStableError):
+            collector.get_data()
+        self.assertFalse(os.path.exists(collector.output_path))
+
+    def test_uncompressed_transfer(self):
+        collector = self._make_collector(None)
+        self.assertIsNone(collector.transfer_compressor)
+        collector.get_data()
+        self.assertEqual(self._get_output(collector), self.data)
+
+    def test_missing_compressor_fallback(self):
+        collector = self._make_collector('xz')
+        # Hide the compressors from the target
+        collector.target.execute = _fail_compressor_check(collector.target.execute)
+        self.assertIsNone(collector.transfer_compressor)
+        collector.get_data()
+        self.assertEqual(self._get_output(collector), self.data)
+
+
+def _fail_compressor_check(execute):
+    def wrapper(command, *args, **kwargs):
+        if command.endswith('-c </dev/null >/dev/null'):
+            raise TargetStableError('command not found')
+        return execute(command, *args, **kwargs)
+    return wrapper
@@ -710,7 +710,9 @@ class TraceAnalysisBase(AnalysisHelpers):
         in the trace cache.
 
         This will write the dataframe to the swap as well, so processing can be
-        skipped completely when possible.
+        skipped completely when possible. If the trace has a
+        :class:`lisa.trace.SharedTraceCache`, the result is also shared with
+        other traces having the same content.
         """
         sig = inspect.signature(f)
         ignored_kwargs = {
@@ -745,12 +747,12 @@ class TraceAnalysisBase(AnalysisHelpers):
             cache = trace._cache
             write_swap = trace._write_swap
             try:
-                df = cache.fetch(pd_desc)
+                df = cache.fetch(pd_desc, shared=True)
             except KeyError:
                 with measure_time() as measure:
                     df = f(**kwargs)
                 compute_cost = measure.exclusive_delta
-                cache.insert(pd_desc, df, compute_cost=compute_cost, write_swap=write_swap)
+                cache.insert(pd_desc, df, compute_cost=compute_cost, write_swap=write_swap, write_shared=True)
 
             return df
 
@@ -18,19 +18,15 @@
 """ Functions Analysis Module """
 import json
 import os
-from operator import itemgetter, attrgetter
 from statistics import mean
-from functools import reduce
-from itertools import chain
 from copy import copy
-from collections.abc import Mapping
 from enum import IntEnum
 
 import pandas as pd
 from pandas.api.types import is_numeric_dtype
 import numpy as np
 
-from lisa.utils import groupby, memoized, FrozenDict, unzip_into
+from lisa.utils import groupby, FrozenDict
 from lisa.datautils import df_merge
 from lisa.analysis.base import TraceAnalysisBase, AnalysisHelpers
 from lisa.analysis.load_tracking import LoadTrackingAnalysis
@@ -75,6 +71,8 @@ class FunctionsAnalysis(TraceAnalysisBase):
             intervals, which are then used to infer the name. This is suited to
             resolve an instruction pointer that could point anywhere inside of
             a function (but before the starting address of the next function).
+            In that case, the names are resolved with a binary search in a
+            sorted index of the symbols, and ``name_col`` is categorical.
         :type exact: bool
         """
         trace = self.trace
@@ -86,38 +84,64 @@ class FunctionsAnalysis(TraceAnalysisBase):
             df[name_col] = df[addr_col]
             return df
 
-        if addr_map is None:
-            addr_map = trace.plat_info['kernel']['symbols-address']
-
         if exact:
+            if addr_map is None:
+                addr_map = trace.plat_info['kernel']['symbols-address']
             df[name_col] = df[addr_col].map(addr_map)
         # Not exact means the function addresses will be used as ranges, so
         # we can find in which function any instruction point value is
         else:
-            # Sort by address, so that each consecutive pair of address
-            # constitue a range of address belonging to a given function.
-            addr_list = sorted(
-                addr_map.items(),
-                key=itemgetter(0)
-            )
-            bins, labels = zip(*addr_list)
-            # "close" the last bucket with the highest value possible of that column
-            max_addr = np.iinfo(df[addr_col].dtype).max
-            bins = list(bins) + [max_addr]
-            name_i = pd.cut(
-                df[addr_col],
-                bins=bins,
-                # Since our labels are not unique, we cannot pass it here
-                # directly. Instead, use an index into the labels list
-                labels=range(len(labels)),
-                # Include the left boundary and exclude the right one
-                include_lowest=True,
-                right=False,
-            )
-            df[name_col] = name_i.apply(lambda x: labels[x])
+            if addr_map is None:
+                index = self._df_ksym_index()
+            else:
+                index = self._make_ksym_index(addr_map)
+
+            addresses = index['address'].to_numpy()
+            names = index['name'].array
+            # Each consecutive pair of address constitue a range of address
+            # belonging to a given function, including the left boundary and
+            # excluding the right one.
+            i = np.searchsorted(
+                addresses,
+                df[addr_col].to_numpy(dtype=addresses.dtype),
+                side='right',
+            ) - 1
+            # Addresses lower than the first symbol cannot be resolved
+            if len(addresses):
+                codes = np.where(i >= 0, names.codes[i], -1)
+            else:
+                codes = np.full(len(i), -1)
+            df[name_col] = pd.Categorical.from_codes(codes, dtype=names.dtype)
 
         return df
 
+    @TraceAnalysisBase.cache
+    def _df_ksym_index(self):
+        """
+        Index of the kernel symbols of the
+        :class:`lisa.platforms.platinfo.PlatformInfo` attached to the trace, as
+        built by :meth:`_make_ksym_index`.
+
+        It is cached in the trace swap area, so it is only built once for a
+        given trace.
+        """
+        addr_map = self.trace.plat_info['kernel']['symbols-address']
+        return self._make_ksym_index(addr_map)
+
+    @staticmethod
+    def _make_ksym_index(addr_map):
+        """
+        Make a dataframe of kernel symbols sorted by address, with an
+        ``address`` and a categorical ``name`` column.
+        """
+        addresses = np.fromiter(addr_map.keys(), dtype=np.uint64, count=len(addr_map))
+        names = np.array(list(addr_map.values()), dtype=object)
+        order = np.argsort(addresses, kind='stable')
+        return pd.DataFrame(dict(
+            address=addresses[order],
+            name=pd.Categorical(names[order]),
+        ))
+
     def _df_with_ksym(self, event, *args, **kwargs):
         df = self.trace.df_event(event)
         try:
@@ -245,29 +269,30 @@ class FunctionsAnalysis(TraceAnalysisBase):
             tag_df=tag_df,
             thread_root_functions=thread_root_functions,
         )
-        metrics = _CallGraphNode._METRICS
+        calls = graph.calls
+        metrics = _CallGraph._METRICS
 
-        def get_metric(node, metric):
-            val = node[metric]
+        def get_metric(metric):
+            val = calls[metric]
             if normalize:
-                return (node.cpu_capacity / PELT_SCALE) * val
+                return (calls['capacity'] / PELT_SCALE) * val
             else:
                 return val
 
-        return pd.DataFrame.from_records(
-            (
-                (
-                    node.entry_time, node.cpu, node.func_name, FrozenDict(node.tags), node.tagged_name,
-                    *(
-                        get_metric(node, metric)
-                        for metric in metrics
-                    )
-                )
-                for node in graph.all_nodes
+        df = pd.DataFrame(
+            dict(
+                Time=calls['entry_time'],
+                cpu=calls['cpu'],
+                function=calls['func_name'],
+                tags=calls['tags'],
+                tagged_name=calls['tagged_name'],
+                **{
+                    metric: get_metric(metric)
+                    for metric in metrics
+                }
             ),
-            columns=['Time', 'cpu', 'function', 'tags', 'tagged_name'] + metrics,
-            index='Time',
         )
+        return df.set_index('Time')
 
     def compare_with_traces(self, others, normalize=True, **kwargs):
         """
@@ -374,7 +399,7 @@ class FunctionsAnalysis(TraceAnalysisBase):
         if ref_function:
             ref_tags = ref_tags or {}
             ref_group = {
-                'f': _CallGraphNode.format_name(ref_function, ref_tags)
+                'f': _CallGraph.format_name(ref_function, ref_tags)
             }
         else:
             ref_group = None
@@ -383,7 +408,7 @@ class FunctionsAnalysis(TraceAnalysisBase):
 
     @staticmethod
     def _profile_stats_from_df(df, metric='self_time', functions=None, per_cpu=True, cpus=None, tags=None, **kwargs):
-        metrics = _CallGraphNode._METRICS
+        metrics = _CallGraph._METRICS
         # Get rid of the other value columns to avoid treating them as
         # tags
         other_metrics = set(metrics) - {metric}
@@ -428,6 +453,13 @@ class FunctionsAnalysis(TraceAnalysisBase):
 
 
 class _CallGraph:
+    """
+    Array-based call graph, with one row per function call in :attr:`nodes`.
+
+    :param nodes: Dataframe of function calls, as built by :meth:`from_df`.
+    :type nodes: pandas.DataFrame
+    """
+
     class _EVENT(IntEnum):
         """
         To be used as events for the dataframe passed to
@@ -448,15 +480,51 @@ class _CallGraph:
         :attr:`lisa.pelt.PELT_SCALE`.
         """
 
-    def __init__(self, cpu_nodes):
-        self.cpu_nodes = cpu_nodes
+    class _STATE(IntEnum):
+        """
+        State of a call in the call graph.
+        """
+        REPORTED = 0
+        """Call reported as a child of its ``owner``"""
+        INLINED = 1
+        """
+        Call that is part of a recursive chain of its ``owner``, and therefore
+        inlined in it.
+        """
+        PREEMPTING = 2
+        """
+        Call from another logical thread, preempting its ``owner``.
+        """
+        UNREACHABLE = 3
+        """Call nested inside a :attr:`PREEMPTING` call."""
+
+    _METRICS = sorted((
+        'cum_time',
+        'self_time',
+    ))
+
+    _NO_TAGS = FrozenDict({})
+
+    def __init__(self, nodes):
+        self.nodes = nodes
 
     @property
-    def all_nodes(self):
-        return chain.from_iterable(
-            node.indirect_children
-            for node in self.cpu_nodes.values()
+    def calls(self):
+        """
+        Dataframe of the reported calls, in depth-first order.
+        """
+        nodes = self.nodes
+        return nodes[nodes['state'] == self._STATE.REPORTED]
+
+    @staticmethod
+    def format_name(func_name, tags):
+        tags = tags or {}
+        tags = ', '.join(
+            f'{tag}={"|".join(map(str, vals))}'
+            for tag, vals in sorted(tags.items())
         )
+        tags = f' ({tags})' if tags else ''
+        return f'{func_name}{tags}'
 
     @classmethod
     def from_df(cls, df, thread_root_functions=None, ts_cols=('calltime', 'rettime')):
@@ -481,309 +549,329 @@ class _CallGraph:
             entry and exit. If they are provided, they will be used instead of
             the index.
         :type ts_cols: tuple(str) or None
+
+        The resulting :attr:`nodes` dataframe has one row per call, in
+        depth-first order for each CPU, with the following columns:
+
+            * ``cpu``: CPU the function was called on.
+            * ``func_name``: Name of the function.
+            * ``depth``: Depth of the call in the call stack, starting at 1.
+            * ``parent``: Row number of the caller, or ``-1``.
+            * ``owner``: Row number of the call that the call is reported
+              under. It is the ``parent`` unless recursive calls have been
+              inlined. ``-1`` for the root of the CPU.
+            * ``state``: One of :class:`_CallGraph._STATE`.
+            * ``entry_time``, ``exit_time``: Entry and exit timestamps.
+            * ``capacity``: CPU capacity when entering the function.
+            * ``self_time``, ``cum_time``: Time spent in the function itself,
+              and including its reported children.
+            * ``tags``: Tags of reported calls.
+            * ``tagged_name``: Function name formatted with its tags.
         """
         thread_root_functions = set(thread_root_functions) if thread_root_functions else set()
 
-        def make_visitor():
-            _max_thread = -1
-            def make_thread():
-                nonlocal _max_thread
-                _max_thread += 1
-                return _max_thread
-
-            root_node = _CallGraphNode(
-                func_name=None,
-                parent=None,
-                cpu=None,
-                cpu_capacity=None,
-                logical_thread=make_thread(),
+        nodes_list = []
+        offset = 0
+        for cpu, subdf in df.groupby('__cpu', observed=True):
+            nodes = cls._from_cpu_df(
+                subdf,
+                cpu=cpu,
+                thread_root_functions=thread_root_functions,
+                ts_cols=ts_cols,
             )
-            curr_node = root_node
-            # This is expected to be overriden right away by a SET_CAPACITY
-            # event
-            curr_capacity = PELT_SCALE
-            event_enum = cls._EVENT
-
-            def visit(row):
-                nonlocal curr_node, curr_capacity
-                curr_event = row['event']
-
-                if curr_event == event_enum.ENTRY:
-                    func_name = row['func_name']
-                    cpu = row['__cpu']
-
-                    # If we got preempted by a function that is considered to
-                    # be part of different logical thread (e.g. the toplevel
-                    # function of an ISR), create a new ID
-                    if func_name in thread_root_functions:
-                        logical_thread = make_thread()
-                    # Otherwise, just inherit it from the parent
-                    else:
-                        logical_thread = curr_node.logical_thread
-
-                    child = _CallGraphNode(
-                        func_name=func_name,
-                        cpu=cpu,
-                        parent=curr_node,
-                        cpu_capacity=curr_capacity,
-                        entry_time=row.name,
-                        logical_thread=logical_thread,
-                    )
-                    curr_node._children.append(child)
-                    curr_node = child
-
-                elif curr_event == event_enum.EXIT:
-                    # We are trying to exit the root, which is probably the sign of
-                    # a missing entry event (could have been cropped out of the
-                    # trace). We therefore just ignore it.
-                    if curr_node is not root_node:
-                        # That node is unusable for stats, since the function
-                        # used to enter the call is not the same one as for the
-                        # exit. This usually means that the kernel returned to
-                        # userspace in between.
-                        if row['func_name'] != curr_node.func_name:
-                            curr_node.valid_metrics = False
-
-                        if ts_cols is None:
-                            curr_node.exit_time = row.name
-                        else:
-                            entry_ts, exit_ts = ts_cols
-                            curr_node.entry_time = row[entry_ts] * 1e-9
-                            curr_node.exit_time = row[exit_ts] * 1e-9
-
-                        curr_node = curr_node.parent
-
-                elif curr_event == event_enum.SET_TAG:
-                    tags = row['tags']
-                    curr_node.set_tags(tags)
-                elif curr_event == event_enum.SET_CAPACITY:
-                    curr_capacity = row['capacity']
-                else:
-                    raise ValueError(f'Unknown event "{curr_event}"')
-
-            def finalize(df):
-                # Fixup the exit time if there were missing exit events
-                if curr_node is not root_node:
-                    last_time = df.index[-1]
-                    for node in chain([curr_node], curr_node.parents):
-                        node.exit_time = last_time
-                        node.valid_metrics = False
-
-                root_children = root_node.children
-                if root_children:
-                    root_node.entry_time = min(map(attrgetter('entry_time'), root_children))
-                    root_node.exit_time = max(map(attrgetter('exit_time'), root_children))
-                else:
-                    root_node.entry_time = 0
-                    root_node.exit_time = 0
-
-            return (root_node, visit, finalize)
+            # Turn row numbers into global ones
+            for col in ('parent', 'owner'):
+                nodes[col] = np.where(nodes[col] >= 0, nodes[col] + offset, -1)
+            offset += len(nodes)
+            nodes_list.append(nodes)
+
+        if nodes_list:
+            nodes = pd.concat(nodes_list, ignore_index=True)
+        else:
+            nodes = cls._make_nodes_df(cpu=0, nodes={})
 
-        def build_graph(subdf):
-            root_node, visitor, finalizer = make_visitor()
-            subdf.apply(visitor, axis=1)
-            finalizer(subdf)
-            return root_node
+        return cls(nodes)
 
-        return cls(
-            cpu_nodes = {
-                cpu: build_graph(subdf)
-                for cpu, subdf in df.groupby('__cpu', observed=True)
-            }
+    @classmethod
+    def _make_nodes_df(cls, cpu, nodes):
+        cols = (
+            'func_name', 'depth', 'parent', 'owner', 'state', 'entry_time',
+            'exit_time', 'capacity', 'self_time', 'cum_time', 'tags',
+            'tagged_name',
         )
+        df = pd.DataFrame({
+            col: nodes.get(col, [])
+            for col in cols
+        })
+        df.insert(0, 'cpu', cpu)
+        return df
 
+    @classmethod
+    def _from_cpu_df(cls, df, cpu, thread_root_functions, ts_cols):
+        event_enum = cls._EVENT
+        state_enum = cls._STATE
+
+        events = df['event'].to_numpy()
+        time = df.index.to_numpy()
+        func = df['func_name'].to_numpy()
+        nr_events = len(events)
+
+        is_entry = events == event_enum.ENTRY
+        is_exit = events == event_enum.EXIT
+        step = is_entry.astype(np.int64) - is_exit
+
+        # Depth of the call stack after each event. Exiting from the root is
+        # probably the sign of a missing entry event (could have been cropped
+        # out of the trace), so these exits are ignored, which amounts to
+        # clamping the depth to 0.
+        depth = np.cumsum(step)
+        depth -= np.minimum(np.minimum.accumulate(depth), 0)
+        prev_depth = np.concatenate(([0], depth[:-1]))
+        is_exit &= prev_depth > 0
+
+        entry_pos = np.flatnonzero(is_entry)
+        exit_pos = np.flatnonzero(is_exit)
+        nr_nodes = len(entry_pos)
+        if not nr_nodes:
+            return cls._make_nodes_df(cpu=cpu, nodes={})
+
+        # The root of the call graph is represented by an extra node at the
+        # end of all the per-node arrays
+        root = nr_nodes
+        node_depth = depth[entry_pos]
+
+        # Encode (depth, event position) pairs as a single integer, so that
+        # looking up the closest event at a given depth is a binary search.
+        stride = nr_events + 1
+        entry_keys = node_depth * stride + entry_pos
+        exit_keys = np.sort(prev_depth[exit_pos] * stride + exit_pos)
+
+        # The exit of a call is the first exit event at the same depth
+        # following its entry.
+        exit_i = np.searchsorted(exit_keys, entry_keys)
+        exit_keys = np.append(exit_keys, -1)[exit_i]
+        closed = (exit_keys // stride) == node_depth
+        node_exit_pos = np.where(closed, exit_keys % stride, nr_events - 1)
+
+        # The parent of a call is the last entry event one level up.
+        sorted_entry_keys = np.sort(entry_keys)
+        parent_i = np.searchsorted(sorted_entry_keys, entry_keys - stride) - 1
+        parent_keys = sorted_entry_keys[parent_i]
+        parent = np.where(
+            (parent_i >= 0) & (parent_keys // stride == node_depth - 1),
+            np.searchsorted(entry_pos, parent_keys % stride),
+            root,
+        )
+        parent = np.append(parent, root)
 
+        # Calls nested in a given call are the ones entered before its exit
+        last_nested = np.searchsorted(entry_pos, node_exit_pos, side='right') - 1
 
-class _CallGraphNode(Mapping):
-    """
-    Represent a function call extracted from some profiling information.
-    """
-    __slots__ = [
-        'func_name',
-        'cpu',
-        'cpu_capacity',
-        '_tags',
-        '_children',
-        'parent',
-        'logical_thread',
-        'entry_time',
-        'exit_time',
-        'valid_metrics',
-        '__weakref__',
-    ]
-
-    _METRICS = sorted((
-        'cum_time',
-        'self_time',
-    ))
-
-    def __init__(self, func_name, parent, logical_thread, cpu, cpu_capacity, entry_time=None, exit_time=None, valid_metrics=True):
-        self.func_name = func_name
-        self.cpu = cpu
-        self.cpu_capacity = cpu_capacity
-        self.parent = parent
-        self.logical_thread = logical_thread
-        self._children = []
-        self._tags = {}
-        self.entry_time = entry_time
-        self.exit_time = exit_time
-        self.valid_metrics = valid_metrics
-
-    def __hash__(self):
-        return id(self)
-
-    def __eq__(self, other):
-        return self is other
-
-    @property
-    @memoized
-    def _expanded_children(self):
-        def visit(node):
-            children = node._children
-
-            children_visit = map(visit, children)
-            is_recursive, children_expansion = unzip_into(2, children_visit)
-
-            # Check if we are part of any recursive chain
-            is_recursive = any(is_recursive) or node.func_name == self.func_name
-
-            # If we are part of a recursion chain, expand all of our children
-            # so that they are reparented into our caller
-            if is_recursive:
-                expansion = list(chain.from_iterable(children_expansion))
-            else:
-                expansion = [node]
-
-            return (is_recursive, expansion)
-
-        return visit(self)[1]
-
-    @property
-    @memoized
-    def children(self):
-        return [
-            child
-            for child in self._expanded_children
-            if not self._is_preempted_by(child)
-        ]
-
-    @property
-    def _preempting_children(self):
-        return {
-            child
-            for child in self._expanded_children
-            if self._is_preempted_by(child)
-        }
-
-    def _is_preempted_by(self, node):
-        return self.logical_thread != node.logical_thread
-
-    def _str(self, idt):
-        idt_str = idt * '    '
-
-        if self.children:
-            children = ':\n' + '\n'.join(child._str(idt + 1) for child in self.children)
+        if ts_cols is None:
+            entry_time = time[entry_pos]
+            exit_time = time[node_exit_pos]
         else:
-            children = ''
-
-        return f'{idt_str}{self.func_name}, self={self["self_time"]}s cum={self["cum_time"]}s tags={self.tags}{children}'
-
-    def __str__(self):
-        return self._str(0)
+            entry_ts, exit_ts = ts_cols
+            entry_time = np.where(
+                closed,
+                df[entry_ts].to_numpy()[node_exit_pos] * 1e-9,
+                time[entry_pos],
+            )
+            exit_time = np.where(
+                closed,
+                df[exit_ts].to_numpy()[node_exit_pos] * 1e-9,
+                time[-1],
+            )
 
-    @property
-    def tagged_name(self):
-        return self.format_name(self.func_name, self.tags)
+        func_name = func[entry_pos]
+        # Calls for which the function name changes between the entry and
+        # the exit are unusable for stats. This usually means that the kernel
+        # returned to userspace in between.
+        valid = closed & (func[node_exit_pos] == func_name)
 
-    @staticmethod
-    def format_name(func_name, tags):
-        tags = tags or {}
-        tags = ', '.join(
-            f'{tag}={"|".join(map(str, vals))}'
-            for tag, vals in sorted(tags.items())
+        try:
+            capacity = df['capacity']
+        except KeyError:
+            capacity = np.full(nr_nodes, PELT_SCALE)
+        else:
+            capacity = capacity.where(events == event_enum.SET_CAPACITY)
+            capacity = capacity.ffill().fillna(PELT_SCALE).to_numpy()[entry_pos]
+
+        func_code, _ = pd.factorize(func_name)
+        # Lookup table of (function, node) pairs, to check if a given function
+        # is called in a range of nodes.
+        func_keys = np.sort(
+            (func_code * (nr_nodes + 1) + np.arange(nr_nodes))[func_code >= 0]
         )
-        tags = f' ({tags})' if tags else ''
-        return f'{func_name}{tags}'
-
-    @memoized
-    def __getitem__(self, key):
-        if not self.valid_metrics:
-            return np.NaN
+        # The root never matches any function
+        func_code = np.append(func_code, -1)
+
+        def calls_func(func_code, first, last):
+            first = np.searchsorted(func_keys, func_code * (nr_nodes + 1) + first, side='left')
+            last = np.searchsorted(func_keys, func_code * (nr_nodes + 1) + last, side='right')
+            return last > first
+
+        is_thread_root = pd.Series(func_name).isin(thread_root_functions).to_numpy()
+
+        # Walk the graph level by level, from the root to the leaves
+        order = np.argsort(node_depth, kind='stable')
+        _, level_starts = np.unique(node_depth[order], return_index=True)
+        levels = np.split(order, level_starts[1:])
+
+        logical_thread = np.zeros(nr_nodes + 1, dtype=np.int64)
+        state = np.full(nr_nodes + 1, state_enum.REPORTED, dtype=np.int8)
+        owner = np.full(nr_nodes + 1, root)
+        for nodes in levels:
+            parents = parent[nodes]
+            # If we got preempted by a function that is considered to be part
+            # of different logical thread (e.g. the toplevel function of an
+            # ISR), create a new ID. Otherwise, just inherit it from the
+            # parent.
+            logical_thread[nodes] = np.where(
+                is_thread_root[nodes],
+                nodes + 1,
+                logical_thread[parents],
+            )
 
-        delta = self.exit_time - self.entry_time
+            parents_state = state[parents]
+            owners = np.where(parents_state == state_enum.REPORTED, parents, owner[parents])
+            owner[nodes] = owners
+
+            # Recursive calls are inlined in their caller, so that any call
+            # subtree containing a call to the owner's function is expanded
+            # and its children are reparented to the owner.
+            inlined = calls_func(func_code[owners], nodes, last_nested[nodes])
+
+            state[nodes] = np.select(
+                [
+                    parents_state >= state_enum.PREEMPTING,
+                    inlined,
+                    logical_thread[nodes] == logical_thread[owners],
+                ],
+                [
+                    state_enum.UNREACHABLE,
+                    state_enum.INLINED,
+                    state_enum.REPORTED,
+                ],
+                state_enum.PREEMPTING,
+            )
 
-        if key == 'self_time':
-            return delta - sum(
-                node.exit_time - node.entry_time
-                # Substract the time spent in all the children, including the
-                # ones that preempted us
-                for node in self._expanded_children
+        state = state[:-1]
+        owner = owner[:-1]
+        reported = state == state_enum.REPORTED
+
+        # Substract the time spent in all the children, including the ones
+        # that preempted us
+        delta = exit_time - entry_time
+        is_child = reported | (state == state_enum.PREEMPTING)
+        children_time = np.bincount(
+            owner[is_child],
+            weights=delta[is_child],
+            minlength=nr_nodes + 1,
+        )[:-1]
+        self_time = np.where(valid, delta - children_time, np.nan)
+
+        # Define cum_time in terms of self_time, so that preempting children
+        # are properly accounted for recurisvely
+        cum_time = np.append(self_time, 0)
+        for nodes in reversed(levels):
+            nodes = nodes[reported[nodes]]
+            np.add.at(cum_time, owner[nodes], cum_time[nodes])
+        cum_time = cum_time[:-1]
+
+        tags_pos = np.flatnonzero(events == event_enum.SET_TAG)
+        if len(tags_pos):
+            tags_depth = depth[tags_pos]
+            tagged_i = np.searchsorted(sorted_entry_keys, tags_depth * stride + tags_pos) - 1
+            tagged = np.where(
+                tags_depth > 0,
+                np.searchsorted(entry_pos, sorted_entry_keys[tagged_i] % stride),
+                root,
             )
-        elif key == 'cum_time':
-            # Define cum_time in terms of self_time, so that preempting
-            # children are properly accounted for recurisvely
-            return self['self_time'] + sum(
-                node['cum_time']
-                for node in self.children
+            tags = cls._get_tags(
+                tags=df['tags'].to_numpy()[tags_pos],
+                tagged=tagged,
+                root=root,
+                reported=reported,
+                owner=owner,
+                last_nested=last_nested,
             )
+            tagged_name = [
+                cls.format_name(name, _tags)
+                for name, _tags in zip(func_name, tags)
+            ]
         else:
-            raise KeyError(f'Unknown metric "{key}"')
-
-    def __iter__(self):
-        return iter(self._METRICS)
-
-    def __len__(self):
-        return len(self._METRICS)
-
-    @property
-    def _inherited_tags(self):
-        def merge_tags(tags1, tags2):
-            common_keys = tags1.keys() & tags2.keys()
-            new = {
-                tag: tags1[tag] | tags2[tag]
-                for tag in common_keys
-            }
-            for tags in (tags1, tags2):
-                new.update({
-                    tag: tags[tag]
-                    for tag in tags.keys() - common_keys
-                })
-            return new
-
-        # Since merge_tags() is commutative (merge_tags(a, b) == merge_tags(b,
-        # a)), we don't need any specific ordering on the parents
-        nodes = chain(self.parents, self.indirect_children)
-        tags = reduce(merge_tags, map(attrgetter('_tags'), nodes), {})
-
-        return tags
-
-    @property
-    @memoized
-    def tags(self):
-        return dict(
-            (key, frozenset(vals))
-            for key, vals in {
-                **self._inherited_tags,
-                **self._tags,
-            }.items()
+            tags = [cls._NO_TAGS] * nr_nodes
+            tagged_name = func_name
+
+        return cls._make_nodes_df(
+            cpu=cpu,
+            nodes=dict(
+                func_name=func_name,
+                depth=node_depth,
+                parent=np.where(parent[:-1] == root, -1, parent[:-1]),
+                owner=np.where(owner == root, -1, owner),
+                state=state,
+                entry_time=entry_time,
+                exit_time=exit_time,
+                capacity=capacity,
+                self_time=self_time,
+                cum_time=cum_time,
+                tags=tags,
+                tagged_name=tagged_name,
+            )
         )
 
-    @property
-    def parents(self):
-        parent = self.parent
-        if parent is not None:
-            yield parent
-            yield from parent.parents
+    @classmethod
+    def _get_tags(cls, tags, tagged, root, reported, owner, last_nested):
+        """
+        Compute the tags of reported calls. Tags are inherited from both
+        parents and reported children, and the tags of a call override the
+        inherited ones.
+        """
+        own_tags = {}
+        for node, _tags in zip(tagged, tags):
+            node_tags = own_tags.setdefault(node, {})
+            for tag, val in _tags.items():
+                node_tags.setdefault(tag, set()).add(val)
+
+        inherited_tags = {}
+        def inherit(node, _tags):
+            node_tags = inherited_tags.setdefault(node, {})
+            for tag, vals in _tags.items():
+                node_tags.setdefault(tag, set()).update(vals)
+
+        for node, _tags in own_tags.items():
+            # Nested calls
+            if node == root:
+                first, last = 0, root - 1
+            else:
+                first, last = node + 1, last_nested[node]
+
+            for nested in np.flatnonzero(reported[first:last + 1]):
+                inherit(first + nested, _tags)
+
+            # Reported parents
+            if node != root and reported[node]:
+                parent = owner[node]
+                while parent != root:
+                    inherit(parent, _tags)
+                    parent = owner[parent]
+
+        no_tags = cls._NO_TAGS
+        def make_tags(node):
+            if reported[node] and (node in inherited_tags or node in own_tags):
+                return FrozenDict({
+                    tag: frozenset(vals)
+                    for tag, vals in {
+                        **inherited_tags.get(node, {}),
+                        **own_tags.get(node, {}),
+                    }.items()
+                })
+            else:
+                return no_tags
 
-    @property
-    def indirect_children(self):
-        for child in self.children:
-            yield child
-            yield from child.indirect_children
-
-    def set_tags(self, tags):
-        for tag, val in tags.items():
-            self._tags.setdefault(tag, set()).add(val)
+        return [make_tags(node) for node in range(root)]
 
 
 class JSONStatsFunctionsAnalysis(AnalysisHelpers):
@@ -20,6 +20,7 @@ import glob
 from collections import namedtuple
 from operator import attrgetter
 
+import numpy as np
 import pandas as pd
 
 from lisa.analysis.base import AnalysisHelpers, TraceAnalysisBase
@@ -208,9 +209,79 @@ class RTAEventsAnalysis(TraceAnalysisBase):
     # rtapp_loop events related methods
     ###########################################################################
 
+    def _get_profile_phases(self, wlgen_profile):
+        """
+        Number the phases of all the tasks of ``wlgen_profile``.
+
+        :returns: A tuple ``(phases_df, task_map)`` where ``phases_df`` is
+            the dataframe returned by :meth:`df_rtapp_phases_properties` and
+            ``task_map`` maps each task name to a tuple ``(first_phase_id,
+            nr_phases, nr_json_phases)``.
+        """
+        def get_nr_json_phases(task_name, task):
+            # Build a JSON configuration so that we get the actual number
+            # of phases, after loopification at the task level
+            conf = RTAConf.from_profile(
+                {task_name: task},
+                plat_info=self.trace.plat_info
+            )
+            return len(conf['tasks'][task_name]['phases'])
+
+        def get_from_test(properties):
+            try:
+                return bool(properties['meta']['from_test'])
+            except (KeyError, TypeError):
+                return False
+
+        task_map = {}
+        records = []
+        for task_name, task in wlgen_profile.items():
+            phases = task.phases
+            task_map[task_name] = (
+                len(records),
+                len(phases),
+                get_nr_json_phases(task_name, task),
+            )
+            for phase in phases:
+                properties = dict(phase.properties)
+                records.append((
+                    task_name,
+                    phase.get('name'),
+                    get_from_test(properties),
+                    properties,
+                ))
+
+        phases_df = pd.DataFrame.from_records(
+            records,
+            columns=['task', 'phase', 'from_test', 'properties'],
+        )
+        phases_df['from_test'] = phases_df['from_test'].astype(bool)
+        phases_df.index.name = 'phase_id'
+        return (phases_df, task_map)
+
+    def df_rtapp_phases_properties(self, wlgen_profile):
+        """
+        Dataframe of the phases of a :mod:`lisa.wlgen.rta` profile, which can
+        be joined with the ``phase_id`` column of :meth:`df_rtapp_loop`.
+
+        :param wlgen_profile: Dictionary of rt-app task names to
+            :class:`~lisa.wlgen.rta.RTAPhase`.
+        :type wlgen_profile: dict(str, lisa.wlgen.rta.RTAPhase)
+
+        :returns: a :class:`pandas.DataFrame` indexed by ``phase_id`` with:
+
+          * A ``task``  column: the rt-app profile task name
+          * A ``phase`` column: the phase name
+          * A ``from_test`` column: the ``meta.from_test`` property of the
+            phase, ``False`` if not set
+          * A ``properties`` column: the properties mapping of the phase
+        """
+        phases_df, _ = self._get_profile_phases(wlgen_profile)
+        return phases_df
+
     # @TraceAnalysisBase.cache
     @requires_events('userspace@rtapp_loop')
-    def df_rtapp_loop(self, task=None, wlgen_profile=None):
+    def df_rtapp_loop(self, task=None, wlgen_profile=None, properties=True):
         """
         Dataframe of events generated by each rt-app generated task.
 
@@ -223,6 +294,11 @@ class RTAEventsAnalysis(TraceAnalysisBase):
             :class:`~lisa.wlgen.rta.RTAPhase` properties.
         :type wlgen_profile: dict(str, lisa.wlgen.rta.RTAPhase) or None
 
+        :param properties: If ``False``, the ``properties`` column is not
+            added. The properties can still be looked up in
+            :meth:`df_rtapp_phases_properties` using the ``phase_id`` column.
+        :type properties: bool
+
         :returns: a :class:`pandas.DataFrame` with:
 
           * A  ``__comm`` column: the actual rt-app trace task name
@@ -235,6 +311,15 @@ class RTAEventsAnalysis(TraceAnalysisBase):
           * A  ``phase_loop``  colum: the phase_loops's counter
           * A  ``thread_loop`` column: the thread_loop's counter
 
+        If ``wlgen_profile`` is given, the ``phase`` column contains the
+        phase name, and these columns are added:
+
+          * A ``phase_id`` column: index of the phase in
+            :meth:`df_rtapp_phases_properties`
+          * A ``from_test`` column: the ``meta.from_test`` property of the
+            phase
+          * A ``properties`` column, unless ``properties=False``
+
         The ``event`` column can report these events:
 
           * ``start``: the start of the ``__pid``:``__comm`` related event
@@ -245,55 +330,57 @@ class RTAEventsAnalysis(TraceAnalysisBase):
         df = self._task_filtered(df, task)
 
         if wlgen_profile:
-            def get_task_entry(task_name):
-                task = wlgen_profile[task_name]
-                # Build a JSON configuration so that we get the actual number
-                # of phases, after loopification at the task level
-                conf = RTAConf.from_profile(
-                    {task_name: task},
-                    plat_info=self.trace.plat_info
-                )
-                nr_json_phases = len(conf['tasks'][task_name]['phases'])
-                return (task, nr_json_phases)
+            phases_df, task_map = self._get_profile_phases(wlgen_profile)
 
             # Map TaskID to wlgen phases
             task_map = {
-                task_id: get_task_entry(task_name)
+                task_id: task_map[task_name]
                 for task_name, task_ids in RTA.resolve_trace_task_names(
                     self.trace, wlgen_profile.keys()
                 ).items()
                 for task_id in task_ids
             }
 
-            class _dict(dict):
-               def __missing__(self, key):
-                   raise ValueError(f'Unexpected phase number "{key}"')
-
-            def f(df):
-                pid, comm = df.name
-                task_id = TaskID(pid=pid, comm=comm)
-                task, nr_json_phases = task_map[task_id]
-                df = df.copy(deep=False)
-                phase_nr = df['thread_loop'] * nr_json_phases + df['phase']
-                def add_info(get):
-                    return phase_nr.map(_dict({
-                        i: get(phase)
-                        for i, phase in enumerate(task.phases)
-                    }))
-
-                df['phase'] = add_info(lambda phase: phase.get('name'))
-                df['properties'] = add_info(lambda phase: dict(phase.properties))
+            # Lookup the phases numbering of each task only once, and
+            # broadcast it to all the events of that task
+            grouped = df.groupby(['__pid', '__comm'], observed=True, sort=False)
+            codes = grouped.ngroup().to_numpy()
+            task_info = np.array(
+                [
+                    task_map[TaskID(pid=pid, comm=comm)]
+                    for pid, comm in grouped.size().index
+                ],
+                dtype='int64',
+            ).reshape(-1, 3)
+            first_phase_id, nr_phases, nr_json_phases = task_info[codes].T
+
+            phase_nr = (
+                df['thread_loop'].to_numpy(dtype='int64') * nr_json_phases +
+                df['phase'].to_numpy(dtype='int64')
+            )
+            invalid = phase_nr >= nr_phases
+            if invalid.any():
+                raise ValueError(f'Unexpected phase number "{phase_nr[invalid][0]}"')
 
-                return df
+            phase_id = first_phase_id + phase_nr
 
-            df = df.groupby(['__pid', '__comm'], observed=True).apply(f)
+            df = df.copy(deep=False)
+            df['phase'] = phases_df['phase'].to_numpy()[phase_id]
+            df['phase_id'] = phase_id
+            df['from_test'] = phases_df['from_test'].to_numpy()[phase_id]
+            if properties:
+                df['properties'] = phases_df['properties'].to_numpy()[phase_id]
 
         return df
 
     # @TraceAnalysisBase.cache
     @df_rtapp_loop.used_events
     def _get_rtapp_phases(self, event, task, wlgen_profile=None):
-        df = self.df_rtapp_loop(task, wlgen_profile=wlgen_profile)
+        df = self.df_rtapp_loop(
+            task,
+            wlgen_profile=wlgen_profile,
+            properties=False,
+        )
         df = df[df.event == event]
 
         # Sort START/END phase loop event from newers/older and...
@@ -310,8 +397,15 @@ class RTAEventsAnalysis(TraceAnalysisBase):
         )
         df = grouped.head(1)
 
+        # Only lookup the properties of the phases we kept
+        if wlgen_profile:
+            properties = self.df_rtapp_phases_properties(wlgen_profile)['properties']
+            df = df.copy(deep=False)
+            df['properties'] = properties.to_numpy()[df['phase_id'].to_numpy()]
+
         # Reorder the index and keep only required cols
-        kept_cols = ['__comm', '__pid', 'phase', 'properties']
+        index_cols = ['__comm', '__pid', 'phase']
+        kept_cols = index_cols + ['phase_id', 'from_test', 'properties']
         kept_cols = order_as(
             set(kept_cols) & set(df.columns),
             order_as=kept_cols
@@ -319,7 +413,7 @@ class RTAEventsAnalysis(TraceAnalysisBase):
         df = (
             df.sort_index()[kept_cols]
             .reset_index()
-            .set_index([col for col in kept_cols if col != 'properties'])
+            .set_index(index_cols)
         )
 
         return df
@@ -358,6 +452,11 @@ class RTAEventsAnalysis(TraceAnalysisBase):
 
             return df
 
+        if wlgen_profile:
+            properties = self.df_rtapp_phases_properties(wlgen_profile)['properties']
+        else:
+            properties = None
+
         def get_duration(phase, df):
 
             start = df.index[0]
@@ -369,15 +468,18 @@ class RTAEventsAnalysis(TraceAnalysisBase):
             }
             # The properties are the same all along for a given phase, so we
             # can just pick the first one
-            try:
-                properties = df.iloc[0]['properties']
-            except KeyError:
-                properties = {}
-            info['properties'] = properties
+            if properties is None:
+                info['properties'] = {}
+            else:
+                info['properties'] = properties.iloc[df['phase_id'].iloc[0]]
 
             return (start, info)
 
-        loops_df = self.df_rtapp_loop(task, wlgen_profile=wlgen_profile)
+        loops_df = self.df_rtapp_loop(
+            task,
+            wlgen_profile=wlgen_profile,
+            properties=False,
+        )
 
         phases_df_list = [
             (cols['phase'], filter_partial_loop(df))
@@ -442,6 +544,9 @@ class RTAEventsAnalysis(TraceAnalysisBase):
           * A  ``__pid``  column: the PID of the task
           * A  ``phase``  column: the phases counter for each ``__pid``:``__comm`` task
 
+        If ``wlgen_profile`` is given, the ``phase_id``, ``from_test`` and
+        ``properties`` columns of :meth:`df_rtapp_loop` are kept.
+
         The ``index`` represents the timestamp of a phase start event.
         """
         return self._get_rtapp_phases('start', task, wlgen_profile=wlgen_profile)
@@ -463,6 +568,9 @@ class RTAEventsAnalysis(TraceAnalysisBase):
           * A  ``__pid``  column: the PID of the task
           * A  ``phase``  column: the phases counter for each ``__pid``:``__comm`` task
 
+        If ``wlgen_profile`` is given, the ``phase_id``, ``from_test`` and
+        ``properties`` columns of :meth:`df_rtapp_loop` are kept.
+
         The ``index`` represents the timestamp of a phase end event.
         """
         return self._get_rtapp_phases('end', task, wlgen_profile=wlgen_profile)
@@ -17,6 +17,7 @@
 
 from enum import Enum
 import itertools
+import math
 
 import numpy as np
 import pandas as pd
@@ -265,25 +266,11 @@ class TasksAnalysis(TraceAnalysisBase):
 
     @requires_events('sched_switch', 'sched_wakeup')
     @may_use_events('sched_wakeup_new')
-    def _df_tasks_states(self, tasks=None, return_one_df=False):
+    def _df_tasks_events(self):
         """
-        Compute tasks states for all tasks.
-
-        :param tasks: If specified, states of these tasks only will be yielded.
-            The :class:`lisa.trace.TaskID` must have a ``pid`` field specified,
-            since the task state is per-PID.
-        :type tasks: list(lisa.trace.TaskID) or list(int)
-
-        :param return_one_df: If ``True``, a single dataframe is returned with
-            new extra columns. If ``False``, a generator is returned that
-            yields tuples of ``(TaskID, task_df)``. Each ``task_df`` contains
-            the new columns.
-        :type return_one_df: bool
+        Assemble the ``sched_switch`` and ``sched_wakeup`` events in a single
+        dataframe, with one row per task state update.
         """
-        ######################################################
-        # A) Assemble the sched_switch and sched_wakeup events
-        ######################################################
-
         def get_df(event):
             # Ignore the end of the window so we can properly compute the
             # durations
@@ -327,22 +314,43 @@ class TasksAnalysis(TraceAnalysisBase):
         df.sort_index(inplace=True)
         df.rename(columns={'__cpu': 'cpu'}, inplace=True)
 
+        return df
+
+    def _resolve_task_pid(self, task):
+        """
+        Get a TaskID for each task, and only update existing TaskID if
+        they lack a PID field, since that's what we care about for the task
+        states.
+        """
+        try:
+            do_update = task.pid is None
+        except AttributeError:
+            do_update = False
+
+        return self.trace.get_task_id(task, update=do_update)
+
+    @requires_events('sched_switch', 'sched_wakeup')
+    @may_use_events('sched_wakeup_new')
+    def _df_tasks_states(self, tasks=None, return_one_df=False):
+        """
+        Compute tasks states for all tasks.
+
+        :param tasks: If specified, states of these tasks only will be yielded.
+            The :class:`lisa.trace.TaskID` must have a ``pid`` field specified,
+            since the task state is per-PID.
+        :type tasks: list(lisa.trace.TaskID) or list(int)
+
+        :param return_one_df: If ``True``, a single dataframe is returned with
+            new extra columns. If ``False``, a generator is returned that
+            yields tuples of ``(TaskID, task_df)``. Each ``task_df`` contains
+            the new columns.
+        :type return_one_df: bool
+        """
+        df = self._df_tasks_events()
+
         # Restrict the set of data we will process to a given set of tasks
         if tasks is not None:
-            def resolve_task(task):
-                """
-                Get a TaskID for each task, and only update existing TaskID if
-                they lack a PID field, since that's what we care about in that
-                function.
-                """
-                try:
-                    do_update = task.pid is None
-                except AttributeError:
-                    do_update = False
-
-                return self.trace.get_task_id(task, update=do_update)
-
-            tasks = list(map(resolve_task, tasks))
+            tasks = list(map(self._resolve_task_pid, tasks))
             df = df_filter_task_ids(df, tasks)
 
         df = df_window(df, window=self.trace.window)
@@ -552,7 +560,98 @@ class TasksAnalysis(TraceAnalysisBase):
         return df
 
     @TraceAnalysisBase.cache
-    @df_task_states.used_events
+    @_df_tasks_states.used_events
+    def df_tasks_residency(self):
+        """
+        DataFrame of the time spent by all tasks in each state on each CPU
+
+        :returns: a :class:`pandas.DataFrame` with:
+
+          * A ``(pid, comm, cpu, curr_state)`` multi-index, with ``curr_state``
+            being a :class:`TaskState` value.
+          * A ``duration`` column (the time spent by the task in that state
+            on that CPU)
+
+        .. note:: Tasks are identified by both their PID and their name, so
+            the time spent by a PID after a rename is accounted separately.
+        """
+        df = self._df_tasks_events()
+        start, end = self.trace.window
+
+        # Lay out the rows of each task contiguously, in time order
+        codes = df.groupby(['pid', 'comm'], observed=True, sort=False).ngroup()
+        codes = codes.fillna(-1).to_numpy(dtype='int64')
+        order = np.argsort(codes, kind='stable')
+        order = order[codes[order] >= 0]
+        codes = codes[order]
+        df = df.iloc[order]
+
+        time = df.index.to_numpy()
+        same_task_as_next = np.append(codes[1:] == codes[:-1], False)
+        same_task_as_prev = np.append(False, same_task_as_next[:-1])
+        group_start = np.flatnonzero(~same_task_as_prev)
+        group_size = np.diff(np.append(group_start, len(codes)))
+
+        # Fit each task's timeline to the window, like df_refit_index() does.
+        # Clipping the time of the events before the window to its start
+        # makes them last for 0 seconds.
+        clipped_time = np.maximum(time, start)
+        delta = np.append(clipped_time[1:] - clipped_time[:-1], np.NaN)
+
+        # The last state of each task in the window lasts until the end of the
+        # window. If the task has several events at that timestamp, only the
+        # first one is accounted.
+        in_window = time <= end
+        last_time = np.maximum.reduceat(
+            np.where(in_window, time, -math.inf),
+            group_start,
+        )
+        last_time = np.repeat(last_time, group_size)
+        is_tail = time == last_time
+        is_first_tail = is_tail & ~(same_task_as_prev & np.append(False, is_tail[:-1]))
+
+        delta = np.where(same_task_as_next & in_window & ~is_tail, delta, np.NaN)
+        delta = np.where(
+            is_first_tail & (end > last_time),
+            end - clipped_time,
+            delta,
+        )
+
+        df = pd.DataFrame(
+            dict(
+                pid=df['pid'].to_numpy(),
+                comm=df['comm'].to_numpy(),
+                cpu=df['cpu'].to_numpy(),
+                curr_state=df['curr_state'].to_numpy(),
+                duration=delta,
+            )
+        )
+        return df.groupby(
+            ['pid', 'comm', 'cpu', 'curr_state'],
+            observed=True,
+            sort=False,
+        )[['duration']].sum()
+
+    def _df_tasks_active_residency(self):
+        """
+        Time spent by each task in :attr:`TaskState.TASK_ACTIVE` on each CPU,
+        with one row per ``(pid, comm)`` and one column per CPU.
+        """
+        df = self.df_tasks_residency()
+        active = df.index.get_level_values('curr_state') == TaskState.TASK_ACTIVE
+        df = df[active]['duration'].droplevel('curr_state').unstack('cpu')
+
+        # Tasks that were never active still get a row
+        tasks = self.df_tasks_residency().index.droplevel(['cpu', 'curr_state']).unique()
+        df = df.reindex(index=tasks)
+
+        # Add runtime for CPUs that did not appear in the window
+        df.columns = df.columns.astype('int64')
+        cpus = df.columns.union(range(self.trace.cpus_count))
+        return df.reindex(columns=cpus).fillna(0)
+
+    @TraceAnalysisBase.cache
+    @df_tasks_residency.used_events
     def df_task_total_residency(self, task):
         """
         DataFrame of a task's execution time on each CPU
@@ -565,6 +664,22 @@ class TasksAnalysis(TraceAnalysisBase):
           * CPU IDs as index
           * A ``runtime`` column (the time the task spent being active)
         """
+        task_id = self._resolve_task_pid(task)
+        if task_id.pid is None or task_id.comm is None:
+            return self._df_task_total_residency(task)
+
+        df = self._df_tasks_active_residency()
+        try:
+            runtime = df.loc[(task_id.pid, task_id.comm)]
+        except KeyError:
+            # pylint: disable=raise-missing-from
+            raise ValueError(f'Task "{task}" has no associated events among: {self._df_tasks_states.used_events}')
+
+        residency_df = runtime.to_frame('runtime')
+        residency_df.index.name = 'cpu'
+        return residency_df
+
+    def _df_task_total_residency(self, task):
         df = self.df_task_states(task)
         # Get the correct delta for the window we want.
         df = df_add_delta(df, window=self.trace.window, col='runtime')
@@ -603,21 +718,20 @@ class TasksAnalysis(TraceAnalysisBase):
                 for task in tasks
             )
 
-        def get_task_df(task):
-            try:
-                df = self.trace.analysis.tasks.df_task_total_residency(task)
-            # Not all tasks may be available, e.g. tasks outside the TraceView
-            # window
-            except Exception:
-                return None
-            else:
-                return df.T.rename(index={'runtime': str(task)})
-
-        res_df = pd.concat(
-            df
-            for df in map(get_task_df, task_ids)
-            if df is not None
-        )
+        df = self._df_tasks_active_residency()
+        # Not all tasks may be available, e.g. tasks outside the TraceView
+        # window
+        task_ids = [
+            task_id
+            for task_id in task_ids
+            if (task_id.pid, task_id.comm) in df.index
+        ]
+        res_df = df.loc[[
+            (task_id.pid, task_id.comm)
+            for task_id in task_ids
+        ]]
+        res_df.index = [str(task_id) for task_id in task_ids]
+        res_df.columns.name = 'cpu'
 
         res_df['Total'] = res_df.sum(axis=1)
         res_df.sort_values(by='Total', ascending=ascending, inplace=True)
@@ -1288,52 +1288,74 @@ def df_deduplicate(df, keep, consecutives, cols=None, all_col=True):
     return _data_deduplicate(df, keep=keep, consecutives=consecutives, cols=cols, all_col=all_col)
 
 
-@DataFrameAccessor.register_accessor
-def df_update_duplicates(df, col=None, func=None, inplace=False):
+def _nextafter_n(array, n):
     """
-    Update a given column to avoid duplicated values.
+    Vectorized equivalent of applying :func:`numpy.nextafter` towards
+    ``+inf`` ``n`` times on each element of a floating point ``array``.
 
-    :param df: Dataframe to act on.
-    :type df: pandas.DataFrame
+    This relies on the fact that the bit representation of IEEE 754 floats
+    sorts like sign-magnitude integers, so it can be turned into a two's
+    complement integer where consecutive floats are consecutive integers.
+    """
+    array = np.asarray(array)
+    int_dtype = np.dtype(f'i{array.dtype.itemsize}')
+    int_min = np.iinfo(int_dtype).min
 
-    :param col: Column to update. If ``None``, the index is used.
-    :type col: str or None
+    def flip(x):
+        # Involution between sign-magnitude and two's complement
+        return np.where(x < 0, int_min - x, x)
+
+    x = flip(array.view(int_dtype))
+    # -0.0 and 0.0 both map on 0, so stepping from -0.0 gives the same
+    # result as np.nextafter()
+    x = x + np.asarray(n, dtype=int_dtype)
+    updated = flip(x).astype(int_dtype).view(array.dtype)
+    # nextafter() leaves these values untouched
+    return np.where(np.isnan(array) | (array == np.inf), array, updated)
+
+
+@SeriesAccessor.register_accessor
+def series_update_duplicates(series, func=None):
+    """
+    Update a given series to avoid duplicated values.
+
+    :param series: Series to act on.
+    :type series: pandas.Series
 
     :param func: The function used to update the column. It must take a
         :class:`pandas.Series` of duplicated entries to update as parameters,
         and return a new :class:`pandas.Series`. The function will be called as
         long as there are remaining duplicates. If ``None``, the column is
-        assumed to be floating point and duplicated values will be incremented
-        by the smallest amount possible.
+        assumed to be floating point and the n-th duplicate of a value will be
+        incremented by ``n`` times the smallest amount possible.
     :type func: collections.abc.Callable
 
-    :param inplace: If ``True``, the passed dataframe will be modified.
-    :type inplace: bool
+    .. note:: The default ``func`` runs in linear time in the number of
+        duplicates, so it is suitable to make unique timestamp indices of large
+        dataframes.
     """
 
     def increment(series):
-        array = series.array.copy()
-
-        for i in range(len(array)):
-            arr = array[i:]
-            np.nextafter(arr, math.inf, out=arr)
-
-        return pd.Series(array, index=series.index)
+        # Rank of each duplicate among the other duplicates of the same value.
+        # Since the first occurrence is not part of the series, the n-th
+        # duplicate gets n-th rank (starting from 1)
+        rank = series.groupby(series, sort=False, dropna=False).cumcount() + 1
+        return pd.Series(
+            _nextafter_n(series.to_numpy(), rank.to_numpy()),
+            index=series.index,
+        )
 
     def get_duplicated(series):
         # Keep the first, so we update the second duplicates
         locs = series.duplicated(keep='first')
         return locs, series.loc[locs]
 
-    use_index = col is None
-    # Indices already gets copied with to_series()
-    use_copy = inplace and not use_index
-
-    series = df.index.to_series() if use_index else df[col]
-    series = series.copy() if use_copy else series
+    series = series.copy()
     func = func if func else increment
 
-    # Update the values until there is no more duplication
+    # Update the values until there is no more duplication. With the default
+    # function, another iteration is only needed when an incremented value
+    # collides with a pre-existing one.
     duplicated_locs, duplicated = get_duplicated(series)
     while duplicated_locs.any():
         updated = func(duplicated)
@@ -1342,6 +1364,31 @@ def df_update_duplicates(df, col=None, func=None, inplace=False):
         series.loc[duplicated_locs] = updated
         duplicated_locs, duplicated = get_duplicated(series)
 
+    return series
+
+
+@DataFrameAccessor.register_accessor
+def df_update_duplicates(df, col=None, func=None, inplace=False):
+    """
+    Update a given column to avoid duplicated values.
+
+    :param df: Dataframe to act on.
+    :type df: pandas.DataFrame
+
+    :param col: Column to update. If ``None``, the index is used.
+    :type col: str or None
+
+    :param func: See :func:`series_update_duplicates`.
+    :type func: collections.abc.Callable
+
+    :param inplace: If ``True``, the passed dataframe will be modified.
+    :type inplace: bool
+    """
+    use_index = col is None
+
+    series = df.index.to_series() if use_index else df[col]
+    series = series_update_duplicates(series, func=func)
+
     df = df if inplace else df.copy()
     if use_index:
         df.index = series
@@ -17,10 +17,12 @@
 """Classes for modeling and estimating energy usage of CPU systems"""
 
 from collections import namedtuple, OrderedDict
-from itertools import product
+from itertools import product, permutations
+import math
 import operator
 import re
 
+import numpy as np
 import pandas
 
 from devlib.utils.misc import mask_to_list, ranges_to_list
@@ -681,6 +683,115 @@ class EnergyModel(Serializable, Loggable):
         return self._estimate_from_active_time(cpu_active_time,
                                                freqs, idle_states, combine=True)
 
+    @property
+    @memoized
+    def _symmetric_cpu_classes(self):
+        """
+        List of tuples of CPUs that are interchangeable.
+
+        CPUs in the same group of :attr:`cpu_groups` are interchangeable if
+        they also share the frequency domain and are siblings with the same
+        idle states in both the topology and the power domain trees. Swapping
+        the utilization of two such CPUs cannot change any estimation.
+        """
+        def key(cpu):
+            node = self.cpu_nodes[cpu]
+            pd = self.cpu_pds[cpu]
+            [freq_dom] = [
+                i
+                for i, dom in enumerate(self.freq_domains)
+                if cpu in dom
+            ]
+            return (
+                freq_dom,
+                id(node.parent),
+                id(pd.parent),
+                tuple(dict(node.idle_states or {}).items()),
+                tuple(pd.idle_states),
+            )
+
+        classes = []
+        for group in self.cpu_groups:
+            subgroups = {}
+            for cpu in group:
+                subgroups.setdefault(key(cpu), []).append(cpu)
+            classes.extend(
+                tuple(sorted(cpus))
+                for cpus in subgroups.values()
+            )
+        return classes
+
+    @property
+    @memoized
+    def _has_monotonic_energy(self):
+        """
+        True iff adding utilization to a CPU cannot decrease the energy
+        estimated by :meth:`estimate_from_cpu_util`.
+
+        This holds if idle states are shallower when more CPUs are active and
+        shallower states do not consume less, and if for all idle states
+        ``(active_power - idle_power) / capacity`` is non-negative and does not
+        decrease as the frequency increases.
+        """
+        # Idle states deeper than what the CPU node knows about fall back on
+        # the shallowest state
+        for cpu, pd in enumerate(self.cpu_pds):
+            nr_idle_states = 0
+            while pd:
+                nr_idle_states += len(pd.idle_states)
+                pd = pd.parent
+            if nr_idle_states > len(self.cpu_nodes[cpu].idle_states or []):
+                return False
+
+        for node in self.root.iter_nodes():
+            if not node.active_states or not node.idle_states:
+                continue
+
+            for cpu in node.cpus:
+                cpu_node = self.cpu_nodes[cpu]
+                try:
+                    idle_powers = [
+                        node.idle_states[name]
+                        for name in cpu_node.idle_states
+                    ]
+                    active_states = [
+                        (node.active_states[freq].power, state.capacity)
+                        for freq, state in sorted(cpu_node.active_states.items())
+                    ]
+                except KeyError:
+                    return False
+
+                if any(a < b for a, b in zip(idle_powers, idle_powers[1:])):
+                    return False
+
+                for idle_power in idle_powers:
+                    efficiencies = [
+                        (power - idle_power) / cap
+                        for power, cap in active_states
+                    ]
+                    if any(eff < 0 for eff in efficiencies):
+                        return False
+                    if any(a > b for a, b in zip(efficiencies, efficiencies[1:])):
+                        return False
+        return True
+
+    def _iter_symmetric_utils(self, cpu_utils):
+        """
+        Iterate over the distinct ``cpu_utils`` obtained by permuting the
+        utilization of interchangeable CPUs.
+        """
+        classes = self._symmetric_cpu_classes
+        classes_utils = [
+            sorted(set(permutations(cpu_utils[cpu] for cpu in cpus)))
+            for cpus in classes
+        ]
+        for choice in product(*classes_utils):
+            util = list(cpu_utils)
+            for cpus, class_utils in zip(classes, choice):
+                for cpu, u in zip(cpus, class_utils):
+                    util[cpu] = u
+            yield tuple(util)
+
     def get_optimal_placements(self, capacities, capacity_margin_pct=0):
         """Find the optimal distribution of work for a set of tasks
 
@@ -702,8 +813,10 @@ class EnergyModel(Serializable, Loggable):
         states for CPUs.
 
         .. note::
-            This is a brute force search taking time exponential wrt. the number
-            of tasks.
+            The search only explores one placement among the ones that are
+            equivalent by symmetry (see :attr:`cpu_groups`), and prunes partial
+            placements using their energy as a lower bound when the energy
+            model guarantees that placing a task cannot decrease the energy.
 
         :param capacities: Dict mapping tasks to expected utilization
                            values. These tasks are assumed not to change; they
@@ -717,46 +830,110 @@ class EnergyModel(Serializable, Loggable):
                   that result in the same CPU utilizations are considered
                   equivalent.
         """
-        tasks = list(capacities.keys())
-
-        num_candidates = len(self.cpus) ** len(tasks)
+        margin = 100 / (100 - capacity_margin_pct)
+        classes = self._symmetric_cpu_classes
+        prune = self._has_monotonic_energy
+        # Tasks are placed biggest first, so that overutilized branches are
+        # cut as early as possible.
+        task_utils = sorted(capacities.values(), reverse=True)
 
         logger = self.get_logger()
         logger.debug(
-            f'Searching {num_candidates} configurations for optimal task placement...')
+            f'Searching optimal placement of {len(task_utils)} tasks on CPU classes {classes}...')
+
+        energies = {}
+
+        def energy(util):
+            try:
+                return energies[util]
+            except KeyError:
+                freqs, _ = self._guess_freqs(util, capacity_margin_pct)
+                power = sum(self.estimate_from_cpu_util(util, freqs=freqs).values())
+                energies[util] = power
+                return power
+
+        def canonical(util):
+            util = list(util)
+            for cpus in classes:
+                class_utils = sorted((util[cpu] for cpu in cpus), reverse=True)
+                for cpu, u in zip(cpus, class_utils):
+                    util[cpu] = u
+            return tuple(util)
+
+        def fits(cpu, util):
+            # Same conditions as the brute force filter and _guess_freqs(),
+            # both being monotonic with the utilization of the CPU.
+            return not (
+                util > self.capacity_scale or
+                util * margin > self.cpu_nodes[cpu].max_capacity
+            )
+
+        def bound(power):
+            # Leeway for rounding errors, since the energy of equivalent
+            # placements can differ by a few ULPs
+            return power + abs(power) * 1e-9
 
         candidates = {}
-        excluded = []
-        for cpus in product(self.cpus, repeat=len(tasks)):
-            placement = dict(zip(tasks, cpus))
-
-            util = [0] * len(self.cpus)
-            for task, cpu in placement.items():
-                util[cpu] += capacities[task]
-            util = tuple(util)
-
-            # Filter out candidate placements that have tasks greater than max
-            # or that we have already determined that we cannot place.
-            if (any(u > self.capacity_scale for u in util) or util in excluded):
-                continue
+        visited = set()
+        best = math.inf
+
+        def explore(util, depth):
+            nonlocal best
+            if depth == len(task_utils):
+                power = energy(util)
+                candidates[util] = power
+                best = min(best, power)
+                return
+
+            task_util = task_utils[depth]
+            children = set()
+            for cpus in classes:
+                # Placing the task on CPUs of the same class with the same
+                # utilization leads to the same canonical placement
+                seen = set()
+                for cpu in cpus:
+                    if util[cpu] in seen:
+                        continue
+                    seen.add(util[cpu])
+
+                    new_util = util[cpu] + task_util
+                    if fits(cpu, new_util):
+                        child = list(util)
+                        child[cpu] = new_util
+                        children.add(canonical(child))
+
+            # Explore the cheapest partial placements first, so a tight bound
+            # is found early on
+            children = sorted(children, key=energy if prune else None)
+            for child in children:
+                key = (depth + 1, child)
+                if key in visited:
+                    continue
+                visited.add(key)
 
-            if util not in candidates:
-                freqs, overutilized = self._guess_freqs(util, capacity_margin_pct)
-                if overutilized:
-                    # This isn't a valid placement
-                    excluded.append(util)
-                else:
-                    power = self.estimate_from_cpu_util(util, freqs=freqs)
-                    candidates[util] = sum(power.values())
+                # Adding tasks can only increase the energy, so the energy of a
+                # partial placement is a lower bound for all its completions.
+                if prune and energy(child) > bound(best):
+                    continue
+                explore(child, depth + 1)
+
+        explore(canonical([0] * len(self.cpus)), 0)
 
         if not candidates:
             # The system can't provide full throughput to this workload.
             raise EnergyModelCapacityError(
                 f"Can't handle workload: total capacity = {sum(capacities.values())}")
 
-        # Whittle down to those that give the lowest energy estimate
-        min_power = min(p for p in iter(candidates.values()))
-        ret = [u for u, p in candidates.items() if p == min_power]
+        # Expand the symmetries of the best canonical placements and whittle
+        # down to those that give the lowest energy estimate
+        placements = {
+            util: energy(util)
+            for cpu_utils, power in candidates.items()
+            if power <= bound(best)
+            for util in self._iter_symmetric_utils(cpu_utils)
+        }
+        min_power = min(placements.values())
+        ret = sorted(u for u, p in placements.items() if p == min_power)
 
         logger.debug('done')
         return ret
@@ -881,47 +1058,121 @@ class EnergyModel(Serializable, Loggable):
         inputs = inputs.astype(int)
         inputs = df_deduplicate(inputs, keep='first', consecutives=True)
 
-        memo_cache = {}
+        # Each distinct combination of idle states and frequencies is only
+        # estimated once, and the result is broadcast back to the timeline.
+        states, codes = np.unique(
+            inputs.to_numpy(),
+            axis=0,
+            return_inverse=True,
+        )
+        nr_cpus = len(self.cpus)
+        nrg = self._estimate_from_states(
+            idle=states[:, :nr_cpus],
+            freqs=states[:, nr_cpus:],
+        )
 
-        def f(input_row):
-            # The code in this module is slow. Try not to call it too much.
-            memo_key = tuple(input_row)
-            if memo_key in memo_cache:
-                return memo_cache[memo_key]
+        return pandas.DataFrame(
+            {
+                # Tuples don't play nicely as pandas column labels because
+                # parts of its API treat that as nested indexing (i.e.
+                # df[(0, 1)] sometimes means df[0][1]). So we'll give them
+                # awkward names.
+                '-'.join(map(str, cpus)): energy.take(codes.ravel())
+                for cpus, energy in nrg.items()
+            },
+            index=inputs.index,
+        )
 
-            # cpuidle doesn't understand shared resources so it will claim to
-            # put a CPU into e.g. 'cluster sleep' while its cluster siblings are
-            # active. Rectify those false claims.
-            cpus_active = input_row['idle'] == -1
-            deepest_possible = self._deepest_idle_idxs(cpus_active)
-            idle_idxs = [min(i, j) for i, j in zip(deepest_possible,
-                                                   input_row['idle'])]
+    def _estimate_from_states(self, idle, freqs):
+        """
+        Vectorized equivalent of :meth:`estimate_from_cpu_util` for the states
+        reported by a trace.
 
-            # Convert indexes to state names
-            idle_states = [n.idle_state_by_idx(max(i, 0))
-                           for n, i in zip(self.cpu_nodes, idle_idxs)]
+        :param idle: 2D array of idle state indices as reported by cpuidle,
+            with one row per state and one column per CPU. ``-1`` means the
+            CPU is active.
+        :type idle: numpy.ndarray
 
-            # We don't use tracked load, we just treat a CPU as active or idle,
-            # so set util to 0 or 100%.
-            utils = cpus_active * self.capacity_scale
+        :param freqs: 2D array of frequencies, laid out like ``idle``.
+        :type freqs: numpy.ndarray
 
-            nrg = self.estimate_from_cpu_util(cpu_utils=utils,
-                                              idle_states=idle_states,
-                                              freqs=input_row['freq'])
+        :returns: Dict of 1D arrays with the power of each row, keyed like the
+            return value of :meth:`estimate_from_cpu_util`.
+        """
+        def lookup(keys, values, x):
+            keys = np.asarray(keys)
+            idx = np.searchsorted(keys, x).clip(max=len(keys) - 1)
+            missing = keys[idx] != x
+            if missing.any():
+                raise KeyError(x[missing][0])
+            return np.asarray(values).take(idx)
+
+        def active_state_lookup(node, attr, x):
+            states = sorted(node.active_states.items())
+            return lookup(
+                [freq for freq, _ in states],
+                [getattr(state, attr) for _, state in states],
+                x,
+            )
 
-            # nrg is a dict mapping CPU group tuples to energy values.
-            # Unfortunately tuples don't play nicely as pandas column labels
-            # because parts of its API treat that as nested indexing
-            # (i.e. df[(0, 1)] sometimes means df[0][1]). So we'll give them
-            # awkward names.
+        # cpuidle doesn't understand shared resources so it will claim to
+        # put a CPU into e.g. 'cluster sleep' while its cluster siblings are
+        # active. Rectify those false claims.
+        cpus_active = idle == -1
 
-            nrg = {'-'.join(str(c) for c in k): v for k, v in iter(nrg.items())}
+        def find_deepest(pd):
+            if pd.parent:
+                parent_idx = find_deepest(pd.parent)
+            else:
+                parent_idx = -1
+            active = cpus_active[:, list(pd.cpus)].any(axis=1)
+            return np.where(active, -1, parent_idx + len(pd.idle_states))
 
-            ret = pandas.Series(nrg)
-            memo_cache[memo_key] = ret
-            return ret
+        deepest_possible = np.stack(
+            [find_deepest(pd) for pd in self.cpu_pds],
+            axis=1,
+        )
+        idle_idxs = np.minimum(deepest_possible, idle).clip(min=0)
+
+        # We don't use tracked load, we just treat a CPU as active or idle,
+        # so set util to 0 or 100%.
+        utils = cpus_active * self.capacity_scale
+        caps = np.stack(
+            [
+                active_state_lookup(node, 'capacity', freqs[:, cpu])
+                for cpu, node in enumerate(self.cpu_nodes)
+            ],
+            axis=1,
+        )
+        cpu_active_time = np.minimum(utils / caps, 1.0)
+
+        ret = {}
+        for node in self.root.iter_nodes():
+            if not node.active_states or not node.idle_states:
+                continue
 
-        return inputs.apply(f, axis=1)
+            cpus = tuple(node.cpus)
+            active_time = cpu_active_time[:, cpus].max(axis=1)
+            active_power = active_state_lookup(
+                node, 'power', freqs[:, cpus[0]]
+            ) * active_time
+
+            # Power of this node for each idle state index of each CPU
+            _idle_power = np.stack(
+                [
+                    np.array([
+                        node.idle_states[name]
+                        for name in self.cpu_nodes[cpu].idle_states
+                    ]).take(idle_idxs[:, cpu])
+                    for cpu in cpus
+                ],
+                axis=1,
+            ).max(axis=1)
+            idle_power = _idle_power * (1 - active_time)
+
+            ret[cpus] = ret.get(cpus, 0) + active_power + idle_power
+
+        return ret
 
     @classmethod
     @memoized
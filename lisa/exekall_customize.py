@@ -388,10 +388,10 @@ comparison. Can be repeated.""")
         return {'*.ResultBundleBase'}
 
     @classmethod
-    def reload_db(cls, db, path=None):
+    def reload_value(cls, value, path=None):
         # If path is not known, we cannot do anything here
         if not path:
-            return db
+            return value
 
         # This will relocate ArtifactPath instances to the new absolute path of
         # the results folder, in case it has been moved to another place
@@ -399,22 +399,21 @@ comparison. Can be repeated.""")
 
         # Relocate ArtifactPath embeded in objects so they will always
         # contain an absolute path that adapts to the local filesystem
-        for serial in db.get_all():
-            val = serial.value
-            try:
-                dct = val.__dict__
-            except AttributeError:
-                continue
-            for attr, attr_val in dct.items():
-                if isinstance(attr_val, ArtifactPath):
-                    new_path = attr_val.with_root(artifact_dir)
-                    # Only update paths to existing files, otherwise assume it
-                    # was pointing outside the artifact_dir and therefore
-                    # should not be fixed up
-                    if os.path.exists(new_path):
-                        setattr(val, attr, new_path)
-
-        return db
+        try:
+            dct = value.__dict__
+        except AttributeError:
+            return value
+
+        for attr, attr_val in dct.items():
+            if isinstance(attr_val, ArtifactPath):
+                new_path = attr_val.with_root(artifact_dir)
+                # Only update paths to existing files, otherwise assume it
+                # was pointing outside the artifact_dir and therefore
+                # should not be fixed up
+                if os.path.exists(new_path):
+                    setattr(value, attr, new_path)
+
+        return value
 
     def finalize_expr(self, expr):
         expr_artifact_dir = expr.data['expr_artifact_dir']
@@ -17,7 +17,9 @@
 
 import math
 import functools
+import itertools
 
+import numpy as np
 import pandas as pd
 
 from lisa.datautils import series_envelope_mean
@@ -180,104 +182,167 @@ def simulate_pelt(activations, init=0, index=None, clock=None, capacity=None, wi
     # some NaN at the beginning of the dataframe as well
     df.dropna(inplace=True)
 
-    def make_windowed_pelt_sim(init, scale, window, half_life):
-        decay = (1 / 2)**(1 / half_life)
-        # Alpha as defined in https://en.wikipedia.org/wiki/Moving_average
-        alpha = 1 - decay
-
-        # Accumulator of running time within a PELT window
-        acc = 0
-        # Output signal
-        signal = init / scale
-        output = signal
-
-        def pelt(row):
-            nonlocal acc, signal, output
-
-            # 1=running 0=sleeping
-            running = row['activations']
-            clock = row['clock']
-            delta = row['delta']
-            windows = row['crossed_windows'].astype('int')
-
-            # We crossed one or more windows boundaries
-            if windows:
-                # Handle last piece of the window in which this activation started
-                first_window_fraction = window - ((clock - delta) % window)
-                first_window_fraction /= window
-
-                acc += running * first_window_fraction
-                signal = alpha * acc + (1 - alpha) * signal
-
-                # Handle the windows we fully crossed
-                for _ in range(windows - 1):
-                    signal = alpha * running + (1 - alpha) * signal
-
-                # Handle the current incomplete window
-                last_window_fraction = (clock % window) / window
-
-                # Extrapolate the signal as it would look with the same
-                # `running` state at the end of the current window
-                extrapolated = running * alpha + (1 - alpha) * signal
-                # Take an value between signal and extrapolated based on the
-                # current completion of the window. This implements the same
-                # idea as introduced by kernel commit:
-                #  sched/cfs: Make util/load_avg more stable 625ed2bf049d5a352c1bcca962d6e133454eaaff
-                output = signal + last_window_fraction * (extrapolated - signal)
-
-                signal += alpha * running * last_window_fraction
-                acc = 0
-            # If we are still in the same window, just accumulate the running
-            # time
-            else:
-                acc += running * delta / window
-
-            return output * scale
-
-        return pelt
-
-    def make_windowless_pelt_sim(init, scale, window, half_life):
-        tau = _pelt_tau(half_life, window)
-        signal = init
-
-        def pelt_after(init, t, running):
-            # Compute the the response of the 1st order filter at time "t",
-            # with the given initial condition
-            # http://fourier.eng.hmc.edu/e59/lectures/e59/node33.html
-            exp_ = math.exp(-t / tau)
-            non_zero = running * scale * (1 - exp_)
-            zero = init * exp_
-            return non_zero + zero
-
-        def pelt(row):
-            nonlocal signal
-            # 1=running 0=sleeping
-            running = row['activations']
-            delta = row['delta']
-
-            signal = pelt_after(signal, delta, running)
-            return signal
-
-        return pelt
-
+    activations = df['activations'].to_numpy(dtype='float64')
+    delta = df['delta'].to_numpy(dtype='float64')
     if windowless:
-        make_sim = make_windowless_pelt_sim
+        pelt = _simulate_windowless_pelt(
+            activations=activations,
+            delta=delta,
+            init=init,
+            window=window,
+            half_life=half_life,
+            scale=scale,
+        )
     else:
-        make_sim = make_windowed_pelt_sim
-
-    sim = make_sim(
-        init=init,
-        window=window,
-        half_life=half_life,
-        scale=scale,
-    )
-    df['pelt'] = df.apply(sim, axis=1)
+        pelt = _simulate_windowed_pelt(
+            activations=activations,
+            delta=delta,
+            clock=df['clock'].to_numpy(dtype='float64'),
+            crossed_windows=df['crossed_windows'].to_numpy(dtype='float64'),
+            init=init,
+            window=window,
+            half_life=half_life,
+            scale=scale,
+        )
+
+    df['pelt'] = pelt
     pelt = df['pelt']
     if pelt.index is not index:
         pelt = pelt.reindex(index, method='ffill')
     return pelt
 
 
+def _linear_recurrence(a, b, init, max_decay=300):
+    """
+    Compute ``y[i] = a[i] * y[i - 1] + b[i]`` with ``y[-1] = init``.
+
+    The recurrence is solved in closed form with cumulative products and sums,
+    on segments along which the decay ``prod(a)`` stays above
+    ``exp(-max_decay)`` so that the computation does not underflow.
+
+    :param a: Decay factors in ``[0, 1]``.
+    :type a: numpy.ndarray
+
+    :param b: Non-negative inputs.
+    :type b: numpy.ndarray
+
+    :param init: Initial value.
+    :type init: float
+    """
+    y = np.empty(len(a), dtype='float64')
+    if not len(a):
+        return y
+
+    with np.errstate(divide='ignore'):
+        decay = -np.log(a)
+    # A single step decaying more than max_decay will start its own segment
+    decay = np.minimum(decay, max_decay)
+    segment = np.cumsum(decay) // max_decay
+    starts = np.flatnonzero(np.diff(segment, prepend=-1))
+    ends = itertools.chain(starts[1:], [len(a)])
+
+    prev = init
+    for start, end in zip(starts, ends):
+        # The first item of the segment can decay arbitrarily, so it is
+        # computed on its own
+        y[start] = first = a[start] * prev + b[start]
+        cumprod = np.cumprod(a[start + 1:end])
+        y[start + 1:end] = cumprod * (first + np.cumsum(b[start + 1:end] / cumprod))
+        prev = y[end - 1]
+
+    return y
+
+
+def _simulate_windowed_pelt(activations, delta, clock, crossed_windows, init, window, half_life, scale):
+    """
+    Windowed PELT simulator.
+
+    The signal is only updated when crossing windows boundaries, and the
+    running time is accumulated within a window. When crossing windows, the
+    update is::
+
+        # Last piece of the window in which this activation started
+        acc += running * first_window_fraction
+        signal = alpha * acc + (1 - alpha) * signal
+
+        # Windows fully crossed, in closed form
+        signal = running + (signal - running) * (1 - alpha) ** (windows - 1)
+
+        # Extrapolate the signal as it would look with the same `running`
+        # state at the end of the current window, and take a value between
+        # signal and extrapolated based on the current completion of the
+        # window. This implements the same idea as introduced by kernel commit:
+        # sched/cfs: Make util/load_avg more stable 625ed2bf049d5a352c1bcca962d6e133454eaaff
+        extrapolated = running * alpha + (1 - alpha) * signal
+        output = signal + last_window_fraction * (extrapolated - signal)
+
+        signal += alpha * running * last_window_fraction
+        acc = 0
+
+    This is a linear recurrence on ``signal`` between two rows crossing
+    windows, which is solved with :func:`_linear_recurrence`.
+    """
+    decay = (1 / 2)**(1 / half_life)
+    # Alpha as defined in https://en.wikipedia.org/wiki/Moving_average
+    alpha = 1 - decay
+
+    windows = crossed_windows.astype('int64')
+    crossing = windows != 0
+    first_window_fraction = (window - ((clock - delta) % window)) / window
+    last_window_fraction = (clock % window) / window
+
+    # Accumulator of running time within a PELT window: each row crossing a
+    # window gets the running time of all the rows since the previous
+    # crossing
+    acc = activations * np.where(crossing, first_window_fraction, delta / window)
+    group = np.cumsum(crossing) - crossing
+    acc = np.bincount(group, weights=acc)[group[crossing]]
+
+    running = activations[crossing]
+    windows = windows[crossing]
+    last_window_fraction = last_window_fraction[crossing]
+    fully_crossed_decay = decay ** (windows - 1)
+
+    # signal after handling the fully crossed windows:
+    # crossed = fully_crossed_decay * (alpha * acc + decay * prev_signal) + running * (1 - fully_crossed_decay)
+    # and the new value of signal is:
+    # signal = crossed + alpha * running * last_window_fraction
+    tail = alpha * running * last_window_fraction
+    signal = _linear_recurrence(
+        a=fully_crossed_decay * decay,
+        b=fully_crossed_decay * alpha * acc + running * (1 - fully_crossed_decay) + tail,
+        init=init / scale,
+    )
+    crossed = signal - tail
+    extrapolated = running * alpha + decay * crossed
+    output = crossed + last_window_fraction * (extrapolated - crossed)
+
+    # The output is only updated when crossing windows
+    pelt = np.full(len(activations), np.nan)
+    pelt[crossing] = output
+    pelt = pd.Series(pelt).ffill().fillna(init / scale).to_numpy()
+    return pelt * scale
+
+
+def _simulate_windowless_pelt(activations, delta, init, window, half_life, scale):
+    """
+    Windowless PELT simulator.
+
+    Each row computes the response of the 1st order filter after ``delta``,
+    with the previous value as initial condition
+    (http://fourier.eng.hmc.edu/e59/lectures/e59/node33.html)::
+
+        signal = running * scale * (1 - exp(-delta / tau)) + signal * exp(-delta / tau)
+    """
+    tau = _pelt_tau(half_life, window)
+    exp_ = np.exp(-delta / tau)
+    return _linear_recurrence(
+        a=exp_,
+        b=activations * scale * (1 - exp_),
+        init=init,
+    )
+
+
 def _pelt_tau(half_life, window):
     """
     Compute the time constant of an equivalent continuous-time system as
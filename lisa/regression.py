@@ -16,17 +16,37 @@
 #
 
 import math
+import re
 import itertools
-from collections import OrderedDict, namedtuple
+import functools
+from collections import namedtuple
 
+import numpy as np
+import pandas as pd
 import scipy.stats
 
-from lisa.utils import groupby, memoized
+from lisa.utils import memoized
 from lisa.tests.base import Result, ResultBundleBase
 
 ResultCount = namedtuple('ResultCount', ('passed', 'failed'))
 
 
+@functools.lru_cache(maxsize=4096)
+def _fisher_exact(old_failed, old_passed, new_failed, new_passed, alternative='two-sided'):
+    """
+    Memoized p-value of :func:`scipy.stats.fisher_exact`, since a lot of
+    testcases end up with the same contingency table.
+    """
+    _, p_val = scipy.stats.fisher_exact(
+        [
+            [old_failed, old_passed],
+            [new_failed, new_passed],
+        ],
+        alternative=alternative,
+    )
+    return p_val
+
+
 class RegressionResult:
     """
     Compute failure-rate regression between old and new series.
@@ -174,15 +194,12 @@ class RegressionResult:
         hypothesis.
         """
         # Apply the Fisher exact test to all tests failures.
-        _, p_val = scipy.stats.fisher_exact(
-            [
-                # Ignore errors and skipped tests
-                [self.old_count.failed, self.old_count.passed],
-                [self.new_count.failed, self.new_count.passed],
-            ],
+        return _fisher_exact(
+            # Ignore errors and skipped tests
+            self.old_count.failed, self.old_count.passed,
+            self.new_count.failed, self.new_count.passed,
             alternative=alternative,
         )
-        return p_val
 
     @property
     @memoized
@@ -216,13 +233,9 @@ class RegressionResult:
             fixed_failed = int(n * failure_rate_old)
             fixed_passed = n - fixed_failed
 
-            contingency_table = [
-                [fixed_failed, fixed_passed],
-                [self.new_count.failed, self.new_count.passed],
-            ]
-
-            _, p_val = scipy.stats.fisher_exact(
-                contingency_table,
+            p_val = _fisher_exact(
+                fixed_failed, fixed_passed,
+                self.new_count.failed, self.new_count.passed,
                 # Use two-sided alternative, since that is what will be used to
                 # check the actual data
                 alternative='two-sided'
@@ -236,69 +249,186 @@ class RegressionResult:
         raise RuntimeError('unreachable')
 
 
-def compute_regressions(old_list, new_list, remove_tags=None, **kwargs):
+def _dedup_froz_val_list(froz_val_list, excluded_froz_val_list):
+    excluded_uuids = {
+        froz_val.uuid
+        for froz_val in excluded_froz_val_list
+    }
+    return [
+        froz_val
+        for froz_val in froz_val_list
+        if froz_val.uuid not in excluded_uuids
+    ]
+
+
+def _make_result_df(froz_val_list, get_id):
     """
-    Compute a list of :class:`RegressionResult` out of two lists of
+    Make a dataframe with one row per :class:`exekall.engine.FrozenExprVal`,
+    with the testcase ID and whether it passed or failed.
+
+    .. note:: Only ``FAILED`` and ``PASSED`` results are taken into account,
+        so some values may neither pass nor fail.
+    """
+    def get_result(value):
+        if isinstance(value, ResultBundleBase):
+            res = value.result
+            return (res is Result.PASSED, res is Result.FAILED)
+        # handle other types as well, as long as they can be
+        # converted to bool
+        else:
+            passed = bool(value)
+            return (passed, not passed)
+
+    id_list = []
+    result_list = []
+    for froz_val in froz_val_list:
+        id_list.append(get_id(froz_val))
+        result_list.append(get_result(froz_val.value))
+
+    df = pd.DataFrame(
+        result_list,
+        columns=['passed', 'failed'],
+        dtype=bool,
+    )
+    df['testcase_id'] = id_list
+    return df
+
+
+def compute_regressions_df(old_list, new_list, remove_tags=None, alpha=None):
+    """
+    Compute a dataframe of regressions out of two lists of
     :class:`exekall.engine.FrozenExprVal`.
 
-    The tests are first grouped by their ID, and then a
-    :class:`RegressionResult` is computed for each of these ID.
+    This is the tabular equivalent of :func:`compute_regressions`, computing
+    the same quantities as :class:`RegressionResult` for all testcases at
+    once.
 
     :param old_list: old series of :class:`exekall.engine.FrozenExprVal`.
     :type old_list: list(exekall.engine.FrozenExprVal)
 
-    :param new_list: new series of :class:`exekall.engine.FrozenExprVal`. Values
-        with a UUID that is also present in `old_list` will be removed from
-        that list before the regressions are computed.
+    :param new_list: new series of :class:`exekall.engine.FrozenExprVal`. See
+        :func:`compute_regressions`.
     :type new_list: list(exekall.engine.FrozenExprVal)
 
     :param remove_tags: remove the given list of tags from the IDs before
-        computing the regression. That allows computing regressions with a
-        different "board" tag for example.
+        computing the regression. See :func:`compute_regressions`.
     :type remove_tags: list(str) or None
 
-    :Variable keyword arguments: Forwarded to
-        :meth:`RegressionResult.from_result_list`.
+    :param alpha: Alpha risk of the statistical test
+    :type alpha: float
+
+    :returns: A :class:`pandas.DataFrame` indexed by testcase ID, with the
+        following columns:
+
+        * ``old_passed``, ``old_failed``, ``new_passed``, ``new_failed``:
+          number of times the test passed and failed in each series.
+        * ``old_failure_pc``, ``new_failure_pc``: failure rate in percent.
+        * ``failure_delta_pc``: delta between old and new failure rate in
+          percent.
+        * ``p_val``: p-value of the statistical test.
+        * ``significant``: ``True`` if there is a significant difference in
+          failure rate.
+
+        Only testcases that are present in both series are listed.
     """
     remove_tags = remove_tags or []
-
-    def dedup_list(froz_val_list, excluded_froz_val_list):
-        excluded_uuids = {
-            froz_val.uuid
-            for froz_val in excluded_froz_val_list
-        }
-        return [
-            froz_val
-            for froz_val in froz_val_list
-            if froz_val.uuid not in excluded_uuids
-        ]
+    alpha = alpha if alpha is not None else 0.05
 
     # Remove from the new_list all the FrozenExprVal that were carried from the
     # old_list sequence. That is important since a ValueDB could contain both
     # new and old data, so old data needs to be filtered out before we can
     # actually compare the two sets.
-    new_list = dedup_list(new_list, old_list)
+    new_list = _dedup_froz_val_list(new_list, old_list)
+
+    # Formatting the ID is costly, so do it once for all values sharing the
+    # same recorded ID, i.e. iterations of the same testcase.
+    @functools.lru_cache(maxsize=None)
+    def remove_id_tags(id_):
+        for tag in remove_tags:
+            id_ = re.sub(fr'\[{tag}=.*?\]', '', id_)
+        return id_
 
     def get_id(froz_val):
         # Remove tags, so that more test will share the same ID. This allows
         # cross-board comparison for example.
-        return froz_val.get_id(qual=False, with_tags=True, remove_tags=remove_tags)
+        return remove_id_tags(froz_val.get_id(qual=False, with_tags=True))
+
+    def count(froz_val_list, prefix):
+        df = _make_result_df(froz_val_list, get_id)
+        df = df.groupby('testcase_id', sort=False)[['passed', 'failed']].sum()
+        return df.add_prefix(prefix)
+
+    df = count(old_list, 'old_').join(
+        count(new_list, 'new_'),
+        how='inner',
+    )
+    df = df.sort_index()
+    df = df.astype(int)
+
+    def failure_pc(prefix):
+        failed = df[f'{prefix}failed']
+        total = failed + df[f'{prefix}passed']
+        with np.errstate(divide='ignore', invalid='ignore'):
+            pc = 100 * failed / total
+        # Match RegressionResult.failure_pc
+        return pc.where(total != 0, math.inf)
+
+    df['old_failure_pc'] = failure_pc('old_')
+    df['new_failure_pc'] = failure_pc('new_')
+    df['failure_delta_pc'] = df['new_failure_pc'] - df['old_failure_pc']
+
+    count_cols = ['old_failed', 'old_passed', 'new_failed', 'new_passed']
+    # Only carry out the test once per contingency table
+    df['p_val'] = [
+        _fisher_exact(*map(int, table))
+        for table in df[count_cols].itertuples(index=False, name=None)
+    ]
+    df['significant'] = df['p_val'] <= alpha
+    df.index.name = 'testcase_id'
+    return df
 
-    def group_by_testcase(froz_val_list):
-        return OrderedDict(
-            (testcase_id, [froz_val.value for froz_val in froz_val_group])
-            for testcase_id, froz_val_group in groupby(froz_val_list, key=get_id)
-        )
 
-    old_testcases = group_by_testcase(old_list)
-    new_testcases = group_by_testcase(new_list)
+def compute_regressions(old_list, new_list, remove_tags=None, **kwargs):
+    """
+    Compute a list of :class:`RegressionResult` out of two lists of
+    :class:`exekall.engine.FrozenExprVal`.
+
+    The tests are first grouped by their ID, and then a
+    :class:`RegressionResult` is computed for each of these ID.
+
+    :param old_list: old series of :class:`exekall.engine.FrozenExprVal`.
+    :type old_list: list(exekall.engine.FrozenExprVal)
+
+    :param new_list: new series of :class:`exekall.engine.FrozenExprVal`. Values
+        with a UUID that is also present in `old_list` will be removed from
+        that list before the regressions are computed.
+    :type new_list: list(exekall.engine.FrozenExprVal)
+
+    :param remove_tags: remove the given list of tags from the IDs before
+        computing the regression. That allows computing regressions with a
+        different "board" tag for example.
+    :type remove_tags: list(str) or None
+
+    :Variable keyword arguments: Forwarded to :class:`RegressionResult`.
+
+    .. seealso:: :func:`compute_regressions_df` to get the regressions as a
+        dataframe.
+    """
+    df = compute_regressions_df(
+        old_list,
+        new_list,
+        remove_tags=remove_tags,
+        alpha=kwargs.get('alpha'),
+    )
 
     return [
-        RegressionResult.from_result_list(
+        RegressionResult(
             testcase_id=testcase_id,
-            old_list=old_testcases[testcase_id],
-            new_list=new_testcases[testcase_id],
+            old_count=ResultCount(passed=int(old_passed), failed=int(old_failed)),
+            new_count=ResultCount(passed=int(new_passed), failed=int(new_failed)),
             **kwargs,
         )
-        for testcase_id in sorted(old_testcases.keys() & new_testcases.keys())
+        for testcase_id, old_passed, old_failed, new_passed, new_failed in df[
+            ['old_passed', 'old_failed', 'new_passed', 'new_failed']
+        ].itertuples(name=None)
     ]
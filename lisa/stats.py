@@ -15,6 +15,7 @@
 # limitations under the License.
 #
 import functools
+import operator
 from operator import itemgetter
 import contextlib
 from math import nan
@@ -25,7 +26,7 @@ import pandas as pd
 import numpy as np
 
 from lisa.utils import Loggable, memoized, FrozenDict, deduplicate, fold
-from lisa.datautils import df_split_signals, df_make_empty_clone, df_filter
+from lisa.datautils import df_make_empty_clone, df_filter
 from lisa.notebook import make_figure, COLOR_CYCLE
 
 
@@ -85,6 +86,76 @@ def series_mean_stats(series, kind, confidence_level=0.95):
     interval = tuple(sorted(map(post, interval)))
     return (mean, std, sem, interval)
 
+
+def _grouped_mean_stats(series, groups, kinds, confidence_level):
+    """
+    Same as :func:`series_mean_stats` but for all the groups of a
+    :class:`pandas.Series` at once.
+
+    :param groups: Group number of each value of ``series``, ranging from
+        ``0`` to ``len(kinds) - 1``.
+    :type groups: numpy.ndarray
+
+    :param kinds: Kind of mean to use for each group.
+    :type kinds: numpy.ndarray
+
+    :returns: A tuple of arrays with one item per group, in the same order as
+        the values returned by :func:`series_mean_stats`. The interval is a 2D
+        array with the - and + values as rows.
+    """
+    kinds = np.asarray(kinds)
+    geometric = kinds == 'geometric'
+    harmonic = kinds == 'harmonic'
+    if not (geometric | harmonic | (kinds == 'arithmetic')).all():
+        kind = kinds[~(geometric | harmonic | (kinds == 'arithmetic'))][0]
+        raise ValueError(f'Unrecognized kind of mean: {kind}')
+
+    def post(x):
+        x = np.array(x, dtype='float64')
+        x[..., geometric] = np.exp(x[..., geometric])
+        with np.errstate(divide='ignore'):
+            x[..., harmonic] = 1 / x[..., harmonic]
+        return x
+
+    x = series.to_numpy(dtype='float64', copy=True)
+    row_geometric = geometric[groups]
+    row_harmonic = harmonic[groups]
+    x[row_geometric] = np.log(x[row_geometric])
+    with np.errstate(divide='ignore'):
+        x[row_harmonic] = 1 / x[row_harmonic]
+
+    grouped = pd.Series(x).groupby(groups)
+    mean = grouped.mean().to_numpy()
+    std = grouped.std().to_numpy()
+    count = grouped.size().to_numpy()
+    # Unlike pandas, scipy.stats.sem() does not skip NaN
+    sem = np.where(
+        grouped.count().to_numpy() == count,
+        std / np.sqrt(count),
+        nan,
+    )
+
+    # Degenerate intervals are NaN anyway, but scipy would warn about them
+    lower = np.full(len(mean), nan)
+    upper = lower.copy()
+    dof = count - 1
+    valid = (dof > 0) & (sem > 0)
+    lower[valid], upper[valid] = scipy.stats.t.interval(
+        confidence_level,
+        dof[valid],
+        loc=mean[valid],
+        scale=sem[valid],
+    )
+    # Convert it into a +/- format
+    interval = np.abs([lower - mean, upper - mean])
+
+    mean = post(mean)
+    sem = post(sem)
+    std = post(std)
+    interval = np.sort(post(interval), axis=0)
+    return (mean, std, sem, interval)
+
+
 def guess_mean_kind(unit, control_var):
     """
     Guess which kind of mean should be used to summarize results in the given
@@ -481,108 +552,93 @@ class Stats(Loggable):
             **kwargs
         )
 
-    def _df_group_apply(self, df, func, melt=False, index_cols=None):
+    def _df_group_ref(self, df):
         """
-        Apply ``func`` on subsets of the dataframe and return the concatenated
-        result.
+        Split the dataframe in groups and match each of them with its
+        reference group.
+
+        Groups are made of the rows sharing the same values in the columns of
+        the ``ref_group`` and in the sub-group columns. The reference of a
+        group is the group with the same sub-group values inside
+        ``ref_group``. Groups without any reference are dropped.
 
         :param df: Dataframe in database format (meaningless index, tag and
             value columns).
         :type df: pandas.DataFrame
 
-        :param func: Callable called with 3 parameters:
-
-            * ``ref``: Reference subgroup dataframe for comparison purposes.
-            * ``df``: Dataframe of the subgroup, to compare to ``ref``.
-            * ``group``: Dictionary ``dict(column_name, value)`` identifying
-              the ``df`` subgroup.
-        :type func: collections.abc.Callable
-
-        :param melt: If ``True``, extra columns added by the callback in the
-            return :class:`pandas.DataFrame` will be melted, i.e. they will be
-            turned into row with the column name being copied to the stat column.
-        :type melt: bool
-
-        :param index_cols: Columns to aggregate on that will be used for
-            indexing the sub-dataframes, instead of the default ``agg_cols``.
-        :type index_cols: list(str) or None
+        :returns: A tuple with:
+
+            0. The :class:`pandas.DataFrame` of the rows belonging to a
+               group, ordered by group. The rows order is preserved inside
+               each group.
+            1. A :class:`numpy.ndarray` with the group number of each row,
+               ranging from ``0`` to the number of groups minus one.
+            2. A :class:`numpy.ndarray` with the reference group number of
+               each group.
+            3. A :class:`pandas.DataFrame` with one row per group, containing
+               the values of the group columns.
         """
-        ref_group = FrozenDict(self._ref_group)
-        # All the columns that are not involved in the group itself except the
-        # value will be used as index, so that the reference group and other
-        # groups can be joined meaningfully on the index for comparison
-        # purposes.
-        index_cols = index_cols if index_cols is not None else self._agg_cols
-        index_cols = self._restrict_cols(index_cols, df)
+        group_cols = list(self._ref_group.keys())
         sub_group_cols = self._restrict_cols(self._sub_group_cols, df)
 
-        def process_subgroup(df, group, subgroup):
-            subgroup = FrozenDict(subgroup)
-
-            try:
-                ref = subref[subgroup]
-            except KeyError:
-                return None
-
-            group = {**group, **subgroup}
-
-            # Make sure that the columns/index levels relative to the group are
-            # removed, since they are useless because they have a constant value
-            def remove_cols(df):
-                to_remove = group.keys()
-                df = df.drop(columns=self._restrict_cols(to_remove, df))
-                try:
-                    drop_level = df.index.droplevel
-                except AttributeError:
-                    pass
-                else:
-                    df.index = drop_level(sorted(set(df.index.names) & set(to_remove)))
-                return df
-
-            df = remove_cols(df)
-            ref = remove_cols(ref)
-
-            df = func(ref, df, group)
-            # Only assign-back subgroup columns if they have not been set by the
-            # callback directly.
-            to_assign = group.keys() - set(df.columns)
-            df = df.assign(**{
-                col: val
-                for col, val in group.items()
-                if col in to_assign
-            })
-
-            # Drop RangeIndex to avoid getting an "index" column that is
-            # useless
-            drop_index = isinstance(df.index, pd.RangeIndex)
-            df.reset_index(drop=drop_index, inplace=True)
-            return df
-
-        # Groups as asked by the user
-        comparison_groups = {
-            FrozenDict(group): df.set_index(index_cols)
-            for group, df in df_split_signals(df, ref_group.keys())
-        }
-
-        # We elect a comparison reference and split it in subgroups
-        ref = comparison_groups[ref_group]
-        subref = {
-            FrozenDict(subgroup): subdf
-            for subgroup, subdf in df_split_signals(ref, sub_group_cols)
-        }
-
-        # For each group, split it further in subgroups
-        dfs = [
-            process_subgroup(subdf, group, subgroup)
-            for group, df in comparison_groups.items()
-            for subgroup, subdf in df_split_signals(df, sub_group_cols)
-        ]
-        df = pd.concat((df for df in dfs if df is not None), ignore_index=True, copy=False)
-
-        if melt:
-            df = self._melt(df)
-
-        return df
+        def get_codes(cols):
+            if cols:
+                codes = df.groupby(cols, observed=True, sort=False).ngroup()
+                # Rows with NaN in the group columns don't belong to any group
+                return codes.fillna(-1).to_numpy(dtype='int64')
+            else:
+                return np.zeros(len(df), dtype='int64')
+
+        group_codes = get_codes(group_cols)
+        sub_group_codes = get_codes(sub_group_cols)
+        codes = get_codes(group_cols + sub_group_cols)
+        valid = (codes >= 0) & (group_codes >= 0) & (sub_group_codes >= 0)
+
+        ref_mask = functools.reduce(
+            operator.and_,
+            (
+                df[col].to_numpy() == val
+                for col, val in self._ref_group.items()
+            ),
+            valid,
+        )
+        try:
+            ref_group_code = group_codes[ref_mask][0]
+        except IndexError:
+            # pylint: disable=raise-missing-from
+            raise KeyError(FrozenDict(self._ref_group))
+
+        # Sort the groups in order of appearance of their group, then in
+        # order of appearance of their sub-group inside it
+        first_loc = np.flatnonzero(valid)
+        first_loc = first_loc[pd.Series(codes[first_loc]).drop_duplicates().index]
+        first_loc = first_loc[np.lexsort((codes[first_loc], group_codes[first_loc]))]
+
+        # Find the reference of each group by looking up its sub-group among
+        # the reference groups.
+        first_sub_group_codes = sub_group_codes[first_loc]
+        is_ref = group_codes[first_loc] == ref_group_code
+        sub_group_to_ref = np.full(sub_group_codes.max() + 1, -1, dtype='int64')
+        sub_group_to_ref[first_sub_group_codes[is_ref]] = np.flatnonzero(is_ref)
+        refs = sub_group_to_ref[first_sub_group_codes]
+
+        # Drop the groups that have no reference and number the others
+        has_ref = refs >= 0
+        numbers = np.cumsum(has_ref) - 1
+        refs = numbers[refs[has_ref]]
+        code_to_number = np.full(codes.max() + 1, -1, dtype='int64')
+        code_to_number[codes[first_loc]] = np.where(has_ref, numbers, -1)
+        first_loc = first_loc[has_ref]
+
+        row_groups = np.where(valid, code_to_number[np.where(valid, codes, 0)], -1)
+        rows = np.flatnonzero(row_groups >= 0)
+        rows = rows[np.argsort(row_groups[rows], kind='stable')]
+
+        groups = pd.DataFrame({
+            col: df[col].to_numpy()[first_loc]
+            for col in deduplicate(group_cols + sub_group_cols, keep_last=False)
+        })
+        return (df.iloc[rows], row_groups[rows], refs, groups)
 
     @property
     @memoized
@@ -626,72 +682,95 @@ class Stats(Loggable):
         """
         Compute the mean and associated stats
         """
-        def get_const_col(group, df, col):
-            vals = df[col].unique()
-            if len(vals) > 1:
-                raise ValueError(f"Column \"{col}\" has more than one value ({', '.join(vals)}) for the group: {group}")
-            return vals[0]
-
-        def mean_func(ref, df, group): # pylint: disable=unused-argument
+        df, group_nrs, _, groups = self._df_group_ref(df)
+        nr_groups = len(groups)
+        # Columns that are constant inside a group, but that are not part of
+        # the group definition
+        const_cols = set(df.columns) - set(groups.columns) - set(self._agg_cols)
+
+        def get_group(nr):
+            return dict(groups.iloc[nr])
+
+        def get_const_col(col):
+            if col not in const_cols:
+                raise KeyError(col)
+
+            vals = pd.DataFrame({'group': group_nrs, col: df[col].to_numpy()})
+            vals = vals.drop_duplicates()
+            duplicated = vals['group'].duplicated()
+            if duplicated.any():
+                nr = vals['group'][duplicated].iloc[0]
+                group_vals = vals[col][vals['group'] == nr]
+                raise ValueError(f"Column \"{col}\" has more than one value ({', '.join(map(str, group_vals))}) for the group: {get_group(nr)}")
+            return vals[col].tolist()
+
+        try:
+            mean_kinds = [
+                mean_kind or 'arithmetic'
+                for mean_kind in get_const_col(self._mean_kind_col)
+            ]
+        except KeyError:
             try:
-                mean_kind = get_const_col(group, df, self._mean_kind_col)
+                units = get_const_col(self._unit_col)
             except KeyError:
-                try:
-                    unit = get_const_col(group, df, self._unit_col)
-                except KeyError:
-                    unit = None
-                try:
-                    control_var = get_const_col(group, df, self._control_var_col)
-                except KeyError:
-                    control_var = None
+                units = [None] * nr_groups
+            try:
+                control_vars = get_const_col(self._control_var_col)
+            except KeyError:
+                control_vars = [None] * nr_groups
 
-                mean_kind = guess_mean_kind(unit, control_var)
-            else:
-                mean_kind = mean_kind or 'arithmetic'
+            mean_kinds = list(map(guess_mean_kind, units, control_vars))
 
-            try:
-                mean_name, sem_name, std_name = {
+        mean_kinds = np.array(mean_kinds, dtype=object)
+        try:
+            names = np.array([
+                {
                     'arithmetic': ('mean', 'sem', 'std'),
                     'harmonic': ('hmean', 'hse', 'hsd'),
                     'geometric': ('gmean', 'gse', 'gsd'),
                 }[mean_kind]
-            except KeyError:
-                # pylint: disable=raise-missing-from
-                raise ValueError(f'Unrecognized mean kind: {mean_kind}')
-
-            series = df[self._val_col]
-            min_sample_size = 30
-            series_len = len(series)
-            if series_len < min_sample_size:
-                group_str = ', '.join(sorted(f'{k}={v}' for k, v in group.items()))
-                self.get_logger().warning(f'Sample size smaller than {min_sample_size} is being used, the mean confidence interval will only be accurate if the data is normally distributed: {series_len} samples for group {group_str}')
-
-            def fixup_nan(x):
-                return 0 if pd.isna(x) else x
-            mean, std, sem, ci = series_mean_stats(series, kind=mean_kind, confidence_level=self._mean_ci_confidence)
-            ci = tuple(map(fixup_nan, ci))
-
-            # Only display the stats we were asked for
-            rows = [
-                values
-                for stat, values in (
-                    ('mean', (mean_name, mean, ci[0], ci[1])),
-                    ('sem', (sem_name, sem, nan, nan)),
-                    ('std', (std_name, std, nan, nan)),
-                )
-                if stat in provide_stats
-            ]
-            return pd.DataFrame.from_records(
-                rows,
-                columns=(
-                    self._stat_col,
-                    self._val_col,
-                    self._ci_cols[0],
-                    self._ci_cols[1]
-                )
-            )
+                for mean_kind in mean_kinds
+            ], dtype=object).reshape(nr_groups, 3)
+        except KeyError as e:
+            # pylint: disable=raise-missing-from
+            raise ValueError(f'Unrecognized mean kind: {e.args[0]}')
+
+        sizes = np.bincount(group_nrs, minlength=nr_groups)
+        min_sample_size = 30
+        for nr in np.flatnonzero(sizes < min_sample_size):
+            group_str = ', '.join(sorted(f'{k}={v}' for k, v in get_group(nr).items()))
+            self.get_logger().warning(f'Sample size smaller than {min_sample_size} is being used, the mean confidence interval will only be accurate if the data is normally distributed: {sizes[nr]} samples for group {group_str}')
+
+        mean, std, sem, ci = _grouped_mean_stats(
+            df[self._val_col],
+            group_nrs,
+            kinds=mean_kinds,
+            confidence_level=self._mean_ci_confidence,
+        )
+        ci = np.where(np.isnan(ci), 0, ci)
 
-        return self._df_group_apply(df, mean_func, index_cols=self._agg_cols)
+        # Only display the stats we were asked for
+        selected = [
+            i
+            for i, stat in enumerate(('mean', 'sem', 'std'))
+            if stat in provide_stats
+        ]
+        nan_col = np.full(nr_groups, nan)
+
+        def get_col(*cols):
+            return np.stack(cols, axis=1)[:, selected].ravel()
+
+        res = pd.DataFrame({
+            self._stat_col: names[:, selected].ravel(),
+            self._val_col: get_col(mean, sem, std),
+            self._ci_cols[0]: get_col(ci[0], nan_col, nan_col),
+            self._ci_cols[1]: get_col(ci[1], nan_col, nan_col),
+        })
+        groups = groups.iloc[np.repeat(np.arange(nr_groups), len(selected))]
+        return res.assign(**{
+            col: groups[col].to_numpy()
+            for col in groups.columns
+        })
 
     def _df_stats(self):
         """
@@ -751,15 +830,17 @@ class Stats(Loggable):
         value_col = self._val_col
         stat_name = 'ks2samp_test'
 
-        def get_pval(ref, df):
-            _, p_value = scipy.stats.ks_2samp(ref[value_col], df[value_col])
-            return p_value
-
-        def func(ref, df, group): # pylint: disable=unused-argument
-            return pd.DataFrame({stat_name: [get_pval(ref, df)]})
-
         # Summarize each group by the p-value of the test against the reference group
-        test_df = self._df_group_apply(self._orig_df, func, melt=True)
+        orig_df, group_nrs, refs, groups = self._df_group_ref(self._orig_df)
+        samples = np.split(
+            orig_df[value_col].to_numpy(),
+            np.flatnonzero(np.diff(group_nrs)) + 1,
+        )
+        pvals = [
+            scipy.stats.ks_2samp(samples[ref], sample)[1]
+            for ref, sample in zip(refs, samples)
+        ]
+        test_df = self._melt(groups.assign(**{stat_name: pvals}))
         test_df[self._unit_col] = 'pval'
         test_df = self._df_remove_tweak_cols(test_df)
 
@@ -777,30 +858,58 @@ class Stats(Loggable):
         tag_cols = self._tag_cols
         non_normalizable_units = self._non_normalizable_units
 
-        def diff_pct(ref, df, group):
-            if group[unit_col] in non_normalizable_units:
-                return df
-            else:
-                # (val - ref) / ref == (val / ref) - 1
-                factor =  1 / ref[val_col]
-                transform = lambda x: 100 * (x * factor - 1)
-                df[val_col] = transform(df[val_col])
-
-                # Remove the confidence interval as it is significantly more
-                # complex to compute and would require access to other
-                # statistics too. All in all it's not really worth the hassle,
-                # since the comparison should be based on the stat test anyway.
-                _ci_cols = self._restrict_cols(ci_cols, df)
-                df = df.drop(columns=_ci_cols)
-
-                df[unit_col] = '%'
-                return df
+        df, group_nrs, refs, groups = self._df_group_ref(df)
+        df = df.reset_index(drop=True)
 
+        # Columns identifying a row inside a given group, used to match it
+        # with the corresponding row of the reference group.
         index_cols = sorted(
             (set(tag_cols) | {unit_col, stat_col}) -
             (self._ref_group.keys() | {val_col})
         )
-        df = self._df_group_apply(df, diff_pct, index_cols=index_cols)
+        index_cols = [
+            col
+            for col in self._restrict_cols(index_cols, df)
+            if col not in groups.columns
+        ]
+        group_col = '__lisa_stats_group'
+        ref_val_col = '__lisa_stats_ref_val'
+        row_refs = refs[group_nrs]
+        is_ref = row_refs == group_nrs
+        ref_df = df.loc[is_ref, index_cols].assign(**{
+            group_col: group_nrs[is_ref],
+            ref_val_col: df[val_col][is_ref],
+        })
+        ref_vals = df[index_cols].assign(
+            **{group_col: row_refs}
+        ).merge(
+            ref_df,
+            how='left',
+            on=index_cols + [group_col],
+            validate='many_to_one',
+        )[ref_val_col].to_numpy()
+
+        normalize = ~groups[unit_col].isin(non_normalizable_units).to_numpy()
+        normalize = normalize[group_nrs]
+
+        # (val - ref) / ref == (val / ref) - 1
+        vals = df[val_col].to_numpy()
+        with np.errstate(divide='ignore', invalid='ignore'):
+            factor = 1 / ref_vals
+            df[val_col] = np.where(normalize, 100 * (vals * factor - 1), vals)
+
+        # Remove the confidence interval as it is significantly more
+        # complex to compute and would require access to other
+        # statistics too. All in all it's not really worth the hassle,
+        # since the comparison should be based on the stat test anyway.
+        _ci_cols = self._restrict_cols(ci_cols, df)
+        if normalize.all():
+            df = df.drop(columns=_ci_cols)
+        else:
+            df.loc[normalize, _ci_cols] = nan
+
+        df[unit_col] = np.where(normalize, '%', df[unit_col].to_numpy())
+
         # Divisions can end up yielding extremely small values like 1e-14,
         # which seems to create problems while plotting
         df[val_col] = df[val_col].round(10)
@@ -29,6 +29,9 @@ import functools
 import inspect
 import pickle
 import tempfile
+import threading
+import subprocess
+import base64
 from types import ModuleType, FunctionType
 from operator import itemgetter
 
@@ -172,6 +175,163 @@ class TargetConf(SimpleMultiSrcConf, HideExekallID):
     }
 
 
+class _PythonAgent(Loggable):
+    """
+    Python interpreter kept alive on the target to execute functions for
+    :meth:`Target.execute_python_batch`.
+
+    Each batch of calls is sent as one line on the interpreter's stdin, and
+    the outputs are sent back as one line on its stdout, both encoded as
+    base64 pickles.
+
+    :param target: devlib target to run the interpreter on.
+    :type target: devlib.target.Target
+
+    :param as_root: Run the interpreter as root.
+    :type as_root: bool
+    """
+
+    SCRIPT = textwrap.dedent('''
+        import base64
+        import pickle
+        import sys
+
+        def run(code, global_vars):
+            try:
+                namespace = {}
+                exec(code, namespace)
+                out = eval(namespace['wrapper'].__code__, pickle.loads(global_vars))
+            except BaseException as e:
+                out = e
+                out_is_excep = True
+            else:
+                out_is_excep = False
+
+            try:
+                return (out_is_excep, pickle.dumps(out))
+            except BaseException as e:
+                return (True, pickle.dumps(ValueError('Could not pickle function output: {}'.format(e))))
+
+        def main():
+            stdin = sys.stdin.buffer
+            stdout = sys.stdout.buffer
+            # Anything printed by the functions must not end up in the replies
+            sys.stdout = sys.stderr
+
+            for line in stdin:
+                outputs = []
+                for code, global_vars in pickle.loads(base64.b64decode(line)):
+                    out_is_excep, out = run(code, global_vars)
+                    outputs.append((out_is_excep, out))
+                    if out_is_excep:
+                        break
+
+                stdout.write(base64.b64encode(pickle.dumps(outputs)) + b'\\n')
+                stdout.flush()
+
+        main()
+    ''')
+
+    STARTUP_TIMEOUT = 30
+    """
+    Time allowed to the interpreter to reply to the first request.
+    """
+
+    def __init__(self, target, as_root=False):
+        self.as_root = as_root
+        self._lock = threading.Lock()
+        self._cmd = ' '.join(map(shlex.quote, ['python3', '-c', self.SCRIPT]))
+        self._bg = target.background(
+            self._cmd,
+            stderr=subprocess.DEVNULL,
+            as_root=as_root,
+        )
+
+        try:
+            if self._bg.stdin is None:
+                raise ValueError('The connection does not provide a stdin stream for background commands')
+
+            # Check that requests can actually be delivered, since the
+            # interpreter's stdin could be consumed by e.g. "su"
+            self.call([], timeout=self.STARTUP_TIMEOUT)
+        except BaseException:
+            self.close()
+            raise
+
+    def call(self, calls, timeout=None):
+        """
+        Execute a batch of calls.
+
+        :param calls: List of ``(code, global_vars)`` as returned by
+            :meth:`Target._make_remote_wrapper`.
+        :type calls: list(tuple(str, bytes))
+
+        :param timeout: Timeout in seconds for the whole batch. The agent is
+            killed when it expires.
+        :type timeout: int or None
+
+        :returns: List of ``(out_is_excep, out)`` where ``out`` is the pickled
+            value returned or exception raised by the function. It is shorter
+            than ``calls`` if a function raised an exception.
+        """
+        bg = self._bg
+        timed_out = threading.Event()
+
+        def cancel():
+            timed_out.set()
+            bg.cancel()
+
+        request = base64.b64encode(pickle.dumps(calls)) + b'\n'
+        with self._lock:
+            if timeout is None:
+                timer = None
+            else:
+                timer = threading.Timer(timeout, cancel)
+                timer.daemon = True
+                timer.start()
+
+            try:
+                bg.stdin.write(request)
+                bg.stdin.flush()
+                reply = bg.stdout.readline()
+            except OSError:
+                reply = b''
+            finally:
+                if timer is not None:
+                    timer.cancel()
+
+        if timed_out.is_set():
+            raise devlib.exception.TimeoutError(self._cmd, None)
+        elif not reply:
+            raise TargetStableError(f'Remote Python agent exited unexpectedly with code: {bg.poll()}')
+        else:
+            return pickle.loads(base64.b64decode(reply))
+
+    def _close_stdin(self):
+        try:
+            self._bg.stdin.close()
+        except Exception: # pylint: disable=broad-except
+            pass
+
+    def close(self):
+        """
+        Terminate the agent.
+        """
+        self._close_stdin()
+        bg = self._bg
+        bg.cancel()
+        bg.close()
+
+    # Ideally, that should not be relied upon but this will terminate the agent
+    # when the Target it belongs to is garbage collected. Only stdin is closed
+    # since the agent exits on EOF: cancelling the devlib background command
+    # from the garbage collector could deadlock.
+    def __del__(self):
+        # __init__ might have failed before starting the background command
+        if hasattr(self, '_bg'):
+            self._close_stdin()
+
+
 class Target(Loggable, HideExekallID, ExekallTaggable, Configurable):
     """
     Wrap :class:`devlib.target.Target` to provide additional features on top of
@@ -287,6 +447,7 @@ class Target(Loggable, HideExekallID, ExekallTaggable, Configurable):
         use_scp = devlib_file_xfer == 'scp'
 
         self._installed_tools = set()
+        self._python_agents = {}
         self.target = self._init_target(
             kind=kind,
             name=name,
@@ -840,6 +1001,10 @@ class Target(Loggable, HideExekallID, ExekallTaggable, Configurable):
 
                 @contextlib.contextmanager
                 def cm():
+                    # The remote Python agents would be frozen as well, so
+                    # let execute_python() start new ones if needed.
+                    self._close_python_agents()
+
                     logger.info(f"Freezing all tasks except: {','.join(exclude)}")
                     try:
                         yield self.cgroups.freeze(exclude)
@@ -882,7 +1047,11 @@ class Target(Loggable, HideExekallID, ExekallTaggable, Configurable):
         return {'board': self.name}
 
     @classmethod
-    def _make_remote_snippet(cls, name, code_str, module, kwargs, global_vars, out_tempfiles):
+    def _make_remote_wrapper(cls, name, code_str, module, kwargs, global_vars):
+        """
+        Create the source of a ``wrapper()`` function calling ``name``, along
+        with the pickled globals it needs to be evaluated with.
+        """
         # Inject the parameters inside the wrapper's globals so that it can
         # access them. It's harmless as they would shadow any global name
         # anyway, and it's restricted to the wrapper using eval()
@@ -954,15 +1123,38 @@ class Target(Loggable, HideExekallID, ExekallTaggable, Configurable):
         else:
             modules = ''
 
-        script = textwrap.dedent('''
-            import pickle
-            import sys
-
+        wrapper = textwrap.dedent('''
             def wrapper():
                 {modules}
 
                 {code}
                 return {f}({kwargs})
+        ''').format(
+            f=name,
+            code=textwrap.dedent(code_str).replace('\n', '\n' + ' ' * 4),
+            modules=modules,
+            kwargs=', '.join(
+                f'{name}={name}'
+                for name in kwargs.keys()
+            )
+        )
+        return (wrapper, pickle.dumps(global_vars))
+
+    @classmethod
+    def _make_remote_snippet(cls, name, code_str, module, kwargs, global_vars, out_tempfiles):
+        wrapper, global_vars = cls._make_remote_wrapper(
+            name=name,
+            code_str=code_str,
+            module=module,
+            kwargs=kwargs,
+            global_vars=global_vars,
+        )
+
+        script = textwrap.dedent('''
+            import pickle
+            import sys
+
+            {wrapper}
 
             try:
                 out = eval(wrapper.__code__, pickle.loads({globals}))
@@ -978,15 +1170,9 @@ class Target(Loggable, HideExekallID, ExekallTaggable, Configurable):
             with open(out_tempfile, 'wb') as f:
                 f.write(out)
         ''').format(
-            f=name,
-            code=textwrap.dedent(code_str).replace('\n', '\n' + ' ' * 4),
-            modules=modules,
+            wrapper=wrapper,
             out_tempfiles=repr(out_tempfiles),
-            globals=repr(pickle.dumps(global_vars)),
-            kwargs=', '.join(
-                f'{name}={name}'
-                for name in kwargs.keys()
-            )
+            globals=repr(global_vars),
         )
         return script
 
@@ -1004,6 +1190,63 @@ class Target(Loggable, HideExekallID, ExekallTaggable, Configurable):
         name = f.__name__
         return (name, code_str)
 
+    @classmethod
+    def _get_python_call(cls, f, args, kwargs):
+        """
+        Get the parameters of :meth:`_make_remote_wrapper` to call ``f`` with
+        the given arguments.
+        """
+        sig = inspect.signature(f)
+        kwargs = sig.bind(*args, **kwargs).arguments
+        closure_vars = inspect.getclosurevars(f)
+
+        name, code_str = cls._get_code(f)
+        return dict(
+            name=name,
+            code_str=code_str,
+            module=f.__module__,
+            kwargs=kwargs,
+            global_vars={
+                **closure_vars.globals,
+                **closure_vars.nonlocals,
+            },
+        )
+
+    def _get_python_agent(self, as_root):
+        """
+        Get the :class:`_PythonAgent` running with the given ``as_root``
+        value, or ``None`` if it could not be started.
+        """
+        agents = self._python_agents
+        try:
+            return agents[as_root]
+        except KeyError:
+            try:
+                agent = _PythonAgent(self.target, as_root=as_root)
+            except Exception as e: # pylint: disable=broad-except
+                self.get_logger().debug(f'Could not start remote Python agent, one interpreter will be spawned for each function call: {e}')
+                agent = None
+
+            agents[as_root] = agent
+            return agent
+
+    def _close_python_agents(self):
+        """
+        Terminate the running :class:`_PythonAgent`.
+
+        They will be restarted on-demand by :meth:`execute_python`.
+        """
+        agents = self._python_agents
+        # Remember the agents that could not be started
+        self._python_agents = {
+            as_root: agent
+            for as_root, agent in agents.items()
+            if agent is None
+        }
+        for agent in agents.values():
+            if agent is not None:
+                agent.close()
+
     def execute_python(self, f, args, kwargs, **execute_kwargs):
         """
         Executes the given Python function ``f`` with the provided positional
@@ -1024,13 +1267,86 @@ class Target(Loggable, HideExekallID, ExekallTaggable, Configurable):
                   installed on the target and that this module is in scope. If
                   that is not the case, a :exc:`NameError` will be raised.
 
+        .. note:: If only ``as_root`` and ``timeout`` keyword arguments are
+            used, the function is executed by a Python interpreter started
+            once and kept alive on the target, which saves a number of round
+            trips. Global state of the modules imported by the function is
+            therefore shared across calls.
+
         .. attention:: Decorators are ignored and not applied.
         """
-        sig = inspect.signature(f)
-        kwargs = sig.bind(*args, **kwargs).arguments
-        closure_vars = inspect.getclosurevars(f)
+        return self.execute_python_batch([(f, args, kwargs)], **execute_kwargs)[0]
+
+    def execute_python_batch(self, calls, **execute_kwargs):
+        """
+        Executes a list of Python functions in order, in as few round trips to
+        the target as possible.
+
+        :param calls: List of ``(f, args, kwargs)`` tuples. See
+            :meth:`execute_python` for the meaning of each item.
+        :type calls: list(tuple(collections.abc.Callable, tuple, dict))
+
+        :Variable keyword arguments: Forwarded to :meth:`execute` that
+            will spawn the Python interpreter on the target. If the
+            persistent interpreter is used, ``timeout`` applies to the whole
+            batch.
 
-        name, code_str = self._get_code(f)
+        :returns: List of the values returned by each function.
+
+        .. note:: If one of the functions raises an exception, the remaining
+            calls are not executed and the exception is raised in the host
+            caller.
+        """
+        calls = [
+            self._get_python_call(f, args, kwargs)
+            for f, args, kwargs in calls
+        ]
+
+        if set(execute_kwargs.keys()) <= {'as_root', 'timeout'}:
+            agent = self._get_python_agent(
+                as_root=execute_kwargs.get('as_root', False),
+            )
+        else:
+            agent = None
+
+        if agent is None:
+            return [
+                self._execute_python_snippet(call, **execute_kwargs)
+                for call in calls
+            ]
+        else:
+            try:
+                outputs = agent.call(
+                    [
+                        self._make_remote_wrapper(**call)
+                        for call in calls
+                    ],
+                    timeout=execute_kwargs.get('timeout'),
+                )
+            # The agent cannot be trusted anymore, so it will be restarted on
+            # the next call
+            except BaseException:
+                self._python_agents.pop(agent.as_root, None)
+                agent.close()
+                raise
+
+            res = []
+            for out_is_excep, out in outputs:
+                out = pickle.loads(out)
+                if out_is_excep:
+                    raise out
+                else:
+                    res.append(out)
+            return res
+
+    def _execute_python_snippet(self, call, **execute_kwargs):
+        """
+        Execute a function in a new Python interpreter.
+
+        :param call: Parameters of :meth:`_make_remote_snippet`, except for
+            ``out_tempfiles``.
+        :type call: dict
+        """
 
         def mktemp():
             return self.execute(
@@ -1065,14 +1381,7 @@ class Target(Loggable, HideExekallID, ExekallTaggable, Configurable):
         try:
             out_tempfiles = (mktemp(), mktemp())
             snippet = self._make_remote_snippet(
-                name=name,
-                code_str=code_str,
-                module=f.__module__,
-                kwargs=kwargs,
-                global_vars={
-                    **closure_vars.globals,
-                    **closure_vars.nonlocals,
-                },
+                **call,
                 out_tempfiles=out_tempfiles
             )
             cmd = ['python3', '-c', snippet]
@@ -1593,9 +1593,7 @@ class RTATestBundle(FtraceTestBundle, DmesgTestBundle):
         )
 
         # Get rid of the buffer phase we don't care about
-        phase_start_df = phase_start_df[
-            phase_start_df['properties'].transform(lambda props: props['meta']['from_test'])
-        ]
+        phase_start_df = phase_start_df[phase_start_df['from_test']]
 
         rta_start = phase_start_df.apply(get_first_switch, axis=1).min()
 
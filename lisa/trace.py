@@ -19,9 +19,11 @@
 
 import shutil
 import uuid
-import sys
+import mmap
+import struct
+import array
+import bisect
 import re
-import gc
 import math
 import abc
 import copy
@@ -33,27 +35,32 @@ import inspect
 import shlex
 import contextlib
 import tempfile
-from functools import lru_cache, wraps
+import hashlib
+import fcntl
+from functools import lru_cache, wraps, partial
 from collections.abc import Set, Mapping, Sequence
-from collections import namedtuple
+from collections import namedtuple, deque
 from operator import itemgetter, attrgetter
 from numbers import Number, Integral, Real
 import multiprocessing
 import textwrap
 import subprocess
 import itertools
+import heapq
 
 import numpy as np
 import pandas as pd
 from pandas.api.types import is_numeric_dtype
 import pyarrow.lib
+import pyarrow.feather
+import pyarrow.ipc
 
 import devlib
 
 from lisa.utils import Loggable, HideExekallID, memoized, lru_memoized, deduplicate, take, deprecate, nullcontext, measure_time, checksum, newtype, groupby, PartialInit, kwargs_forwarded_to, kwargs_dispatcher, ComposedContextManager
 from lisa.conf import SimpleMultiSrcConf, KeyDesc, TopLevelKeyDesc, Configurable
 from lisa.generic import TypedList
-from lisa.datautils import df_window, df_window_signals, SignalDesc, df_add_delta, series_convert, df_deduplicate, df_update_duplicates
+from lisa.datautils import df_window, df_window_signals, SignalDesc, df_add_delta, series_convert, df_deduplicate, df_update_duplicates, df_make_empty_clone
 from lisa.version import VERSION_TOKEN
 from lisa.typeclass import FromString, IntListFromStringInstance
 
@@ -171,6 +178,12 @@ class MissingMetadataError(KeyError):
         return f'Missing metadata: {self.metadata}'
 
 
+class _NoEventLinesError(ValueError):
+    """
+    Raised by text trace parsers when none of the lines contain an event.
+    """
+
+
 class TraceParserBase(abc.ABC, Loggable, PartialInit):
     """
     Abstract Base Class for trace parsers.
@@ -287,6 +300,22 @@ class TraceParserBase(abc.ABC, Loggable, PartialInit):
             if df is not None
         }
 
+    def close(self):
+        """
+        Release the resources held by the parser, such as open files.
+
+        The parser cannot be used anymore after that. It can also be used as
+        a context manager, in which case it will be closed when exiting the
+        ``with`` statement.
+        """
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args, **kwargs):
+        self.close()
+
 
 class MockTraceParser(TraceParserBase):
     """
@@ -677,6 +706,24 @@ class TxtTraceParserBase(TraceParserBase):
     :param pre_filled_metadata: Metadata pre-filled by the caller of the
         constructor.
     :type pre_filled_metadata: dict(str, object) or None
+
+    :param nr_processes: Number of processes used to parse the lines. When
+        greater than 1, the lines are split in chunks of roughly
+        :attr:`PARALLEL_CHUNK_SIZE` bytes that are parsed concurrently for all
+        the requested events, and the resulting dataframes are then merged.
+        Timestamps deduplication gives the same result as a sequential parse.
+    :type nr_processes: int
+
+    :param prev_time: Timestamp of the last event preceding ``lines``, when
+        they are the continuation of a stream that has already been parsed.
+        It is used so that timestamps stay deduplicated across both parts.
+    :type prev_time: float
+    """
+
+    PARALLEL_CHUNK_SIZE = 16 * 1024 * 1024
+    """
+    Size in bytes of the chunks of lines handed to each worker when parsing
+    with ``nr_processes > 1``.
     """
 
     _KERNEL_DTYPE = {
@@ -742,9 +789,10 @@ class TxtTraceParserBase(TraceParserBase):
         event_parsers=None,
         default_event_parser_cls=None,
         pre_filled_metadata=None,
+        nr_processes=1,
+        prev_time=0,
     ):
         super().__init__(events, needed_metadata=needed_metadata)
-        self._pre_filled_metadata = pre_filled_metadata or {}
         events = set(events or [])
 
         default_event_parser_cls, event_parsers = self._resolve_event_parsers(event_parsers, default_event_parser_cls)
@@ -761,13 +809,32 @@ class TxtTraceParserBase(TraceParserBase):
         need_fields = (events != event_parsers.keys())
         skeleton_regex = self._get_skeleton_regex(need_fields)
 
-        events_df, skeleton_df, time_range, available_events = self._eagerly_parse_lines(
-            lines=lines,
+        parse_kwargs = dict(
             skeleton_regex=skeleton_regex,
             event_parsers=event_parsers,
             events=events,
+            prev_time=prev_time,
         )
+        if nr_processes > 1:
+            parsed = self._parallel_parse_lines(
+                lines=lines,
+                nr_processes=nr_processes,
+                **parse_kwargs,
+            )
+        else:
+            parsed = self._eagerly_parse_lines(lines=lines, **parse_kwargs)
 
+        events_df, skeleton_df, time_range, available_events = parsed
+
+        # This should have been set on the first line.
+        # Note: we don't raise the exception if no events were asked for, to
+        # allow creating dummy parsers without any line
+        if time_range[0] is None and events:
+            raise _NoEventLinesError('No lines containing events have been found')
+
+        # Only set after parsing, so that the (potentially large) metadata
+        # does not need to be sent to the worker processes
+        self._pre_filled_metadata = pre_filled_metadata or {}
         self._events_df = events_df
         # If the time range is not needed, the time range we computed might be
         # wrong, so just remove it
@@ -885,13 +952,17 @@ class TxtTraceParserBase(TraceParserBase):
             index=index,
         )
 
-    def _eagerly_parse_lines(self, lines, skeleton_regex, event_parsers, events, time=None):
+    def _eagerly_parse_lines(self, lines, skeleton_regex, event_parsers, events, time=None, prev_time=0):
         """
         Filter the lines to select the ones with events.
 
         Also eagerly parse events from them to avoid the extra memory
         consumption from line storage, and to speed up parsing by acting as a
         pipeline on lazy lines stream.
+
+        :param prev_time: Timestamp of the line preceding ``lines``, used for
+            timestamps deduplication when parsing a chunk of a larger stream.
+        :type prev_time: float
         """
 
         # Recompile all regex so that they work on bytes rather than strings.
@@ -951,7 +1022,7 @@ class TxtTraceParserBase(TraceParserBase):
         groups = self._RE_MATCH_CLS.groups
         nextafter = np.nextafter
         inf = math.inf
-        line_time = 0
+        line_time = prev_time
         parse_time = '__timestamp' in skeleton_regex.groupindex.keys()
 
         for line in lines:
@@ -1011,12 +1082,6 @@ class TxtTraceParserBase(TraceParserBase):
             except KeyError:
                 available_events.add(event)
 
-        # This should have been set on the first line.
-        # Note: we don't raise the exception if no events were asked for, to
-        # allow creating dummy parsers without any line
-        if begin_time is None and events:
-            raise ValueError('No lines containing events have been found')
-
         end_time = line_time
         available_events.update(
             event
@@ -1056,6 +1121,148 @@ class TxtTraceParserBase(TraceParserBase):
         available_events = {event.decode('ascii') for event in available_events}
         return (events_df, skeleton_df, (begin_time, end_time), available_events)
 
+    @classmethod
+    def _iter_chunks(cls, lines):
+        """
+        Split ``lines`` into :class:`bytes` chunks of roughly
+        :attr:`PARALLEL_CHUNK_SIZE`, only cutting at line boundaries.
+        """
+        chunk_size = cls.PARALLEL_CHUNK_SIZE
+
+        # File-like objects can be read by blocks without having to iterate
+        # over each line in the parent process
+        if hasattr(lines, 'read'):
+            while True:
+                chunk = lines.read(chunk_size)
+                if chunk:
+                    yield chunk + lines.readline()
+                else:
+                    break
+        else:
+            chunk = []
+            size = 0
+            for line in lines:
+                chunk.append(line)
+                size += len(line)
+                if size >= chunk_size:
+                    yield b'\n'.join(chunk)
+                    chunk = []
+                    size = 0
+
+            if chunk:
+                yield b'\n'.join(chunk)
+
+    def _parse_lines_chunk(self, chunk, prev_time=0, **kwargs):
+        return self._eagerly_parse_lines(
+            lines=chunk.splitlines(),
+            prev_time=prev_time,
+            **kwargs
+        )
+
+    def _parallel_parse_lines(self, lines, nr_processes, prev_time=0, **kwargs):
+        """
+        Same as :meth:`_eagerly_parse_lines` but splits the lines in chunks
+        that are parsed by a pool of ``nr_processes`` workers.
+
+        Each chunk is parsed independently, so the timestamp deduplication of
+        a chunk can only be trusted if its first timestamp is strictly greater
+        than the last (deduplicated) timestamp of the previous chunk. Chunks
+        for which that is not the case are parsed again in the current process
+        with the correct initial timestamp, so that the result is identical to
+        a sequential parse.
+        """
+        worker = partial(self._parse_lines_chunk, **kwargs)
+        # Keep a bounded number of chunks in flight, so that the whole text is
+        # not buffered in memory if the workers are slower than the producer
+        max_in_flight = 2 * nr_processes
+
+        def merge_chunks(results, prev_time):
+            for chunk, result in results:
+                _, _, (begin_time, end_time), _ = result
+                if begin_time is not None and begin_time <= prev_time:
+                    result = worker(chunk, prev_time=prev_time)
+                    _, _, (begin_time, end_time), _ = result
+
+                # A chunk without any event reports the prev_time it was
+                # parsed with, which is not the one of the previous chunk
+                if begin_time is not None:
+                    prev_time = end_time
+                yield result
+
+        def parse(pool):
+            in_flight = deque()
+            for chunk in self._iter_chunks(lines):
+                if len(in_flight) >= max_in_flight:
+                    _chunk, res = in_flight.popleft()
+                    yield (_chunk, res.get())
+
+                in_flight.append((chunk, pool.apply_async(worker, (chunk,))))
+
+            for chunk, res in in_flight:
+                yield (chunk, res.get())
+
+        with multiprocessing.Pool(processes=nr_processes) as pool:
+            results = list(merge_chunks(parse(pool), prev_time))
+
+        return self._merge_parsed_chunks(kwargs['event_parsers'], results, prev_time=prev_time)
+
+    def _merge_parsed_chunks(self, event_parsers, results, prev_time=0):
+        """
+        Merge the values returned by :meth:`_eagerly_parse_lines` on
+        consecutive chunks of lines.
+
+        :param prev_time: Timestamp preceding the first chunk, used as the end
+            of the time range if no chunk contains any event.
+        :type prev_time: float
+        """
+        def concat(df_list):
+            # Empty dataframes do not have the timestamp as index, so they
+            # cannot be concatenated with the others
+            non_empty = [df for df in df_list if not df.empty]
+            if not non_empty:
+                return df_list[0]
+            elif len(non_empty) == 1:
+                return non_empty[0]
+            else:
+                return pd.concat(non_empty, copy=False)
+
+        events_df_list, skeleton_df_list, time_ranges, available_events_list = zip(*results)
+
+        events_df = {}
+        for event, parser in event_parsers.items():
+            df_list = [dfs[event] for dfs in events_df_list if event in dfs]
+            if df_list:
+                df = concat(df_list)
+                # Inferred dtypes might differ between chunks, in which case the
+                # concatenated column needs to be converted again
+                mismatching = [
+                    col
+                    for col in df.columns
+                    if len({str(_df[col].dtype) for _df in df_list if not _df.empty}) > 1
+                ]
+                if mismatching:
+                    df[mismatching] = self._postprocess_df(event, parser, df[mismatching].copy())
+                events_df[event] = df
+
+        skeleton_df = concat(skeleton_df_list)
+        # Categories differ between chunks so the concatenated column is not a
+        # category anymore
+        skeleton_df['__event'] = skeleton_df['__event'].astype('category', copy=False)
+
+        # Chunks without any event report the prev_time they were parsed with
+        # rather than the end of the previous chunk, so ignore them
+        time_ranges = [
+            (begin, end)
+            for begin, end in time_ranges
+            if begin is not None
+        ]
+        if time_ranges:
+            time_range = (time_ranges[0][0], time_ranges[-1][1])
+        else:
+            time_range = (None, prev_time)
+        available_events = set(itertools.chain.from_iterable(available_events_list))
+        return (events_df, skeleton_df, time_range, available_events)
+
     def _lazyily_parse_event(self, event, parser, df):
         # Only parse the lines that have a chance to match
         df = df[df['__event'] == event.encode('ascii')]
@@ -1885,6 +2092,600 @@ class SysTraceParser(HRTxtTraceParser):
         return super().from_txt_file(*args, **kwargs)
 
 
+class DatTraceParser(TraceParserBase):
+    """
+    Binary parser for ``trace.dat`` files created by ``trace-cmd`` (file
+    format version 6).
+
+    The ring buffer pages are decoded directly using the event format
+    descriptions stored in the file, without going through the text output of
+    ``trace-cmd report``.
+
+    :param path: Path to the ``trace.dat`` file.
+    :type path: str
+
+    :param events: List of events that will be available using
+        :meth:`~TraceParserBase.parse_event`.
+    :type events: list(str)
+
+    :param needed_metadata: Set of metadata name to gather in the parser.
+    :type needed_metadata: collections.abc.Iterable(str)
+
+    :param nr_processes: Number of processes used to decode the per-CPU ring
+        buffers.
+    :type nr_processes: int
+
+    The resulting dataframes follow what :class:`TxtTraceParser` would give,
+    including the global timestamps deduplication and the dtypes of
+    the fields described in :attr:`TxtTraceParser.EVENT_DESCS`. Events that
+    cannot be decoded from their binary representation, such as ``bprint``
+    whose content needs to be interpolated in a format string, are parsed using
+    :meth:`TxtTraceParser.from_dat`.
+    """
+
+    _MAGIC = b'\x17\x08Dtracing'
+    _SUPPORTED_VERSIONS = {b'6'}
+
+    _TXT_EVENTS = {
+        event
+        for event, desc in TxtTraceParser.EVENT_DESCS.items()
+        if (
+            # print and bputs can be decoded by resolving pointers
+            event not in ('print', 'bputs') and
+            not (desc.raw if isinstance(desc, EventParserBase) else desc.get('raw', True))
+        )
+    }
+    """
+    Events parsed with :class:`TxtTraceParser`.
+    """
+
+    # Ring buffer record types, see include/linux/ring_buffer.h
+    _RB_TYPE_DATA_MAX = 28
+    _RB_TYPE_PADDING = 29
+    _RB_TYPE_TIME_EXTEND = 30
+    _RB_TYPE_TIME_STAMP = 31
+    _RB_TS_SHIFT = 27
+    _RB_TS_MSB = ~((1 << 59) - 1)
+    _RB_COMMIT_MASK = (1 << 27) - 1
+
+    # trace-cmd option IDs adding an offset to the timestamps
+    _OPTION_DATE = 1
+    _OPTION_OFFSET = 7
+
+    _FIELD_REGEX = re.compile(
+        r'field:(?P<decl>[^;]+);\s*offset:(?P<offset>\d+);\s*size:(?P<size>\d+);(?:\s*signed:(?P<signed>\d+);)?'
+    )
+    _DECL_REGEX = re.compile(r'(?P<type>.*?)\s*(?P<name>\w+)\s*(?:\[(?P<array>[^\]]*)\])?$')
+
+    def __init__(self, path, events, needed_metadata=None, nr_processes=1):
+        super().__init__(events, needed_metadata=needed_metadata)
+        events = set(events)
+
+        with open(path, 'rb') as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        self._path = path
+        self._txt_parser = None
+        try:
+            self._read_headers()
+
+            txt_events = events & self._TXT_EVENTS
+            if txt_events:
+                self._txt_parser = TxtTraceParser.from_dat(
+                    path=path,
+                    events=txt_events,
+                )
+
+            self._events = events - txt_events
+            self._records = self._read_records(nr_processes)
+        except BaseException:
+            self.close()
+            raise
+
+    @classmethod
+    def _read_cstring(cls, mm, pos):
+        end = mm.find(b'\0', pos)
+        return (mm[pos:end], end + 1)
+
+    def _read_headers(self):
+        mm = self._mm
+        magic = self._MAGIC
+        if mm[:len(magic)] != magic:
+            raise ValueError(f'Not a trace.dat file: {self._path}')
+
+        pos = len(magic)
+        version, pos = self._read_cstring(mm, pos)
+        if version not in self._SUPPORTED_VERSIONS:
+            raise ValueError(f'Unsupported trace.dat file version {version.decode()}: {self._path}')
+
+        endian = '>' if mm[pos] else '<'
+        # Skip the endianness and size of long
+        pos += 2
+
+        def read(fmt):
+            nonlocal pos
+            fmt = endian + fmt
+            x, = struct.unpack_from(fmt, mm, pos)
+            pos += struct.calcsize(fmt)
+            return x
+
+        def read_section(size_fmt):
+            nonlocal pos
+            size = read(size_fmt)
+            data = mm[pos:pos + size]
+            pos += size
+            return data.decode('utf-8', errors='replace')
+
+        def read_label():
+            nonlocal pos
+            label, pos = self._read_cstring(mm, pos)
+            return label.decode('ascii').strip()
+
+        self._endian = endian
+        self._page_size = read('I')
+
+        assert read_label() == 'header_page'
+        header_page = self._parse_format(read_section('Q'))
+        assert read_label() == 'header_event'
+        read_section('Q')
+
+        formats = [
+            self._parse_format(read_section('Q'))
+            for _ in range(read('I'))
+        ]
+        for _ in range(read('I')):
+            read_label()
+            formats.extend(
+                self._parse_format(read_section('Q'))
+                for _ in range(read('I'))
+            )
+
+        kallsyms = read_section('I')
+        printk_formats = read_section('I')
+        cmdlines = read_section('Q')
+        self._cpus_count = read('I')
+
+        ts_offset = 0
+        label = read_label()
+        if label == 'options':
+            while True:
+                option_id = read('H')
+                if option_id == 0:
+                    break
+                option = read_section('I')
+                if option_id in (self._OPTION_DATE, self._OPTION_OFFSET):
+                    ts_offset += int(option.strip('\0').strip(), 0)
+            label = read_label()
+
+        if label != 'flyrecord':
+            raise ValueError(f'Unsupported trace.dat data section "{label}": {self._path}')
+
+        self._ts_offset = ts_offset
+        self._cpu_buffers = [
+            (read('Q'), read('Q'))
+            for _ in range(self._cpus_count)
+        ]
+
+        header_page = {
+            field['name']: field
+            for field in header_page['fields']
+        }
+        self._page_commit = (header_page['commit']['offset'], {4: 'I', 8: 'Q'}[header_page['commit']['size']])
+        self._page_data_offset = header_page['data']['offset']
+
+        self._formats = {
+            fmt['name']: fmt
+            for fmt in formats
+            if 'name' in fmt
+        }
+        self._formats_by_id = {
+            fmt['id']: fmt
+            for fmt in formats
+            if 'id' in fmt
+        }
+
+        def parse_kallsyms(line):
+            addr, _, name = line.split(maxsplit=2)
+            return (int(addr, base=16), name.strip())
+
+        self._kallsyms = dict(
+            parse_kallsyms(line)
+            for line in kallsyms.splitlines()
+            if line.strip()
+        )
+
+        def parse_printk(line):
+            addr, fmt = line.split(':', 1)
+            fmt = fmt.strip()
+            if fmt.startswith('"') and fmt.endswith('"'):
+                fmt = fmt[1:-1]
+            return (int(addr.strip(), base=16), fmt)
+
+        self._printk_formats = dict(
+            parse_printk(line)
+            for line in printk_formats.splitlines()
+            if ':' in line
+        )
+
+        def parse_cmdline(line):
+            pid, comm = line.split(' ', 1)
+            return (int(pid), comm)
+
+        self._cmdlines = dict(
+            parse_cmdline(line)
+            for line in cmdlines.splitlines()
+            if line.strip()
+        )
+
+    @classmethod
+    def _parse_format(cls, fmt):
+        desc = {}
+        fields = []
+        for line in fmt.splitlines():
+            line = line.strip()
+            if line.startswith('name:'):
+                desc['name'] = line.split(':', 1)[1].strip()
+            elif line.startswith('ID:'):
+                desc['id'] = int(line.split(':', 1)[1])
+            elif line.startswith('field'):
+                match = cls._FIELD_REGEX.search(line)
+                if match:
+                    decl = cls._DECL_REGEX.match(match.group('decl').strip())
+                    fields.append(dict(
+                        name=decl.group('name'),
+                        type=decl.group('type'),
+                        array=decl.group('array'),
+                        offset=int(match.group('offset')),
+                        size=int(match.group('size')),
+                        signed=bool(int(match.group('signed') or 0)),
+                    ))
+
+        desc['fields'] = fields
+        return desc
+
+    @classmethod
+    def _read_cpu_records(cls, path, offset, size, page_size, page_commit, page_data_offset, endian):
+        """
+        Decode the records of one CPU ring buffer.
+
+        :returns: A tuple of arrays ``(timestamp, payload offset, payload
+            length)`` of all the records in the buffer.
+        """
+        with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            ts_list = array.array('Q')
+            offset_list = array.array('Q')
+            length_list = array.array('Q')
+
+            # THIS LOOP IS THE MOST PERFORMANCE-SENSITIVE PART OF THAT CLASS,
+            # APPLY EXTREME CARE AND BENCHMARK WHEN MODIFYING
+            unpack_u32 = struct.Struct(endian + 'I').unpack_from
+            unpack_u64 = struct.Struct(endian + 'Q').unpack_from
+            commit_offset, commit_fmt = page_commit
+            unpack_commit = struct.Struct(endian + commit_fmt).unpack_from
+            append_ts = ts_list.append
+            append_offset = offset_list.append
+            append_length = length_list.append
+
+            if endian == '<':
+                type_len_shift = 0
+                delta_shift = 5
+            else:
+                type_len_shift = 27
+                delta_shift = 0
+
+            type_data_max = cls._RB_TYPE_DATA_MAX
+            type_padding = cls._RB_TYPE_PADDING
+            type_time_extend = cls._RB_TYPE_TIME_EXTEND
+            ts_shift = cls._RB_TS_SHIFT
+            ts_msb = cls._RB_TS_MSB
+            commit_mask = cls._RB_COMMIT_MASK
+            delta_mask = (1 << ts_shift) - 1
+
+            for page in range(offset, offset + size, page_size):
+                ts, = unpack_u64(mm, page)
+                pos = page + page_data_offset
+                end = pos + (unpack_commit(mm, page + commit_offset)[0] & commit_mask)
+
+                while pos < end:
+                    header, = unpack_u32(mm, pos)
+                    type_len = (header >> type_len_shift) & 0x1f
+                    delta = (header >> delta_shift) & delta_mask
+                    pos += 4
+
+                    if type_len == 0:
+                        length = unpack_u32(mm, pos)[0] - 4
+                        length = (length + 3) & ~3
+                        pos += 4
+                    elif type_len <= type_data_max:
+                        length = type_len * 4
+                    elif type_len == type_padding:
+                        # Null padding event: the rest of the page is empty
+                        if not delta:
+                            break
+                        ts += delta
+                        pos += unpack_u32(mm, pos)[0]
+                        continue
+                    else:
+                        delta += unpack_u32(mm, pos)[0] << ts_shift
+                        pos += 4
+                        if type_len == type_time_extend:
+                            ts += delta
+                        # Absolute timestamp
+                        else:
+                            ts = (ts & ts_msb) | delta
+                        continue
+
+                    ts += delta
+                    append_ts(ts)
+                    append_offset(pos)
+                    append_length(length)
+                    pos += length
+
+        return tuple(
+            np.frombuffer(x, dtype='uint64')
+            for x in (ts_list, offset_list, length_list)
+        )
+
+    def _read_records(self, nr_processes):
+        read = partial(
+            self._read_cpu_records,
+            self._path,
+            page_size=self._page_size,
+            page_commit=self._page_commit,
+            page_data_offset=self._page_data_offset,
+            endian=self._endian,
+        )
+
+        cpu_buffers = self._cpu_buffers
+        nr_processes = min(nr_processes, len(cpu_buffers))
+        if nr_processes > 1:
+            with multiprocessing.Pool(processes=nr_processes) as pool:
+                records = pool.starmap(read, cpu_buffers)
+        else:
+            records = list(itertools.starmap(read, cpu_buffers))
+
+        if records:
+            ts_list, offset_list, length_list = zip(*records)
+        else:
+            ts_list, offset_list, length_list = [[np.array([], dtype='uint64')]] * 3
+
+        cpu = np.repeat(
+            np.arange(len(ts_list), dtype='uint32'),
+            [len(ts) for ts in ts_list],
+        )
+        ts = np.concatenate(ts_list)
+        # Merge the buffers of all CPUs. A stable sort gives the same order as
+        # trace-cmd report for records with identical timestamps: by CPU
+        # number first, then by order of appearance in the buffer.
+        order = np.argsort(ts, kind='stable')
+        ts = ts[order] + self._ts_offset
+        cpu = cpu[order]
+        offset = np.concatenate(offset_list)[order]
+        length = np.concatenate(length_list)[order]
+
+        # Same as what TxtTraceParser would parse from the timestamp printed by
+        # trace-cmd report -t
+        time = ts / 1e9
+        # Global deduplication of timestamps, equivalent to the one done by
+        # TxtTraceParserBase._eagerly_parse_lines(). The integer view of
+        # positive floats preserves the ordering, and adding one to it
+        # is equivalent to np.nextafter(x, math.inf). The loop:
+        #     time[i] = max(time[i], time[i - 1] + 1)
+        # can then be written as a cumulative maximum:
+        #     time[i] - i = max(time[i] - i, time[i - 1] - (i - 1))
+        time_int = time.view('int64')
+        idx = np.arange(len(time_int), dtype='int64')
+        time = (np.maximum.accumulate(time_int - idx) + idx).view('float64')
+
+        common_fields = {
+            field['name']: field
+            for field in next(iter(self._formats_by_id.values()))['fields']
+        }
+        return dict(
+            time=time,
+            cpu=cpu,
+            offset=offset,
+            length=length,
+            id=self._decode_scalar(common_fields['common_type'], offset),
+            pid=self._decode_scalar(common_fields['common_pid'], offset),
+        )
+
+    def _gather(self, offset, size):
+        buf = np.frombuffer(self._mm, dtype='uint8')
+        idx = offset[:, None].astype('int64') + np.arange(size, dtype='int64')
+        return buf[idx]
+
+    def _decode_scalar(self, field, offset):
+        kind = 'i' if field['signed'] else 'u'
+        size = field['size']
+        dtype = np.dtype(f'{self._endian}{kind}{size}')
+        data = self._gather(offset + field['offset'], size)
+        return data.view(dtype).ravel().astype(dtype.newbyteorder('='), copy=False)
+
+    def _decode_field(self, field, offset, length):
+        """
+        Decode the values of the given event field.
+
+        :returns: A tuple ``(values, dtype)`` where ``values`` is either a
+            :class:`numpy.ndarray` or a list of :class:`bytes`, and ``dtype``
+            is the dtype to use for the column if no other is specified.
+        """
+        mm = self._mm
+        _type = field['type']
+        size = field['size']
+        field_offset = field['offset']
+        is_char = bool(re.search(r'\bchar\b', _type))
+
+        def cut(data):
+            return data.split(b'\0', 1)[0].rstrip(b'\n')
+
+        if _type.startswith('__data_loc'):
+            loc = self._decode_scalar(
+                dict(field, signed=False, size=4),
+                offset,
+            )
+            start = offset + (loc & 0xffff)
+            end = start + (loc >> 16)
+            values = [
+                cut(mm[s:e])
+                for s, e in zip(start.tolist(), end.tolist())
+            ]
+            return (values, 'string' if is_char else 'bytes')
+        elif field['array'] is not None or not size:
+            if size:
+                data = self._gather(offset + field_offset, size)
+                # Only decode each distinct value once, since char arrays are
+                # typically task names.
+                uniq, inverse = np.unique(data.view(f'S{size}').ravel(), return_inverse=True)
+                uniq = [cut(x) for x in uniq.tolist()]
+                values = [uniq[i] for i in inverse.tolist()]
+            # Dynamic array spanning until the end of the record
+            else:
+                start = offset + field_offset
+                end = offset + length
+                values = [
+                    cut(mm[s:e])
+                    for s, e in zip(start.tolist(), end.tolist())
+                ]
+            return (values, 'string' if is_char else 'bytes')
+        elif size in (1, 2, 4, 8):
+            values = self._decode_scalar(field, offset)
+            return (values, values.dtype.name)
+        else:
+            data = self._gather(offset + field_offset, size)
+            return ([bytes(x) for x in data], 'bytes')
+
+    def _resolve_pointers(self, values):
+        """
+        Resolve kernel pointers to the string they point to, or the name of
+        the symbol.
+        """
+        printk_formats = self._printk_formats
+        kallsyms = self._kallsyms
+        symbols_addr = sorted(kallsyms.keys())
+
+        def resolve(addr):
+            try:
+                string = printk_formats[addr]
+            except KeyError:
+                # Name of the function containing the address
+                i = bisect.bisect_right(symbols_addr, addr) - 1
+                if i >= 0:
+                    string = kallsyms[symbols_addr[i]]
+                else:
+                    string = hex(addr)
+            return string.encode('utf-8')
+
+        uniq, inverse = np.unique(values, return_inverse=True)
+        uniq = [resolve(addr) for addr in uniq.tolist()]
+        return [uniq[i] for i in inverse.tolist()]
+
+    def _get_event_fields(self, event):
+        desc = TxtTraceParser.EVENT_DESCS.get(event)
+        if desc is None:
+            return None
+        elif isinstance(desc, EventParserBase):
+            return desc.fields
+        else:
+            return desc['fields']
+
+    def parse_event(self, event):
+        if event in self._TXT_EVENTS and self._txt_parser is not None:
+            return self._txt_parser.parse_event(event)
+
+        try:
+            if event not in self._events:
+                raise KeyError(event)
+            fmt = self._formats[event]
+        except KeyError as e:
+            raise MissingTraceEventError([event]) from e
+
+        records = self._records
+        mask = records['id'] == fmt['id']
+        if not mask.any():
+            raise MissingTraceEventError([event])
+
+        offset = records['offset'][mask]
+        length = records['length'][mask]
+        pid = records['pid'][mask]
+
+        cmdlines = self._cmdlines
+        def get_comm(pid):
+            if pid == 0:
+                return '<idle>'
+            else:
+                return cmdlines.get(pid, '<...>')
+
+        data = {
+            '__comm': pd.Series(pid).map(get_comm).values,
+            '__pid': pid,
+            '__cpu': records['cpu'][mask],
+        }
+
+        fields = {
+            field['name']: field
+            for field in fmt['fields']
+            if not field['name'].startswith('common_')
+        }
+        fields_dtype = self._get_event_fields(event)
+        if fields_dtype is None:
+            fields_dtype = dict.fromkeys(fields.keys())
+        else:
+            fields_dtype = {
+                name: dtype
+                for name, dtype in fields_dtype.items()
+                if name in fields
+            }
+
+        for name, dtype in fields_dtype.items():
+            values, default_dtype = self._decode_field(fields[name], offset, length)
+            if dtype in ('string', 'bytes') and isinstance(values, np.ndarray):
+                values = self._resolve_pointers(values)
+            else:
+                dtype = dtype or default_dtype
+            fields_dtype[name] = dtype
+            data[name] = values
+
+        df = pd.DataFrame(
+            data,
+            index=pd.Index(records['time'][mask], name='__timestamp'),
+        )
+        parser = EventParserBase(event=event, fields=fields_dtype)
+        return TxtTraceParser._postprocess_df(event, parser, df)
+
+    def get_metadata(self, key):
+        if key == 'time-range':
+            time = self._records['time']
+            if len(time):
+                return (time[0], time[-1])
+        elif key == 'symbols-address':
+            # If we get only "0" as a key, that means kptr_restrict was in use
+            # and no useable address is available
+            if self._kallsyms and self._kallsyms.keys() != {0}:
+                return self._kallsyms
+        elif key == 'cpus-count':
+            return self._cpus_count
+        elif key == 'available-events':
+            formats = self._formats_by_id
+            available = {
+                formats[_id]['name']
+                for _id in np.unique(self._records['id']).tolist()
+                if _id in formats
+            }
+            if self._txt_parser is not None:
+                available |= self._txt_parser.get_metadata('available-events')
+            return available
+
+        return super().get_metadata(key)
+
+    def close(self):
+        # The decoded records are independent from the mapping, so only the
+        # fields decoded lazily by parse_event() need it
+        self._mm.close()
+        if self._txt_parser is not None:
+            self._txt_parser.close()
+
+
 class TrappyTraceParser(TraceParserBase):
     """
     Glue with :mod:`trappy` trace parsers.
@@ -2143,7 +2944,11 @@ class TraceView(Loggable, TraceBase):
 
       * :meth:`df_event` uses the underlying :meth:`lisa.trace.Trace.df_event`
         and trims the dataframe according to the given ``window`` before
-        returning it.
+        returning it. The trimmed dataframe is a positional slice of the one
+        cached by the base trace, with only the rows added by
+        ``signals_init`` materialized separately. It is not cached unless
+        ``write_swap=True`` is passed, so creating and querying many views is
+        cheap.
       * ``self.start`` and ``self.end`` mimic the :class:`Trace` attributes but
         they are adjusted to match the given window. On top of this, this class
         mimics a regular :class:`Trace` using :func:`getattr`.
@@ -2186,7 +2991,130 @@ class TraceView(Loggable, TraceBase):
             window = self.window
         kwargs['window'] = window
 
-        return self.base_trace.df_event(event, **kwargs)
+        # Only cache the windowed dataframe if we are explicitly asked to
+        # persist it
+        if window is None or kwargs.get('write_swap'):
+            return self.base_trace.df_event(event, **kwargs)
+        else:
+            signals = kwargs.pop('signals', None)
+            signals_init = kwargs.pop('signals_init', True)
+            compress_signals_init = kwargs.pop('compress_signals_init', False)
+            del kwargs['window']
+
+            df = self.base_trace.df_event(event, **kwargs)
+            signals = signals if signals else SignalDesc.from_event(event)
+            df = self._df_window(
+                df,
+                event=event,
+                window=window,
+                signals=signals if signals_init else [],
+                compress_signals_init=compress_signals_init,
+                raw=kwargs.get('raw'),
+            )
+            df.name = event
+            return df
+
+    def _df_window(self, df, event, window, signals, compress_signals_init, raw):
+        """
+        Equivalent to :func:`lisa.datautils.df_window_signals` that finds the
+        initial value of the signals using an index cached in the base trace,
+        rather than splitting the whole dataframe for each window.
+        """
+        windowed_df = df_window(df, window, method='pre')
+        if not signals or windowed_df.empty:
+            return windowed_df
+        # Not a supported use case of df_window_signals(), let it deal with it
+        elif window[0] is None:
+            return df_window_signals(df, window, signals, compress_init=compress_signals_init)
+
+        index = df.index
+        window_start = window[0]
+        start = index.searchsorted(windowed_df.index[0], side='left')
+        stop = start + len(windowed_df)
+        # First row strictly inside the window
+        after_start = start + windowed_df.index.searchsorted(window_start, side='right')
+        # The "pre" windowing may give one row before the start of the window
+        extra_pos = [start] if index[start] < window_start else []
+
+        init_pos = np.unique(np.concatenate([
+            np.array(extra_pos, dtype='int64'),
+            *(
+                self._get_signals_init_pos(
+                    df,
+                    event=event,
+                    fields=signal.fields,
+                    raw=raw,
+                    # Position of the last row at or before the start of the
+                    # window
+                    pos=after_start - 1,
+                )
+                for signal in signals
+            )
+        ]))
+        init_df = df.take(init_pos)
+        windowed_df = df.iloc[after_start:stop]
+
+        if compress_signals_init:
+            # Give the init rows timestamps as close as possible to the
+            # beginning of the window, without creating duplicates
+            try:
+                ts = windowed_df.index[0]
+            except IndexError:
+                ts = index[extra_pos[-1]]
+
+            init_index = []
+            for _ in range(len(init_df)):
+                ts = np.nextafter(ts, -math.inf)
+                init_index.append(ts)
+            init_df.index = pd.Index(init_index[::-1], dtype='float64')
+
+        return pd.concat([init_df, windowed_df])
+
+    def _get_signals_init_pos(self, df, event, fields, raw, pos):
+        """
+        Positions in ``df`` of the last row of each signal identified by
+        ``fields`` at or before position ``pos``.
+
+        The rows of each signal are indexed once in the cache of the base
+        trace, by sorting their ``signal_code * len(df) + position`` keys.
+        """
+        base_trace = self.base_trace
+        pd_desc = PandasDataDesc.from_kwargs(
+            event=event,
+            raw=raw,
+            trace_state=base_trace.trace_state,
+            signal_index=list(fields),
+        )
+        nr_rows = len(df)
+        try:
+            keys = base_trace._cache.fetch(pd_desc)['key'].to_numpy()
+        except KeyError:
+            with measure_time() as measure:
+                if fields:
+                    codes = df.groupby(list(fields), observed=True, sort=False).ngroup()
+                    # Rows with a NaN in the fields are not part of any signal
+                    codes = codes.fillna(-1).to_numpy(dtype='int64')
+                else:
+                    codes = np.zeros(nr_rows, dtype='int64')
+                positions = np.arange(nr_rows, dtype='int64')
+                keys = codes * nr_rows + positions
+                keys = np.sort(keys[codes >= 0])
+
+            base_trace._cache.insert(
+                pd_desc,
+                pd.DataFrame(dict(key=keys)),
+                compute_cost=measure.exclusive_delta,
+            )
+
+        if not len(keys):
+            return np.array([], dtype='int64')
+
+        nr_signals = keys[-1] // nr_rows + 1
+        signal_codes = np.arange(nr_signals)
+        idx = np.searchsorted(keys, signal_codes * nr_rows + pos + 1) - 1
+        found = keys[idx.clip(min=0)]
+        valid = (idx >= 0) & (found // nr_rows == signal_codes)
+        return found[valid] % nr_rows
 
     def get_view(self, window, **kwargs):
         start = self.start
@@ -2416,6 +3344,11 @@ class PandasDataSwapEntry:
     :param name: Name of the entry. If ``None``, a random UUID will be
         generated.
     :type name: str or None
+
+    :param fmt: Data storage format of the entry, as one of the keys of
+        :attr:`TraceCache.DATAFRAME_SWAP_FORMATS`. If ``None``,
+        :attr:`TraceCache.DATAFRAME_SWAP_FORMAT` is used.
+    :type fmt: str or None
     """
 
     META_EXTENSION = '.meta'
@@ -2423,9 +3356,10 @@ class PandasDataSwapEntry:
     Extension used by the metadata file of the swap entry in the swap.
     """
 
-    def __init__(self, pd_desc_nf, name=None):
+    def __init__(self, pd_desc_nf, name=None, fmt=None):
         self.pd_desc_nf = pd_desc_nf
         self.name = name or uuid.uuid4().hex
+        self.fmt = fmt or TraceCache.DATAFRAME_SWAP_FORMAT
 
     @property
     def meta_filename(self):
@@ -2439,7 +3373,8 @@ class PandasDataSwapEntry:
         """
         Filename of the pandas data file in the swap.
         """
-        return f'{self.name}{TraceCache.DATAFRAME_SWAP_EXTENSION}'
+        extension = TraceCache.DATAFRAME_SWAP_FORMATS[self.fmt]
+        return f'{self.name}{extension}'
 
     def to_json_map(self):
         """
@@ -2448,6 +3383,7 @@ class PandasDataSwapEntry:
         return {
             'version-token': VERSION_TOKEN,
             'name': self.name,
+            'format': self.fmt,
             'desc': self.pd_desc_nf.to_json_map(),
         }
 
@@ -2461,7 +3397,8 @@ class PandasDataSwapEntry:
 
         pd_desc_nf = PandasDataDescNF.from_json_map(mapping['desc'])
         name = mapping['name']
-        return cls(pd_desc_nf=pd_desc_nf, name=name)
+        fmt = mapping.get('format')
+        return cls(pd_desc_nf=pd_desc_nf, name=name, fmt=fmt)
 
     def to_path(self, path):
         """
@@ -2491,6 +3428,173 @@ class TraceCacheSwapVersionError(ValueError):
     pass
 
 
+class SharedTraceCache(Loggable):
+    """
+    Content-addressed cache of analysis results, shared between
+    :class:`Trace` instances.
+
+    :param cache_dir: Folder to store the cache entries in. It can be shared
+        between processes, users and machines (e.g. on a network filesystem),
+        as long as it supports atomic renames and ``flock()``.
+    :type cache_dir: str
+
+    :param max_size: Maximum size of the cache in bytes. When exceeded, the
+        least recently used entries are discarded. When ``None``, the size is
+        not bounded.
+    :type max_size: int or None
+
+    Entries are keyed by the checksum of the trace file content, the normal
+    form of the :class:`PandasDataDesc` and the
+    :data:`lisa.version.VERSION_TOKEN`, so that moving or copying a trace does
+    not invalidate the results computed on it. Each entry is written to a
+    temporary file and atomically renamed into place, so readers never see a
+    partially written entry. Eviction is serialized using a lock file.
+    """
+
+    LOCK_FILENAME = '.lock'
+    """
+    Name of the lock file used to serialize eviction.
+    """
+
+    def __init__(self, cache_dir, max_size=None):
+        self.cache_dir = os.path.abspath(cache_dir)
+        self.max_size = max_size if max_size is not None else math.inf
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    @staticmethod
+    def _get_key(trace_md5, pd_desc):
+        """
+        Compute the key of an entry, or ``None`` if the descriptor cannot be
+        reliably serialized.
+        """
+        mapping = {
+            'version-token': VERSION_TOKEN,
+            'trace-md5': trace_md5,
+            'desc': pd_desc.normal_form.to_json_map(),
+        }
+        try:
+            # Only accept types that JSON can represent, since anything else
+            # would be serialized in a non-deterministic way
+            content = json.dumps(mapping, sort_keys=True)
+        except (TypeError, ValueError):
+            return None
+        else:
+            return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+    def _path_of(self, key):
+        return os.path.join(self.cache_dir, f'{key}{TraceCache.DATAFRAME_SWAP_EXTENSION}')
+
+    @contextlib.contextmanager
+    def _lock(self):
+        path = os.path.join(self.cache_dir, self.LOCK_FILENAME)
+        with open(path, 'a') as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def fetch(self, trace_md5, pd_desc):
+        """
+        Fetch an entry from the cache.
+
+        :param trace_md5: MD5 checksum of the trace file.
+        :type trace_md5: str
+
+        :param pd_desc: Descriptor to look for.
+        :type pd_desc: PandasDataDesc
+
+        :raises KeyError: If the entry is not in the cache.
+        """
+        key = self._get_key(trace_md5, pd_desc)
+        if key is None:
+            raise KeyError(pd_desc)
+
+        path = self._path_of(key)
+        try:
+            data = TraceCache._read_data(path)
+        # The entry might not exist or could be evicted concurrently
+        except (OSError, pyarrow.lib.ArrowException) as e:
+            raise KeyError(pd_desc) from e
+        else:
+            # Bump the modification time so LRU eviction spares it. atime
+            # cannot be relied upon as filesystems are often mounted with
+            # noatime.
+            with contextlib.suppress(OSError):
+                os.utime(path)
+            return data
+
+    def insert(self, trace_md5, pd_desc, data):
+        """
+        Insert an entry in the cache.
+
+        :param trace_md5: MD5 checksum of the trace file.
+        :type trace_md5: str
+
+        :param pd_desc: Descriptor of the data to insert.
+        :type pd_desc: PandasDataDesc
+
+        :param data: Pandas data to insert.
+        :type data: pandas.DataFrame
+
+        Data that cannot be serialized is silently ignored.
+        """
+        key = self._get_key(trace_md5, pd_desc)
+        if key is None or not isinstance(data, pd.DataFrame):
+            return
+
+        path = self._path_of(key)
+        # Another writer already stored the same content
+        if os.path.exists(path):
+            return
+
+        fd, temp_path = tempfile.mkstemp(dir=self.cache_dir, prefix='.', suffix='.tmp')
+        os.close(fd)
+        try:
+            TraceCache._write_data(data, temp_path)
+            os.replace(temp_path, path)
+        # PyArrow fails on some dtypes such as integers > 64bits or
+        # arbitrary objects
+        # pylint: disable=broad-except
+        except Exception as e:
+            self.get_logger().debug(f'Could not write {pd_desc} to shared cache: {e}')
+            with contextlib.suppress(OSError):
+                os.unlink(temp_path)
+        else:
+            self.scrub()
+
+    def scrub(self):
+        """
+        Remove the least recently used entries until the size of the cache is
+        below ``max_size``.
+        """
+        if self.max_size == math.inf:
+            return
+
+        with self._lock():
+            def get_stats():
+                for dir_entry in os.scandir(self.cache_dir):
+                    if dir_entry.name.endswith(TraceCache.DATAFRAME_SWAP_EXTENSION):
+                        try:
+                            yield (dir_entry.path, dir_entry.stat())
+                        # Removed by someone else in the meantime
+                        except FileNotFoundError:
+                            pass
+
+            stats = sorted(
+                get_stats(),
+                key=lambda path_stat: path_stat[1].st_mtime,
+                reverse=True,
+            )
+
+            total_size = 0
+            for path, stat in stats:
+                total_size += stat.st_size
+                if total_size > self.max_size:
+                    with contextlib.suppress(FileNotFoundError):
+                        os.unlink(path)
+
+
 class TraceCache(Loggable):
     """
     Cache of a :class:`Trace`.
@@ -2522,6 +3626,10 @@ class TraceCache(Loggable):
     :param swap_content: Initial content of the swap area.
     :type swap_content: dict(PandasDataDescNF, PandasDataSwapEntry) or None
 
+    :param shared_cache: Cache shared with other :class:`Trace` instances,
+        possibly running in other processes.
+    :type shared_cache: SharedTraceCache or None
+
     The cache manages both the :class:`pandas.DataFrame` and
     :class:`pandas.Series` generated in memory and a swap area used to evict
     them, and to reload them quickly.
@@ -2542,16 +3650,48 @@ class TraceCache(Loggable):
 
     DATAFRAME_SWAP_FORMAT = 'parquet'
     """
-    Data storage format used to swap.
+    Default data storage format used to swap.
     """
 
     DATAFRAME_SWAP_EXTENSION = f'.{DATAFRAME_SWAP_FORMAT}'
     """
-    File extension of the data swap format.
+    File extension of the default data swap format.
+    """
+
+    DATAFRAME_SWAP_FORMATS = {
+        'feather': '.feather',
+        'parquet': '.parquet',
+    }
+    """
+    Data storage formats available for the swap, mapped to their file
+    extension.
+
+    ``parquet`` files are compressed, so they are small but need to be fully
+    decoded when reloaded. ``feather`` files are uncompressed Arrow IPC files
+    that are memory-mapped when reloaded, so that columns are only paged in
+    when accessed and are shared with other processes through the page cache.
+    The format is chosen for each entry based on the measured read cost and
+    disk size of each format.
     """
 
-    def __init__(self, max_mem_size=None, trace_path=None, trace_md5=None, swap_dir=None, max_swap_size=None, swap_content=None, metadata=None):
+    def __init__(self, max_mem_size=None, trace_path=None, trace_md5=None, swap_dir=None, max_swap_size=None, swap_content=None, metadata=None, shared_cache=None):
         self._cache = {}
+        # Memory usage of each entry, measured when it is inserted, and the
+        # running total
+        self._data_mem_usage_of = {}
+        self._mem_usage = 0
+        # Heap of (retention score, sequence number, pd_desc). Entries are
+        # invalidated lazily: only the one with the sequence number recorded
+        # in _data_seq is valid. The sequence number also acts as a recency
+        # tie-breaker.
+        self._retention_heap = []
+        self._data_seq = {}
+        self._seq = itertools.count()
+        self._stats = dict.fromkeys(
+            ('hits', 'swap_hits', 'shared_hits', 'misses', 'evictions'),
+            0,
+        )
+        self.shared_cache = shared_cache
         self._data_cost = {}
         self._swap_content = swap_content or {}
         self._pd_desc_swap_filename = {}
@@ -2561,15 +3701,16 @@ class TraceCache(Loggable):
         self._swap_size = self._get_swap_size()
 
         self.max_mem_size = max_mem_size if max_mem_size is not None else math.inf
-        self._data_mem_swap_ratio = 7
+        self._data_mem_swap_ratio = dict.fromkeys(self.DATAFRAME_SWAP_FORMATS, 7)
+        # Read cost in seconds per byte of memory, None until measured
+        self._swap_read_cost = dict.fromkeys(self.DATAFRAME_SWAP_FORMATS)
         self._metadata = metadata or {}
 
         self.trace_path = os.path.abspath(trace_path) if trace_path else trace_path
         self._trace_md5 = trace_md5
 
-    @property
     @memoized
-    def _swap_size_overhead(self):
+    def _get_swap_size_overhead(self, fmt):
         def make_df(nr_col):
             return pd.DataFrame({
                 str(x): []
@@ -2579,7 +3720,7 @@ class TraceCache(Loggable):
         def get_size(nr_col):
             df = make_df(nr_col)
             buffer = io.BytesIO()
-            self._write_data(df, buffer)
+            self._write_data(df, buffer, fmt=fmt)
             return buffer.getbuffer().nbytes
 
         size1 = get_size(1)
@@ -2594,14 +3735,14 @@ class TraceCache(Loggable):
 
         return (file_overhead, col_overhead)
 
-    def _unbias_swap_size(self, data, size):
+    def _unbias_swap_size(self, data, size, fmt):
         """
         Remove the fixed size overhead of the file format being used, assuming
         a non-compressible overhead per file and per column.
 
         .. note:: This model seems to work pretty well for parquet format.
         """
-        file_overhead, col_overhead = self._swap_size_overhead
+        file_overhead, col_overhead = self._get_swap_size_overhead(fmt)
         # DataFrame
         try:
             nr_columns = data.shape[1]
@@ -2755,29 +3896,72 @@ class TraceCache(Loggable):
 
         return cls(swap_dir=swap_dir, **kwargs)
 
-    def _estimate_data_swap_cost(self, data):
-        return self._estimate_data_swap_size(data) * self.swap_cost
+    def _estimate_data_swap_cost(self, data, mem_usage=None):
+        mem_usage = self._data_mem_usage(data) if mem_usage is None else mem_usage
+        fmt = self._choose_swap_format(data, mem_usage=mem_usage)
+        return self._estimate_data_swap_size(data, fmt, mem_usage=mem_usage) * self.swap_cost
+
+    def _estimate_data_swap_size(self, data, fmt, mem_usage=None):
+        mem_usage = self._data_mem_usage(data) if mem_usage is None else mem_usage
+        return mem_usage * self._data_mem_swap_ratio[fmt]
 
-    def _estimate_data_swap_size(self, data):
-        return self._data_mem_usage(data) * self._data_mem_swap_ratio
+    def _choose_swap_format(self, data, mem_usage=None):
+        """
+        Choose the format to write ``data`` to swap with, as the one with the
+        lowest read cost, weighted by the fraction of the swap area the entry
+        would occupy.
+        """
+        mem_usage = self._data_mem_usage(data) if mem_usage is None else mem_usage
+
+        def cost(fmt):
+            read_cost = self._swap_read_cost[fmt]
+            # Formats that were never read yet are tried first, so that we get
+            # a measurement for them
+            if read_cost is None:
+                return -math.inf
+
+            swap_fraction = self._estimate_data_swap_size(data, fmt, mem_usage=mem_usage) / self.max_swap_size
+            if swap_fraction >= 1:
+                return math.inf
+            else:
+                return read_cost * mem_usage / (1 - swap_fraction)
+
+        return min(self.DATAFRAME_SWAP_FORMATS, key=cost)
+
+    def _update_ewma(self, attr, new, alpha=0.25, override=False, key=None):
+        """
+        Update the exponentially weighted moving average stored in the
+        ``attr`` attribute, or in ``attr[key]`` if ``key`` is not ``None``.
+        """
+        if key is None:
+            old = getattr(self, attr)
+        else:
+            old = getattr(self, attr)[key]
 
-    def _update_ewma(self, attr, new, alpha=0.25, override=False):
-        old = getattr(self, attr)
         if override:
             updated = new
         else:
             updated = (1 - alpha) * old + alpha * new
 
-        setattr(self, attr, updated)
+        if key is None:
+            setattr(self, attr, updated)
+        else:
+            getattr(self, attr)[key] = updated
 
-    def _update_data_swap_size_estimation(self, data, size):
-        size = self._unbias_swap_size(data, size)
+    def _update_data_swap_size_estimation(self, data, size, fmt):
+        size = self._unbias_swap_size(data, size, fmt)
 
         # If size < 0, the dataframe is so small that it's basically just noise
         if size > 0:
             mem_usage = self._data_mem_usage(data)
             if mem_usage:
-                self._update_ewma('_data_mem_swap_ratio', size / mem_usage)
+                self._update_ewma('_data_mem_swap_ratio', size / mem_usage, key=fmt)
+
+    def _update_swap_read_cost(self, data, read_cost, fmt):
+        mem_usage = self._data_mem_usage(data)
+        if mem_usage:
+            override = self._swap_read_cost[fmt] is None
+            self._update_ewma('_swap_read_cost', read_cost / mem_usage, override=override, key=fmt)
 
     @staticmethod
     def _data_mem_usage(data):
@@ -2793,17 +3977,15 @@ class TraceCache(Loggable):
         swap_cost = self._estimate_data_swap_cost(data)
         return swap_cost <= compute_cost
 
-    def _swap_path_of(self, pd_desc):
+    def _swap_entry_of(self, pd_desc):
         if self.swap_dir:
             pd_desc_nf = pd_desc.normal_form
-            swap_entry = self._swap_content[pd_desc_nf]
-            filename = swap_entry.data_filename
-            return os.path.join(self.swap_dir, filename)
+            return self._swap_content[pd_desc_nf]
         else:
             raise ValueError('Swap dir is not setup')
 
-    def _update_swap_cost(self, data, swap_cost, mem_usage, swap_size):
-        unbiased_swap_size = self._unbias_swap_size(data, swap_size)
+    def _update_swap_cost(self, data, swap_cost, mem_usage, swap_size, fmt):
+        unbiased_swap_size = self._unbias_swap_size(data, swap_size, fmt)
         # Take out from the swap cost the time it took to write the overhead
         # that comes with the file format, assuming the cost is
         # proportional to amount of data written in the swap.
@@ -2819,12 +4001,63 @@ class TraceCache(Loggable):
         return pd_desc.normal_form in self._swap_content
 
     @classmethod
-    def _write_data(cls, data, path):
-        if cls.DATAFRAME_SWAP_FORMAT == 'parquet':
+    def _write_data(cls, data, path, fmt=None):
+        fmt = fmt or cls.DATAFRAME_SWAP_FORMAT
+        if fmt == 'parquet':
             # Snappy compression seems very fast
             data.to_parquet(path, compression='snappy', index=True)
+        elif fmt == 'feather':
+            # Stay uncompressed so that the file can be memory-mapped
+            pyarrow.feather.write_feather(data, path, compression='uncompressed')
+        else:
+            raise ValueError(f'Dataframe swap format "{fmt}" not handled')
+
+    @classmethod
+    def _read_data(cls, path, fmt=None):
+        fmt = fmt or cls.DATAFRAME_SWAP_FORMAT
+        if fmt == 'parquet':
+            return pd.read_parquet(path)
+        elif fmt == 'feather':
+            return cls._read_feather(path)
         else:
-            raise ValueError(f'Dataframe swap format "{cls.DATAFRAME_SWAP_FORMAT}" not handled')
+            raise ValueError(f'Dataframe swap format "{fmt}" not handled')
+
+    @staticmethod
+    def _read_feather(path):
+        """
+        Read a feather file by memory-mapping it.
+
+        split_blocks allows numeric columns to be converted without copying
+        them, so they are only paged in when accessed. Arrow marks these
+        columns as read-only, so the dataframe has to be copied before being
+        modified in place.
+        """
+        table = pyarrow.feather.read_table(path, memory_map=True)
+        return table.to_pandas(split_blocks=True)
+
+    @staticmethod
+    def _estimate_paging_cost(data, nr_samples=16):
+        """
+        Estimate the time it takes to page in the numeric columns of ``data``.
+
+        Only ``nr_samples`` evenly spaced elements of each column are accessed
+        and the time spent is extrapolated to the number of pages spanned by
+        the column, so that the estimation does not page in the whole data.
+        """
+        if isinstance(data, pd.Series):
+            data = data.to_frame()
+
+        cost = 0
+        for _, col in data.items():
+            values = col.values
+            if isinstance(values, np.ndarray) and values.dtype.kind in 'biufcmM' and values.size:
+                nr_pages = math.ceil(values.nbytes / mmap.PAGESIZE)
+                idx = np.linspace(0, values.size - 1, min(nr_samples, nr_pages, values.size), dtype='int64')
+                with measure_time() as measure:
+                    values[idx].sum()
+                cost += measure.exclusive_delta * nr_pages / len(idx)
+
+        return cost
 
     def _write_swap(self, pd_desc, data):
         if not self.swap_dir:
@@ -2834,12 +4067,13 @@ class TraceCache(Loggable):
                 return
 
             pd_desc_nf = pd_desc.normal_form
-            swap_entry = PandasDataSwapEntry(pd_desc_nf)
+            fmt = self._choose_swap_format(data)
+            swap_entry = PandasDataSwapEntry(pd_desc_nf, fmt=fmt)
 
             df_path = os.path.join(self.swap_dir, swap_entry.data_filename)
 
             # If that would make the swap dir too large, try to do some cleanup
-            if self._estimate_data_swap_size(data) + self._swap_size > self.max_swap_size:
+            if self._estimate_data_swap_size(data, fmt) + self._swap_size > self.max_swap_size:
                 self.scrub_swap()
 
             def log_error(e):
@@ -2848,7 +4082,7 @@ class TraceCache(Loggable):
             # Write the Parquet file and update the write speed
             try:
                 with measure_time() as measure:
-                    self._write_data(data, df_path)
+                    self._write_data(data, df_path, fmt=fmt)
             # PyArrow fails to save dataframes containing integers > 64bits
             except OverflowError as e:
                 log_error(e)
@@ -2866,9 +4100,9 @@ class TraceCache(Loggable):
 
                 mem_usage = self._data_mem_usage(data)
                 if mem_usage:
-                    self._update_swap_cost(data, swap_cost, mem_usage, data_swapped_size)
+                    self._update_swap_cost(data, swap_cost, mem_usage, data_swapped_size, fmt)
                 self._swap_size += data_swapped_size
-                self._update_data_swap_size_estimation(data, data_swapped_size)
+                self._update_data_swap_size_estimation(data, data_swapped_size, fmt)
                 self.scrub_swap()
 
     def _get_swap_size(self):
@@ -2942,7 +4176,18 @@ class TraceCache(Loggable):
                 for swap_entry in self._swap_content.values()
             )
 
-    def fetch(self, pd_desc, insert=True):
+    def _fetch_shared(self, pd_desc):
+        shared_cache = self.shared_cache
+        if shared_cache is None:
+            raise KeyError(pd_desc)
+
+        trace_md5 = self.trace_md5
+        if trace_md5 is None:
+            raise KeyError(pd_desc)
+
+        return shared_cache.fetch(trace_md5, pd_desc)
+
+    def fetch(self, pd_desc, insert=True, shared=False):
         """
         Fetch an entry from the cache or the swap.
 
@@ -2952,34 +4197,66 @@ class TraceCache(Loggable):
         :param insert: If ``True`` and if the fetch succeeds by loading the
             swap, the data is inserted in the cache.
         :type insert: bool
+
+        :param shared: If ``True``, the shared cache is also looked up if
+            the entry cannot be found in the swap.
+        :type shared: bool
+
+        .. note:: The returned data is shared with the cache and can be backed
+            by read-only memory, so it must be copied before being modified in
+            place.
         """
         try:
-            return self._cache[pd_desc]
+            data = self._cache[pd_desc]
         except KeyError as e:
             # pylint: disable=raise-missing-from
             try:
-                path = self._swap_path_of(pd_desc)
+                swap_entry = self._swap_entry_of(pd_desc)
             # If there is no swap, bail out
             except (ValueError, KeyError):
-                raise e
-            else:
-                # Try to load the dataframe from that path
+                swap_entry = None
+
+            data = None
+            # Try to load the dataframe from the swap
+            if swap_entry is not None:
+                path = os.path.join(self.swap_dir, swap_entry.data_filename)
+                fmt = swap_entry.fmt
                 try:
-                    if self.DATAFRAME_SWAP_FORMAT == 'parquet':
-                        data = pd.read_parquet(path)
-                    else:
-                        raise ValueError(f'Dataframe swap format "{self.DATAFRAME_SWAP_FORMAT}" not handled')
-                except (OSError, pyarrow.lib.ArrowIOError):
-                    raise e
+                    with measure_time() as measure:
+                        data = self._read_data(path, fmt=fmt)
+                except (OSError, pyarrow.lib.ArrowException):
+                    pass
                 else:
-                    if insert:
-                        # We have no idea of the cost of something coming from
-                        # the cache
-                        self.insert(pd_desc, data, write_swap=False, compute_cost=None)
+                    # Include the cost of paging in the data, otherwise
+                    # formats that are lazily loaded would appear free
+                    read_cost = measure.exclusive_delta + self._estimate_paging_cost(data)
+                    self._update_swap_read_cost(data, read_cost, fmt)
+                    self._stats['swap_hits'] += 1
 
-                    return data
+            if data is None and shared:
+                try:
+                    data = self._fetch_shared(pd_desc)
+                except KeyError:
+                    pass
+                else:
+                    self._stats['shared_hits'] += 1
+
+            if data is None:
+                self._stats['misses'] += 1
+                raise e
+            else:
+                if insert:
+                    # We have no idea of the cost of something coming from
+                    # the cache
+                    self.insert(pd_desc, data, write_swap=False, compute_cost=None)
+
+                return data
+        else:
+            self._stats['hits'] += 1
+            self._touch(pd_desc)
+            return data
 
-    def insert(self, pd_desc, data, compute_cost=None, write_swap=False, force_write_swap=False):
+    def insert(self, pd_desc, data, compute_cost=None, write_swap=False, force_write_swap=False, write_shared=False):
         """
         Insert an entry in the cache.
 
@@ -3001,71 +4278,102 @@ class TraceCache(Loggable):
         :param force_write_swap: If ``True``, bypass the computation vs swap
             cost comparison.
         :type force_write_swap: bool
+
+        :param write_shared: If ``True``, the data will also be written to the
+            shared cache if there is one.
+        :type write_shared: bool
         """
+        with contextlib.suppress(KeyError):
+            self._remove(pd_desc)
+
+        mem_usage = self._data_mem_usage(data)
         self._cache[pd_desc] = data
+        self._data_mem_usage_of[pd_desc] = mem_usage
+        self._mem_usage += mem_usage
+
         if compute_cost is not None:
             self._data_cost[pd_desc] = compute_cost
 
+        if write_shared and self.shared_cache is not None:
+            trace_md5 = self.trace_md5
+            if trace_md5 is not None:
+                self.shared_cache.insert(trace_md5, pd_desc, data)
+
         if write_swap:
             self.write_swap(pd_desc, force=force_write_swap)
 
+        self._touch(pd_desc)
         self._scrub_mem()
 
-    def _scrub_mem(self):
-        if self.max_mem_size == math.inf:
-            return
+    @property
+    def stats(self):
+        """
+        Counters of the cache activity since its creation:
 
-        mem_usage = sum(
-            self._data_mem_usage(data)
-            for data in self._cache.values()
-        )
+            * ``hits``: Entries fetched from memory.
+            * ``swap_hits``: Entries reloaded from the swap area.
+            * ``shared_hits``: Entries reloaded from the shared cache.
+            * ``misses``: Entries that could not be fetched.
+            * ``evictions``: Entries evicted from memory.
+        """
+        return dict(self._stats)
 
-        if mem_usage > self.max_mem_size:
+    def _remove(self, pd_desc):
+        del self._cache[pd_desc]
+        del self._data_seq[pd_desc]
+        self._mem_usage -= self._data_mem_usage_of.pop(pd_desc)
 
-            # Make sure garbage collection occurred recently, to get the most
-            # accurate refcount possible
-            gc.collect()
-            refcounts = {
-                pd_desc: sys.getrefcount(data)
-                for pd_desc, data in self._cache.items()
-            }
-            min_refcount = min(refcounts.values())
+    def _retention_score(self, pd_desc):
+        # Low retention score means it's more likely to be evicted
 
-            # Low retention score means it's more likely to be evicted
-            def retention_score(pd_desc_and_data):
-                pd_desc, data = pd_desc_and_data
+        # If we don't know the computation cost, assume it can be evicted cheaply
+        compute_cost = self._data_cost.get(pd_desc, 0)
+        if not compute_cost:
+            return 0
+        else:
+            swap_cost = self._estimate_data_swap_cost(
+                self._cache[pd_desc],
+                mem_usage=self._data_mem_usage_of[pd_desc],
+            )
+            # If it's already written back, make it cheaper to evict since
+            # the eviction itself is going to be cheap
+            if self._is_written_to_swap(pd_desc):
+                swap_cost /= 2
 
-                # If we don't know the computation cost, assume it can be evicted cheaply
-                compute_cost = self._data_cost.get(pd_desc, 0)
+            if swap_cost:
+                return compute_cost / swap_cost
+            else:
+                return 0
 
-                if not compute_cost:
-                    score = 0
-                else:
-                    swap_cost = self._estimate_data_swap_cost(data)
-                    # If it's already written back, make it cheaper to evict since
-                    # the eviction itself is going to be cheap
-                    if self._is_written_to_swap(pd_desc):
-                        swap_cost /= 2
-
-                    if swap_cost:
-                        score = compute_cost / swap_cost
-                    else:
-                        score = 0
-
-                # Assume that more references to an object implies it will
-                # stay around for longer. Therefore, it's less interesting to
-                # remove it from this cache and pay the cost of reading/writing it to
-                # swap, since the memory will not be freed anyway.
-                #
-                # Normalize to the minimum refcount, so that the _cache and other
-                # structures where references are stored are discounted for sure.
-                return (refcounts[pd_desc] - min_refcount + 1) * score
-
-            new_mem_usage = 0
-            for pd_desc, data in sorted(self._cache.items(), key=retention_score):
-                new_mem_usage += self._data_mem_usage(data)
-                if new_mem_usage > self.max_mem_size:
-                    self.evict(pd_desc)
+    def _touch(self, pd_desc):
+        """
+        Update the retention priority of an entry after it has been accessed.
+        """
+        seq = next(self._seq)
+        self._data_seq[pd_desc] = seq
+        heap = self._retention_heap
+        heapq.heappush(heap, (self._retention_score(pd_desc), seq, pd_desc))
+
+        # Get rid of invalidated entries once they dominate the heap, so that
+        # its size stays proportional to the number of cached entries
+        if len(heap) > 2 * len(self._cache) + 64:
+            data_seq = self._data_seq
+            heap[:] = [
+                entry
+                for entry in heap
+                if data_seq.get(entry[2]) == entry[1]
+            ]
+            heapq.heapify(heap)
+
+    def _scrub_mem(self):
+        heap = self._retention_heap
+        data_seq = self._data_seq
+        # Evict the entries with the lowest retention score first, and the
+        # least recently used ones among entries with the same score.
+        while self._mem_usage > self.max_mem_size and heap:
+            _, seq, pd_desc = heapq.heappop(heap)
+            if data_seq.get(pd_desc) == seq:
+                self.evict(pd_desc)
 
     def evict(self, pd_desc):
         """
@@ -3080,9 +4388,11 @@ class TraceCache(Loggable):
         self.write_swap(pd_desc)
 
         try:
-            del self._cache[pd_desc]
+            self._remove(pd_desc)
         except KeyError:
             pass
+        else:
+            self._stats['evictions'] += 1
 
     def write_swap(self, pd_desc, force=False):
         """
@@ -3123,33 +4433,37 @@ class TraceCache(Loggable):
             ``None``, ignore whether the descriptor is about raw data or not.
         :type raw: bool or None
         """
-        self._cache = {
-            pd_desc: data
-            for pd_desc, data in self._cache.items()
-            if not (
+        to_clear = [
+            pd_desc
+            for pd_desc in self._cache.keys()
+            if (
                 pd_desc.get('event') == event
                 and (
                     raw is None
                     or pd_desc.get('raw') == raw
                 )
             )
-        }
+        ]
+        for pd_desc in to_clear:
+            self._remove(pd_desc)
 
     def clear_all_events(self, raw=None):
         """
         Same as :meth:`clear_event` but works on all events at once.
         """
-        self._cache = {
-            pd_desc: data
-            for pd_desc, data in self._cache.items()
-            if (
+        to_clear = [
+            pd_desc
+            for pd_desc in self._cache.keys()
+            if not (
                 # Cache entries can be associated to something else than events
                 'event' not in pd_desc or
                 # Either we care about raw and we check, or blanket clear
                 raw is None or
                 pd_desc.get('raw') == raw
             )
-        }
+        ]
+        for pd_desc in to_clear:
+            self._remove(pd_desc)
 
 
 class Trace(Loggable, TraceBase):
@@ -3228,6 +4542,17 @@ class Trace(Loggable, TraceBase):
         parameter.
     :type write_swap: bool
 
+    :param shared_cache_dir: Directory of a :class:`SharedTraceCache` used to
+        share analysis results between traces with the same content, across
+        processes and machines. When ``None``, the ``LISA_SHARED_CACHE_DIR``
+        environment variable is used if set, otherwise no shared cache is
+        used.
+    :type shared_cache_dir: str or None
+
+    :param max_shared_cache_size: Maximum size of the shared cache directory.
+        When ``None``, the size is not bounded.
+    :type max_shared_cache_size: int or None
+
     :Attributes:
         * ``start``: The timestamp of the first trace event in the trace
         * ``end``: The timestamp of the last trace event in the trace
@@ -3358,6 +4683,8 @@ class Trace(Loggable, TraceBase):
         enable_swap=True,
         max_swap_size=None,
         write_swap=True,
+        shared_cache_dir=None,
+        max_shared_cache_size=None,
     ):
         super().__init__()
 
@@ -3387,11 +4714,23 @@ class Trace(Loggable, TraceBase):
             swap_dir = None
             max_swap_size = None
 
+        if shared_cache_dir is None:
+            shared_cache_dir = os.getenv('LISA_SHARED_CACHE_DIR')
+
+        if shared_cache_dir:
+            shared_cache = SharedTraceCache(
+                cache_dir=shared_cache_dir,
+                max_size=max_shared_cache_size,
+            )
+        else:
+            shared_cache = None
+
         self._cache = TraceCache.from_swap_dir(
             trace_path=trace_path,
             swap_dir=swap_dir,
             max_swap_size=max_swap_size,
             max_mem_size=max_mem_size,
+            shared_cache=shared_cache,
         )
         # Initial scrub of the swap to discard unwanted data, honoring the
         # max_swap_size right from the beginning
@@ -3474,9 +4813,10 @@ class Trace(Loggable, TraceBase):
 
     def _get_metadata(self, key, parser=None):
         if parser is None:
-            parser = self._get_parser(needed_metadata={key})
-
-        return parser.get_metadata(key)
+            with self._get_parser(needed_metadata={key}) as parser:
+                return parser.get_metadata(key)
+        else:
+            return parser.get_metadata(key)
 
     def _get_cacheable_metadata(self, key, parser=None):
         try:
@@ -3650,11 +4990,11 @@ class Trace(Loggable, TraceBase):
         # pylint: disable=attribute-defined-outside-init
         proxy.base_trace = trace
 
-    def _get_parser(self, events=tuple(), needed_metadata=None, update_metadata=True):
+    def _get_parser(self, events=tuple(), needed_metadata=None, update_metadata=True, **kwargs):
         path = self.trace_path
         events = set(events)
         needed_metadata = set(needed_metadata or [])
-        parser = self._parser(path=path, events=events, needed_metadata=needed_metadata)
+        parser = self._parser(path=path, events=events, needed_metadata=needed_metadata, **kwargs)
 
         # While we are at it, gather a bunch of metadata. Since we did not
         # explicitly asked for it, the parser will only give
@@ -3980,10 +5320,9 @@ class Trace(Loggable, TraceBase):
     def _mp_parse_worker(self, event):
         # Do not update the metadata to avoid concurrency issues while updating
         # the cache
-        parser = self._get_parser([event], update_metadata=False)
-
         try:
-            data = parser.parse_event(event)
+            with self._get_parser([event], update_metadata=False) as parser:
+                data = parser.parse_event(event)
         except MissingTraceEventError as e:
             data = e
         else:
@@ -3991,21 +5330,43 @@ class Trace(Loggable, TraceBase):
 
         return data
 
+    @property
+    def _parser_cls(self):
+        """
+        Class of the parser built by ``self._parser``, or ``None`` if it
+        cannot be determined.
+        """
+        parser = self._parser
+        if isinstance(parser, type):
+            return parser
+        # Partially-initialized instances only allow accessing __class__
+        elif isinstance(parser, PartialInit):
+            return parser.__class__
+        else:
+            # Bound classmethods, such as TxtTraceParser.from_dat
+            cls = getattr(parser, '__self__', None)
+            return cls if isinstance(cls, type) else None
+
     def _parse_raw_events(self, events):
         if not events:
             return {}
 
-        nr_processes = min(
-            len(events),
-            multiprocessing.cpu_count(),
-        )
+        parser_cls = self._parser_cls
+        # Parsers able to split a single pass over the trace between multiple
+        # processes are much more efficient than one full parse per event
+        single_pass = parser_cls is not None and issubclass(parser_cls, (TxtTraceParserBase, DatTraceParser))
+
+        nr_processes = multiprocessing.cpu_count()
+        if not single_pass:
+            nr_processes = min(len(events), nr_processes)
+
         chunk_size = int(math.ceil(len(events) / nr_processes))
 
         # Only use multiprocessing if there is no memory limit, since the peak
         # consumption will increase
         use_mp = self._cache.max_mem_size >= math.inf and nr_processes > 1
 
-        if use_mp:
+        if use_mp and not single_pass:
             with multiprocessing.Pool(processes=nr_processes) as pool:
                 data_list = pool.map(self._mp_parse_worker, events, chunksize=chunk_size)
 
@@ -4019,8 +5380,9 @@ class Trace(Loggable, TraceBase):
                 if not isinstance(df, BaseException)
             }
         else:
-            parser = self._get_parser(events, update_metadata=True)
-            df_map = parser.parse_events(events, best_effort=True)
+            parser_kwargs = dict(nr_processes=nr_processes) if use_mp else {}
+            with self._get_parser(events, update_metadata=True, **parser_kwargs) as parser:
+                df_map = parser.parse_events(events, best_effort=True)
 
             for df in df_map.values():
                 self._apply_normalize_time(df, inplace=True)
@@ -4686,6 +6048,239 @@ class Trace(Loggable, TraceBase):
         df['reason'] = df['reason'].str.strip('()')
         return df
 
+class TraceStream(Loggable):
+    """
+    Incrementally parse a text trace that is still being recorded.
+
+    :param path: Path to a text trace file that is being appended to, e.g.
+        by redirecting ``/sys/kernel/debug/tracing/trace_pipe`` to it. If
+        ``None``, the data has to be provided with :meth:`feed`.
+    :type path: str or None
+
+    :param events: Events to parse.
+    :type events: list(str)
+
+    :param parser: Subclass of :class:`TxtTraceParserBase` used to parse the
+        text. ``trace_pipe`` uses the format understood by
+        :class:`HRTxtTraceParser`, unless the ``raw`` trace option is set.
+    :type parser: type
+
+    :Variable keyword arguments: Forwarded to ``parser``.
+
+    Each call to :meth:`update` or :meth:`feed` only parses the lines added
+    since the previous call, and appends the resulting rows to the dataframes
+    already parsed. :meth:`get_trace` then gives a :class:`Trace` of the data
+    parsed so far, which can be restricted to a window so that looking at the
+    tail of a long recording does not touch the data that came before.
+
+    The :class:`Trace` is reused by subsequent calls to :meth:`get_trace` with
+    the same window until new events are parsed, so that the results cached by
+    analyses are reused as well. It cannot be extended in place when new
+    events are parsed, since the results of the analyses depend on the time
+    range of the trace, which changes with each update. Only the event
+    dataframes are extended::
+
+        stream = TraceStream('trace_pipe.txt', events=['sched_switch'])
+        while recording:
+            stream.update()
+            start, end = stream.time_range
+            trace = stream.get_trace(window=(end - 1, None))
+            print(trace.df_event('sched_switch'))
+    """
+
+    @kwargs_forwarded_to(TxtTraceParserBase.__init__, ignore=['lines', 'events', 'needed_metadata', 'prev_time'])
+    def __init__(self, path=None, events=None, parser=HRTxtTraceParser, **kwargs):
+        self.path = path
+        self.events = list(events or [])
+        self._parser_cls = parser
+        self._parser_kwargs = kwargs
+
+        self._offset = 0
+        # Incomplete last line, waiting for the rest of the data
+        self._partial_line = b''
+        self._time_range = (None, None)
+        # Dataframes parsed on successive updates are not concatenated
+        # eagerly to avoid quadratic behavior. Instead, each event has a list
+        # of chunks with increasing timestamps, where each chunk is at most as
+        # large as the previous one. Merging chunks when that does not hold
+        # anymore bounds the number of chunks logarithmically.
+        self._chunks = {
+            event: []
+            for event in self.events
+        }
+        # Traces built by get_trace() for each window since the last update,
+        # along with the keyword arguments used to build them
+        self._traces = {}
+
+    @property
+    def time_range(self):
+        """
+        Tuple of ``(start, end)`` timestamps of the events parsed so far, or
+        ``(None, None)`` if none was found yet.
+        """
+        return self._time_range
+
+    def update(self):
+        """
+        Parse the data appended to the file at ``path`` since the last update.
+
+        :returns: ``True`` if new events were parsed, ``False`` otherwise.
+        """
+        if self.path is None:
+            raise ValueError('No path to read the trace from')
+
+        with open(self.path, 'rb') as f:
+            f.seek(self._offset)
+            data = f.read()
+
+        self._offset += len(data)
+        return self.feed(data)
+
+    def feed(self, data):
+        """
+        Parse a block of text of the trace, following the text fed previously.
+
+        :param data: Trace text. It does not have to end on a line boundary,
+            as an incomplete last line will be parsed when the rest of it is
+            fed.
+        :type data: bytes
+
+        :returns: ``True`` if new events were parsed, ``False`` otherwise.
+        """
+        data = self._partial_line + data
+        data, sep, self._partial_line = data.rpartition(b'\n')
+        if not sep:
+            return False
+
+        start, end = self._time_range
+        try:
+            parser = self._parser_cls(
+                lines=data.splitlines(),
+                events=self.events,
+                needed_metadata={'time-range'},
+                prev_time=0 if end is None else end,
+                **self._parser_kwargs,
+            )
+        # No event in the new lines
+        except _NoEventLinesError:
+            return False
+
+        new_start, new_end = parser.get_metadata('time-range')
+        if new_start is None:
+            return False
+
+        self._time_range = (
+            new_start if start is None else start,
+            new_end,
+        )
+        self._traces.clear()
+
+        for event, chunks in self._chunks.items():
+            try:
+                df = parser.parse_event(event)
+            except MissingTraceEventError:
+                continue
+
+            if not df.empty:
+                self._append_chunk(chunks, df)
+
+        return True
+
+    @staticmethod
+    def _append_chunk(chunks, df):
+        chunks.append(df)
+        while len(chunks) > 1 and len(chunks[-2]) <= len(chunks[-1]):
+            last = chunks.pop()
+            chunks[-1] = pd.concat([chunks[-1], last], copy=False)
+
+    def df_event(self, event, window=None):
+        """
+        Get the dataframe of an event parsed so far.
+
+        :param event: Name of the event.
+        :type event: str
+
+        :param window: Only return rows in the given ``(start, end)`` window.
+            ``None`` can be used for either bound to leave it open. Only the
+            chunks of data overlapping with the window are touched.
+        :type window: tuple(float or None, float or None) or None
+        """
+        try:
+            chunks = self._chunks[event]
+        except KeyError:
+            raise MissingTraceEventError([event], available_events=self.events) from None
+
+        if not chunks:
+            raise MissingTraceEventError([event], available_events=self.events)
+
+        start, end = window if window is not None else (None, None)
+        if start is not None:
+            # Chunks are sorted and non-overlapping, so the last index of each
+            # chunk is sorted as well
+            first = bisect.bisect_left([chunk.index[-1] for chunk in chunks], start)
+            chunks = chunks[first:]
+        if end is not None:
+            chunks = list(itertools.takewhile(
+                lambda chunk: chunk.index[0] <= end,
+                chunks
+            ))
+
+        if not chunks:
+            return df_make_empty_clone(self._chunks[event][0])
+        elif len(chunks) == 1:
+            df = chunks[0]
+        else:
+            df = pd.concat(chunks, copy=False)
+
+        return df.loc[start:end]
+
+    def get_trace(self, window=None, **kwargs):
+        """
+        Get a :class:`Trace` of the events parsed so far.
+
+        :param window: If not ``None``, restrict the trace to the given
+            ``(start, end)`` window. See :meth:`df_event`.
+        :type window: tuple(float or None, float or None) or None
+
+        :Variable keyword arguments: Forwarded to :class:`Trace`.
+
+        The same :class:`Trace` object is returned until new events are
+        parsed, as long as the same window and keyword arguments are used.
+        """
+        start, end = window if window is not None else (None, None)
+        trace_start, trace_end = self._time_range
+        if trace_start is None:
+            raise ValueError('No event has been parsed yet')
+
+        key = (start, end)
+        try:
+            trace_kwargs, trace = self._traces[key]
+        except KeyError:
+            pass
+        else:
+            if trace_kwargs.keys() == kwargs.keys() and all(
+                trace_kwargs[name] is val
+                for name, val in kwargs.items()
+            ):
+                return trace
+
+        dfs = {}
+        for event in self.events:
+            with contextlib.suppress(MissingTraceEventError):
+                df = self.df_event(event, window=window)
+                if not df.empty:
+                    dfs[event] = df
+
+        time_range = (
+            trace_start if start is None else max(start, trace_start),
+            trace_end if end is None else min(end, trace_end),
+        )
+        parser = MockTraceParser(dfs, time_range=time_range)
+        trace = Trace(parser=parser, events=sorted(dfs.keys()), **kwargs)
+        self._traces[key] = (kwargs, trace)
+        return trace
+
+
 class TraceEventCheckerBase(abc.ABC, Loggable):
     """
     ABC for events checker classes.
@@ -5105,6 +6700,7 @@ class FtraceConf(SimpleMultiSrcConf, HideExekallID):
         KeyDesc('trace-clock', 'Clock used while tracing (see "trace_clock" in ftrace.txt kernel doc)', [str, None]),
         KeyDesc('saved-cmdlines-nr', 'Number of saved cmdlines with associated PID while tracing', [int]),
         KeyDesc('tracer', 'FTrace tracer to use', [str, None]),
+        KeyDesc('transfer-compression', 'Compress the trace on the target while transferring it to the host. Can be "auto" or the name of a compressor, e.g. "gzip" or "xz"', [str, None]),
     ))
 
     def add_merged_src(self, src, conf, **kwargs):
@@ -5135,6 +6731,8 @@ class FtraceConf(SimpleMultiSrcConf, HideExekallID):
                 return max(val, self.get(key, 0))
             elif key == 'tracer':
                 return non_mergeable(key)
+            elif key == 'transfer-compression':
+                return non_mergeable(key)
             else:
                 raise KeyError(f'Cannot merge key "{key}"')
 
@@ -5287,7 +6885,7 @@ class FtraceCollector(CollectorBase, Configurable):
     TOOLS = ['trace-cmd']
     _COMPOSITION_ORDER = 0
 
-    def __init__(self, target, *, events=None, functions=None, buffer_size=10240, output_path=None, autoreport=False, trace_clock=None, saved_cmdlines_nr=8192, tracer=None, **kwargs):
+    def __init__(self, target, *, events=None, functions=None, buffer_size=10240, output_path=None, autoreport=False, trace_clock=None, saved_cmdlines_nr=8192, tracer=None, transfer_compression=None, **kwargs):
         events = events or []
         functions = functions or []
         trace_clock = trace_clock or 'global'
@@ -5300,6 +6898,7 @@ class FtraceCollector(CollectorBase, Configurable):
             trace_clock=trace_clock,
             saved_cmdlines_nr=saved_cmdlines_nr,
             tracer=tracer,
+            transfer_compression=transfer_compression,
         )
         self.check_init_param(**kwargs)
 
@@ -15,14 +15,19 @@
 # limitations under the License.
 #
 from collections.abc import Mapping
-from collections import defaultdict
+from collections import defaultdict, deque
 import inspect
 import os
 import abc
 import contextlib
 import sqlite3
+import tempfile
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 
 import pandas as pd
+import pyarrow.lib
 
 from wa import discover_wa_outputs, Status
 
@@ -36,6 +41,25 @@ def _df_concat(dfs):
     return pd.concat(dfs, ignore_index=True, copy=False, sort=False)
 
 
+_LOAD_JOB_DF_STATE = None
+
+def _init_load_job_df_worker(collector, jobs):
+    # pylint: disable=global-statement
+    global _LOAD_JOB_DF_STATE
+    _LOAD_JOB_DF_STATE = (collector, jobs)
+
+def _load_job_df_worker(i):
+    """
+    Load the dataframe of the i-th job given to the pool initializer.
+
+    The collector and jobs are passed to the initializer rather than to each
+    task so that they do not need to be pickled when the workers are forked.
+    """
+    collector, jobs = _LOAD_JOB_DF_STATE
+    # pylint: disable=protected-access
+    return collector._try_load_job_df(jobs[i])
+
+
 class WAOutputNotFoundError(Exception):
     def __init__(self, collectors):
         # pylint: disable=super-init-not-called
@@ -247,15 +271,20 @@ class WACollectorBase(StatsProp, Loggable, abc.ABC):
         :class:`pandas.DataFrame`.
     :type df_postprocess: collections.abc.Callable
 
+    :param nr_processes: Number of processes used to load the jobs'
+        dataframes. If ``None``, the number of CPUs is used.
+    :type nr_processes: int or None
+
     .. seealso:: Instances of this classes are typically built using
         :meth:`WAOutput.get_collector` rather than directly.
     """
 
     _EXPECTED_WORKLOAD_NAME = None
 
-    def __init__(self, wa_output, df_postprocess=None):
+    def __init__(self, wa_output, df_postprocess=None, nr_processes=1):
         self.wa_output = wa_output
         self._df_postprocess = df_postprocess or (lambda x: x)
+        self._nr_processes = nr_processes
 
     @abc.abstractclassmethod
     def _get_job_df(cls, job):
@@ -298,55 +327,152 @@ class WACollectorBase(StatsProp, Loggable, abc.ABC):
         """
         return self._get_df()
 
-    def _get_df(self):
-        self.logger.debug(f"Collecting dataframe for {self.NAME}")
+    def _load_job_df(self, job):
+        cache_path = os.path.join(
+            job.basepath,
+            f'.{self.NAME}-cache.{VERSION_TOKEN}.parquet'
+        )
 
-        wa_outputs = list(discover_wa_outputs(self.wa_output.path))
+        # _get_job_df usually returns fairly large dataframes, so cache
+        # the result for faster reloading
+        try:
+            df = pd.read_parquet(cache_path)
+        # A cache that cannot be read is treated as missing and overwritten
+        except (OSError, pyarrow.lib.ArrowException):
+            df = self._get_job_df(job)
+            # Jobs are loaded concurrently by worker processes that can be
+            # killed at any point, so the cache is replaced atomically to
+            # never leave a truncated file behind.
+            fd, temp_path = tempfile.mkstemp(dir=job.basepath, prefix='.', suffix='.tmp')
+            os.close(fd)
+            try:
+                df.to_parquet(temp_path)
+                os.replace(temp_path, cache_path)
+            except BaseException:
+                with contextlib.suppress(OSError):
+                    os.unlink(temp_path)
+                raise
+        return df
+
+    def _try_load_job_df(self, job):
+        try:
+            return self._load_job_df(job)
+        except Exception as e: # pylint: disable=broad-except
+            return e
+
+    def _iter_jobs_df(self, jobs):
+        """
+        Yield the dataframe of each job in ``jobs`` in order, or the exception
+        raised while loading it.
+        """
+        nr_processes = self._nr_processes
+        nr_processes = multiprocessing.cpu_count() if nr_processes is None else nr_processes
+        nr_processes = min(nr_processes, len(jobs))
 
-        def load_df(job):
-            def loader(job):
-                cache_path = os.path.join(
-                    job.basepath,
-                    f'.{self.NAME}-cache.{VERSION_TOKEN}.parquet'
+        if nr_processes <= 1:
+            yield from map(self._try_load_job_df, jobs)
+        else:
+            # Keep a bounded number of jobs in flight, so that the dataframes
+            # are not piling up in memory if the consumer is slower than the
+            # workers.
+            max_in_flight = 2 * nr_processes
+
+            def make_executor():
+                # Unlike multiprocessing.Pool, the workers are not daemonic so
+                # they can use a process pool themselves, e.g. to parse a
+                # trace.
+                return ProcessPoolExecutor(
+                    max_workers=nr_processes,
+                    mp_context=multiprocessing.get_context('fork'),
+                    initializer=_init_load_job_df_worker,
+                    initargs=(self, jobs),
                 )
 
-                # _get_job_df usually returns fairly large dataframes, so cache
-                # the result for faster reloading
+            executor = make_executor()
+
+            def replace_executor(broken):
+                nonlocal executor
+                # Another job may already have replaced the broken executor
+                if executor is broken:
+                    broken.shutdown(wait=False)
+                    executor = make_executor()
+
+            def submit(i):
                 try:
-                    df = pd.read_parquet(cache_path)
-                except OSError:
-                    df = self._get_job_df(job)
-                    df.to_parquet(cache_path)
-                return df
+                    return (i, executor, executor.submit(_load_job_df_worker, i))
+                # A worker died, e.g. killed by the OOM killer, which breaks
+                # the whole pool. The remaining jobs go to a new one.
+                except BrokenProcessPool:
+                    replace_executor(executor)
+                    return (i, executor, executor.submit(_load_job_df_worker, i))
+
+            def get(submitted, retry=True):
+                i, _executor, future = submitted
+                try:
+                    return future.result()
+                # All the jobs in flight fail when a worker dies, so give them
+                # another chance in a new pool. The job that killed the worker
+                # will fail again, but then only the jobs submitted along with
+                # it are affected.
+                except BrokenProcessPool as e:
+                    replace_executor(_executor)
+                    if retry:
+                        return get(submit(i), retry=False)
+                    else:
+                        return e
+                # The exception could not be sent back by the worker
+                except Exception as e: # pylint: disable=broad-except
+                    return e
 
             try:
-                df = loader(job)
-            except Exception as e: # pylint: disable=broad-except
+                in_flight = deque()
+                for i in range(len(jobs)):
+                    if len(in_flight) >= max_in_flight:
+                        yield get(in_flight.popleft())
+
+                    in_flight.append(submit(i))
+
+                for submitted in in_flight:
+                    yield get(submitted)
+            finally:
+                executor.shutdown()
+
+    def _get_df(self):
+        self.logger.debug(f"Collecting dataframe for {self.NAME}")
+
+        wa_outputs = list(discover_wa_outputs(self.wa_output.path))
+        jobs = [
+            (wa_output, job)
+            for wa_output in wa_outputs
+            for job in wa_output.jobs
+            if job.status == Status.OK
+        ]
+
+        def process_df(wa_output, job, df):
+            if isinstance(df, BaseException):
                 # Swallow the error if that job was not from the expected
                 # workload
                 expected_name = self._EXPECTED_WORKLOAD_NAME
                 if expected_name is None or job.spec.workload_name == expected_name:
-                    self.logger.error(f'Could not load {self.NAME} dataframe for job {job}: {e}')
-                else:
-                    return None
+                    self.logger.error(f'Could not load {self.NAME} dataframe for job {job}: {df}')
+                return None
             else:
-                return self._df_postprocess(df)
+                df = self._df_postprocess(df)
+                return self._add_kernel_version(wa_output, df)
 
         dfs = [
-            self._add_kernel_version(wa_output, df)
-            for wa_output in wa_outputs
-            for df in [
-                load_df(job)
-                for job in wa_output.jobs
-                if job.status == Status.OK
-            ]
-            if df is not None
+            process_df(wa_output, job, df)
+            for (wa_output, job), df in zip(
+                jobs,
+                self._iter_jobs_df([job for _, job in jobs]),
+            )
         ]
+        dfs = [df for df in dfs if df is not None]
 
         if not dfs:
             raise WAOutputNotFoundError.from_collector(self, 'Could not find any valid job output')
 
-        # It is unfortunately not safe to cache the output of load_df, as the
+        # It is unfortunately not safe to cache the output of process_df, as the
         # user postprocessing could change at any time
         df = _df_concat(dfs)
         return self._add_kernel_id(df)
@@ -511,6 +637,9 @@ class WATraceCollector(WAArtifactCollectorBase):
         :class:`lisa.trace.Trace` to a :class:`pandas.DataFrame`.
     :type trace_to_df: collections.abc.Callable
 
+    :param nr_processes: See :class:`WACollectorBase`.
+    :type nr_processes: int or None
+
     :Variable keyword arguments: Forwarded to :class:`lisa.trace.Trace`.
 
     **Example**::
@@ -539,10 +668,10 @@ class WATraceCollector(WAArtifactCollectorBase):
     NAME = 'trace'
     _ARTIFACT_NAME = 'trace-cmd-bin'
 
-    def __init__(self, wa_output, trace_to_df, **kwargs):
+    def __init__(self, wa_output, trace_to_df, nr_processes=1, **kwargs):
         self._trace_to_df = trace_to_df
         self._trace_kwargs = kwargs
-        super().__init__(wa_output, df_postprocess=None)
+        super().__init__(wa_output, df_postprocess=None, nr_processes=nr_processes)
 
     def _get_artifact_df(self, path):
         trace = Trace(path, **self._trace_kwargs)
@@ -17,7 +17,10 @@
 #
 
 from collections import namedtuple, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+import contextlib
 import json
+import multiprocessing
 import numpy as np
 import re
 import os
@@ -34,12 +37,36 @@ from devlib.target import KernelVersion
 
 from IPython.display import display
 
+from lisa.version import VERSION_TOKEN
 from lisa.trace import Trace
 from lisa.git import find_shortest_symref, get_commit_message
 from lisa.utils import Loggable, memoized
 from lisa.datautils import series_integrate, series_mean
 
 
+_WaJob = namedtuple('_WaJob', ['job_dir', 'workload', 'iteration', 'id', 'tag', 'test'])
+_WaDirJobs = namedtuple('_WaDirJobs', ['wa_dir', 'df', 'jobs', 'skipped_jobs', 'tag_map', 'test_map', 'job_dir_map'])
+
+_EXTRA_METRICS_STATE = None
+
+def _init_extra_metrics_worker(collector, jobs):
+    # pylint: disable=global-statement
+    global _EXTRA_METRICS_STATE
+    _EXTRA_METRICS_STATE = (collector, jobs)
+
+def _extra_metrics_worker(i):
+    """
+    Get the extra metrics of the i-th job given to the pool initializer.
+
+    The collector and jobs are passed to the initializer rather than to each
+    task so that they do not need to be pickled when the workers are forked.
+    """
+    collector, jobs = _EXTRA_METRICS_STATE
+    job = jobs[i]
+    # pylint: disable=protected-access
+    return collector._get_extra_job_metrics(job.job_dir, job.workload)
+
+
 class WaResultsCollector(Loggable):
     """
     Collects, analyses and visualises results from multiple WA3 directories
@@ -117,12 +144,28 @@ class WaResultsCollector(Loggable):
                            only interested in table of figures. Set this param
                            to False if you only want table of results but not
                            display them.
+
+    :param nr_processes: Number of processes used to extract the extra metrics
+                     of the jobs. If ``None``, the number of CPUs is used.
+    :type nr_processes: int or None
+
+    :param index_path: Path of the index of extra metrics. The extra
+                     metrics of every job are recorded there along with the
+                     modification time of the job's files, so that only new or
+                     modified jobs are processed when the results are read
+                     again. Defaults to a file in ``base_dir``, or in the common
+                     parent of ``wa_dirs``. The index is not used if
+                     ``use_cached_trace_metrics=False``.
+    :type index_path: str or None
     """
     RE_WLTEST_DIR = re.compile(r"wa\.(?P<sha1>\w+)_(?P<name>.+)")
 
+    INDEX_FILENAME = '.lisa_wa_results_index.parquet'
+
     def __init__(self, base_dir=None, wa_dirs=".*", plat_info=None,
                  kernel_repo_path=None, parse_traces=True,
-                 use_cached_trace_metrics=True, display_charts=True):
+                 use_cached_trace_metrics=True, display_charts=True,
+                 nr_processes=1, index_path=None):
 
         logger = self.get_logger()
 
@@ -148,12 +191,41 @@ class WaResultsCollector(Loggable):
             logger.warning("Trace parsing disabled")
         self.use_cached_trace_metrics = use_cached_trace_metrics
         self.display_charts = display_charts
-
-        df = pd.DataFrame()
-        df_list = []
+        self.nr_processes = nr_processes
+
+        if not use_cached_trace_metrics:
+            index_path = None
+        elif index_path is None:
+            index_dir = base_dir or os.path.commonpath([
+                os.path.abspath(wa_dir)
+                for wa_dir in wa_dirs
+            ])
+            index_path = os.path.join(index_dir, self.INDEX_FILENAME)
+        self.index_path = index_path
+
+        wa_dirs_jobs = []
         for wa_dir in wa_dirs:
             logger.info("Reading wa_dir %s", wa_dir)
-            df_list.append(self._read_wa_dir(wa_dir))
+            wa_dirs_jobs.append(self._read_wa_dir_jobs(wa_dir))
+
+        # Extract the extra metrics of all the jobs at once, so that the work
+        # can be spread across processes regardless of the number of jobs in
+        # each WA directory.
+        jobs = [
+            job
+            for wa_dir_jobs in wa_dirs_jobs
+            for job in wa_dir_jobs.jobs
+        ]
+        extra_dfs = dict(zip(
+            (job.job_dir for job in jobs),
+            self._get_jobs_extra_metrics(jobs),
+        ))
+
+        df = pd.DataFrame()
+        df_list = [
+            self._read_wa_dir(wa_dir_jobs, extra_dfs)
+            for wa_dir_jobs in wa_dirs_jobs
+        ]
         df = df.append(df_list)
 
         kernel_refs = {}
@@ -204,16 +276,13 @@ class WaResultsCollector(Loggable):
 
         return dirs
 
-    def _read_wa_dir(self, wa_dir):
+    def _read_wa_dir_jobs(self, wa_dir):
         """
-        Get a DataFrame of metrics from a single WA3 output directory.
+        Read the metrics reported by WA in a single WA3 output directory, along
+        with the list of jobs that ran successfully.
 
-        Includes the extra metrics derived from workload-specific artifacts and
-        ftrace files.
-
-        Columns returned:
-
-        kernel_name,kernel_sha1,kernel,id,workload,tag,test,iteration,metric,value,units
+        The extra metrics of these jobs are then expected to be fed to
+        :meth:`_read_wa_dir`.
         """
         # A WA output directory looks something like:
         #
@@ -229,8 +298,6 @@ class WaResultsCollector(Loggable):
         # |- pelt-wk1-jankbench-2/
         #      [etc]
 
-        logger = self.get_logger()
-
         # results.csv contains all the metrics reported by WA for all jobs.
         df = pd.read_csv(os.path.join(wa_dir, 'results.csv'))
         # When using Monsoon, the device is a single channel which reports
@@ -288,7 +355,7 @@ class WaResultsCollector(Loggable):
         tag_map = {}
         test_map = {}
         job_dir_map = {}
-        extra_dfs = []
+        ok_jobs = []
 
         for job in jobs:
             workload = job['workload_name']
@@ -355,17 +422,65 @@ class WaResultsCollector(Loggable):
                     skipped_jobs[iteration].append(job_id)
                     continue
 
-            extra_df = self._get_extra_job_metrics(job_dir, workload)
-            if extra_df.empty:
-                continue
+            ok_jobs.append(_WaJob(
+                job_dir=job_dir,
+                workload=workload,
+                iteration=iteration,
+                id=job_id,
+                tag=tag,
+                test=test,
+            ))
+
+        return _WaDirJobs(
+            wa_dir=wa_dir,
+            df=df,
+            jobs=ok_jobs,
+            skipped_jobs=skipped_jobs,
+            tag_map=tag_map,
+            test_map=test_map,
+            job_dir_map=job_dir_map,
+        )
+
+    def _read_wa_dir(self, wa_dir_jobs, extra_dfs):
+        """
+        Get a DataFrame of metrics from a single WA3 output directory.
 
-            extra_df['workload'] = workload
-            extra_df['iteration'] = iteration
-            extra_df['id'] = job_id
-            extra_df['tag'] = tag
-            extra_df['test'] = test
-            # Collect all these DFs to merge them in one go at the end.
-            extra_dfs.append(extra_df)
+        Includes the extra metrics derived from workload-specific artifacts and
+        ftrace files.
+
+        :param wa_dir_jobs: Value returned by :meth:`_read_wa_dir_jobs`.
+        :type wa_dir_jobs: _WaDirJobs
+
+        :param extra_dfs: Mapping of job directories to the dataframe of extra
+            metrics returned by :meth:`_get_extra_job_metrics`.
+        :type extra_dfs: dict(str, pandas.DataFrame)
+
+        Columns returned:
+
+        kernel_name,kernel_sha1,kernel,id,workload,tag,test,iteration,metric,value,units
+        """
+        logger = self.get_logger()
+        wa_dir = wa_dir_jobs.wa_dir
+        df = wa_dir_jobs.df
+        skipped_jobs = wa_dir_jobs.skipped_jobs
+        tag_map = wa_dir_jobs.tag_map
+        test_map = wa_dir_jobs.test_map
+        job_dir_map = wa_dir_jobs.job_dir_map
+
+        extra_dfs = [
+            extra_df.assign(
+                workload=job.workload,
+                iteration=job.iteration,
+                id=job.id,
+                tag=job.tag,
+                test=job.test,
+            )
+            for job, extra_df in (
+                (job, extra_dfs[job.job_dir])
+                for job in wa_dir_jobs.jobs
+            )
+            if not extra_df.empty
+        ]
 
         # Append all extra DFs to the results WA's results DF
         if extra_dfs:
@@ -589,6 +704,175 @@ class WaResultsCollector(Loggable):
         else:
             return pd.DataFrame()
 
+    def _get_job_signature(self, job_dir):
+        """
+        Summarize the state of the files of a job, so that changes in the job
+        output can be detected.
+
+        The version of LISA is included, so that entries computed by another
+        version are not reused.
+        """
+        paths = [
+            os.path.join(job_dir, 'result.json'),
+            *sorted(self._read_artifacts(job_dir).values()),
+        ]
+
+        def get_stat(path):
+            try:
+                stat = os.stat(path)
+            except OSError:
+                return None
+            else:
+                return (stat.st_mtime_ns, stat.st_size)
+
+        return json.dumps([
+            VERSION_TOKEN,
+            self.parse_traces,
+            [
+                (os.path.relpath(path, job_dir), get_stat(path))
+                for path in paths
+            ]
+        ])
+
+    def _read_index(self):
+        """
+        Read the index of extra metrics.
+
+        :returns: A :class:`pandas.DataFrame` with a row per metric and the
+            ``_index_*`` columns identifying the job it comes from.
+        """
+        if self.index_path is None:
+            return None
+
+        try:
+            return pd.read_parquet(self.index_path)
+        # Missing or corrupted index
+        except Exception as e: # pylint: disable=broad-except
+            if os.path.exists(self.index_path):
+                self.get_logger().warning(f'Could not read the index {self.index_path}: {e}')
+            return None
+
+    def _write_index(self, index_df, jobs, signatures, extra_dfs):
+        """
+        Write the index of extra metrics, replacing the entries of the given
+        jobs and keeping the ones of other jobs.
+        """
+        if self.index_path is None:
+            return
+
+        def make_entry(job, signature, df):
+            columns = list(map(str, df.columns))
+            empty = df.empty
+            # Empty dataframes still get a row, so that the job is not
+            # processed again.
+            df = pd.DataFrame(index=[0]) if empty else df.copy(deep=False)
+            df.columns = list(map(str, df.columns))
+            return df.assign(
+                _index_job_dir=os.path.abspath(job.job_dir),
+                _index_job_id=job.id,
+                _index_signature=signature,
+                _index_columns=json.dumps(columns),
+                _index_empty=empty,
+            )
+
+        dfs = list(map(make_entry, jobs, signatures, extra_dfs))
+        if index_df is not None:
+            job_dirs = {
+                os.path.abspath(job.job_dir)
+                for job in jobs
+            }
+            dfs.insert(0, index_df[~index_df['_index_job_dir'].isin(job_dirs)])
+
+        df = pd.concat(dfs, ignore_index=True, sort=False)
+        tmp_path = f'{self.index_path}.{os.getpid()}.tmp'
+        try:
+            df.to_parquet(tmp_path, index=False)
+            os.replace(tmp_path, self.index_path)
+        # The index is only an optimization, so its update is best effort
+        except Exception as e: # pylint: disable=broad-except
+            self.get_logger().warning(f'Could not update the index {self.index_path}: {e}')
+            with contextlib.suppress(OSError):
+                os.remove(tmp_path)
+
+    def _compute_jobs_extra_metrics(self, jobs):
+        nr_processes = self.nr_processes
+        nr_processes = multiprocessing.cpu_count() if nr_processes is None else nr_processes
+        nr_processes = min(nr_processes, len(jobs))
+
+        if nr_processes <= 1:
+            return [
+                self._get_extra_job_metrics(job.job_dir, job.workload)
+                for job in jobs
+            ]
+        else:
+            # The workers are not daemonic so they can parse traces using
+            # multiple processes.
+            with ProcessPoolExecutor(
+                max_workers=nr_processes,
+                mp_context=multiprocessing.get_context('fork'),
+                initializer=_init_extra_metrics_worker,
+                initargs=(self, jobs),
+            ) as executor:
+                return list(executor.map(_extra_metrics_worker, range(len(jobs))))
+
+    def _get_jobs_extra_metrics(self, jobs):
+        """
+        Get the extra metrics of each job as returned by
+        :meth:`_get_extra_job_metrics`.
+
+        The jobs recorded in the index with the same files are not processed
+        again, the other ones are processed using ``nr_processes`` processes.
+        """
+        logger = self.get_logger()
+        index_df = self._read_index()
+        if index_df is None:
+            index = {}
+        else:
+            def make_df(df):
+                columns = json.loads(df['_index_columns'].iloc[0])
+                if df['_index_empty'].iloc[0]:
+                    return pd.DataFrame(columns=columns)
+                else:
+                    return df[columns].reset_index(drop=True)
+
+            index = {
+                key: make_df(df)
+                for key, df in index_df.groupby(
+                    ['_index_job_dir', '_index_signature'],
+                    sort=False,
+                )
+            }
+
+        signatures = [
+            self._get_job_signature(job.job_dir)
+            for job in jobs
+        ]
+        extra_dfs = [
+            index.get((os.path.abspath(job.job_dir), signature))
+            for job, signature in zip(jobs, signatures)
+        ]
+        todo = [
+            i
+            for i, df in enumerate(extra_dfs)
+            if df is None
+        ]
+
+        if todo:
+            logger.info(f'Extracting extra metrics of {len(todo)} jobs ({len(jobs) - len(todo)} already indexed)')
+            todo_jobs = [jobs[i] for i in todo]
+            todo_dfs = self._compute_jobs_extra_metrics(todo_jobs)
+            for i, df in zip(todo, todo_dfs):
+                extra_dfs[i] = df
+
+            self._write_index(
+                index_df,
+                todo_jobs,
+                [signatures[i] for i in todo],
+                todo_dfs,
+            )
+
+        return extra_dfs
+
     @memoized
     def _wa_get_kernel_version(self, wa_dir):
         with open(os.path.join(wa_dir, '__meta', 'target_info.json')) as f:
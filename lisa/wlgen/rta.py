@@ -764,7 +764,7 @@ class RTA(Workload):
         return {'calib': pload}
 
     @classmethod
-    def _calibrate(cls, target, res_dir):
+    def _calibrate(cls, target, res_dir, parallel=True):
         res_dir = res_dir if res_dir else target .get_res_dir(
             "rta_calib", symlink=False
         )
@@ -782,10 +782,7 @@ class RTA(Workload):
             priority = None
             sched_policy = None
 
-        pload = {}
-        for cpu in target.list_online_cpus():
-            logger.debug(f'Starting CPU{cpu} calibration...')
-
+        def make_rta(cpu):
             # RT-app will run a calibration for us, so we just need to
             # run a dummy task and read the output
             calib_task = RTAPhase(
@@ -796,8 +793,11 @@ class RTA(Workload):
                 ),
                 prop_priority=priority,
                 prop_policy=sched_policy,
+                # Instances of a given capacity class run at the same time,
+                # so each task must stay on the CPU being calibrated
+                prop_cpus=[cpu],
             )
-            rta = cls.from_profile(target,
+            return cls.from_profile(target,
                 name=f"rta_calib_cpu{cpu}",
                 profile={'task1': calib_task},
                 calibration=f"CPU{cpu}",
@@ -808,12 +808,54 @@ class RTA(Workload):
                 update_cpu_capacities=False,
             )
 
-            with rta, target.freeze_userspace():
-                output = rta.run()
-            calib = output['calib']
+        cpus = target.list_online_cpus()
+        # rt-app only calibrates one CPU per instance, so run one instance per
+        # CPU of a given capacity class at the same time. The calibration loop
+        # is CPU-bound and each instance is pinned to its own CPU, so this
+        # keeps the number of sequential runs down to the number of capacity
+        # classes.
+        if parallel:
+            try:
+                orig_capacities = target.plat_info['cpu-capacities']['orig']
+            except KeyError:
+                orig_capacities = {}
+
+            cpu_classes = {}
+            for cpu in cpus:
+                cpu_classes.setdefault(orig_capacities.get(cpu), []).append(cpu)
+            cpu_classes = list(cpu_classes.values())
+        else:
+            cpu_classes = [[cpu] for cpu in cpus]
 
-            logger.info(f'CPU{cpu} calibration={calib[cpu]}')
-            pload.update(calib)
+        rtas = {
+            cpu: make_rta(cpu)
+            for cpu in cpus
+        }
+
+        pload = {}
+        with contextlib.ExitStack() as stack:
+            for rta in rtas.values():
+                stack.enter_context(rta)
+
+            with target.freeze_userspace():
+                for cpu_class in cpu_classes:
+                    logger.debug(f'Starting CPU{",".join(map(str, cpu_class))} calibration...')
+
+                    with contextlib.ExitStack() as bg_stack:
+                        bg_list = [
+                            bg_stack.enter_context(rtas[cpu].run_background())
+                            for cpu in cpu_class
+                        ]
+                        # Wait on the commands explicitly, as relying on
+                        # __exit__() will close their standard streams, leading
+                        # to an early termination.
+                        for bg in bg_list:
+                            bg.wait()
+
+                    for cpu, bg in zip(cpu_class, bg_list):
+                        calib = bg.output['calib']
+                        logger.info(f'CPU{cpu} calibration={calib[cpu]}')
+                        pload.update(calib)
 
         # Avoid circular import issue
         from lisa.platforms.platinfo import PlatformInfo
@@ -969,13 +1011,18 @@ class RTA(Workload):
 
 
     @classmethod
-    def get_cpu_calibrations(cls, target, res_dir=None):
+    def get_cpu_calibrations(cls, target, res_dir=None, parallel=True):
         """
         Get the rt-ap calibration value for all CPUs.
 
         :param target: Target to run calibration on.
         :type target: lisa.target.Target
 
+        :param parallel: If ``True``, all the CPUs of a given capacity class
+            are calibrated at the same time. Otherwise, CPUs are calibrated
+            one after the other.
+        :type parallel: bool
+
         :returns: Dict mapping CPU numbers to rt-app calibration values.
         """
 
@@ -987,7 +1034,7 @@ class RTA(Workload):
             cm = target.cpufreq.use_governor('performance')
 
         with cm, target.disable_idle_states():
-            return cls._calibrate(target, res_dir)
+            return cls._calibrate(target, res_dir, parallel=parallel)
 
     @classmethod
     def _compute_task_map(cls, trace, names):
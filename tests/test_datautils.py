@@ -17,6 +17,7 @@
 
 from unittest import TestCase
 
+import numpy as np
 import pandas as pd
 
 import lisa.datautils as du
@@ -36,3 +37,20 @@ class DfCheck(TestCase):
                 assert len(subdf) == 3
             else:
                 assert len(subdf) == 2
+
+    def test_df_update_duplicates(self):
+        index = [1.0, 1.0, 1.0, np.nextafter(1.0, 2), 2.0, 2.0]
+        df = pd.DataFrame(index=index, data=dict(foo=range(len(index))))
+
+        df2 = du.df_update_duplicates(df)
+        assert df2.index.is_unique
+        assert df2.index.is_monotonic_increasing
+        assert (df2['foo'] == df['foo'].values).all()
+        assert df2.index[0] == 1.0
+        assert df2.index[1] == np.nextafter(1.0, 2)
+        assert df2.index[-1] == np.nextafter(2.0, 3)
+        # The original dataframe is left untouched
+        assert list(df.index) == index
+
+        df3 = du.df_update_duplicates(df.reset_index(), col='index')
+        assert list(df3['index']) == list(df2.index)
@@ -16,11 +16,13 @@
 #
 
 from collections import OrderedDict
+from itertools import product
 from unittest import TestCase
 import os
 import shutil
 import tempfile
 
+import numpy as np
 import pytest
 
 from devlib.target import KernelVersion
@@ -208,6 +210,48 @@ class TestOptimalPlacement(TestCase):
         with pytest.raises(EnergyModelCapacityError):
             em.get_optimal_placements(tasks)
 
+    def test_symmetric_cpu_classes(self):
+        assert em._symmetric_cpu_classes == [(0, 1), (2, 3)]
+
+    def test_brute_force(self):
+        """
+        Check that the search gives the same result as trying all placements
+        """
+        def brute_force(capacities):
+            candidates = {}
+            for cpus in product(em.cpus, repeat=len(capacities)):
+                util = [0] * len(em.cpus)
+                for cap, cpu in zip(capacities.values(), cpus):
+                    util[cpu] += cap
+                util = tuple(util)
+                freqs, overutilized = em._guess_freqs(util, 0)
+                if not overutilized:
+                    power = em.estimate_from_cpu_util(util, freqs=freqs)
+                    candidates[util] = sum(power.values())
+
+            min_power = min(candidates.values())
+            return {u for u, p in candidates.items() if p == min_power}
+
+        for utils in [
+            [10, 50, 100],
+            [100, 100, 150, 250],
+            [1, 199, 200, 300, 350],
+            [50, 50, 50, 50, 50, 50],
+        ]:
+            tasks = {
+                f'task{i}': util
+                for i, util in enumerate(utils)
+            }
+            self.assert_placement_list_equal(
+                em.get_optimal_placements(tasks),
+                brute_force(tasks),
+            )
+
+    def test_many_tasks(self):
+        tasks = {f'task{i}': 30 for i in range(14)}
+        placements = em.get_optimal_placements(tasks)
+        self.assert_placement_list_equal(placements, [[0, 0, 210, 210]])
+
 
 class TestBiggestCpus(TestCase):
     def test_biggest_cpus(self):
@@ -473,6 +517,41 @@ class TestEstimateFromTrace(TestCase):
             assert row.name == pytest.approx(exp_index, abs=1e-4)
             assert row.to_dict() == exp_values
 
+    def test_estimate_from_states(self):
+        """
+        Check the vectorized estimation against estimate_from_cpu_util()
+        """
+        idle = np.array([
+            [1, 1, 1, 1],
+            [-1, 1, 2, 2],
+            [-1, -1, -1, 2],
+            [0, 2, -1, -1],
+        ])
+        freqs = np.array([
+            [1000, 1000, 3000, 3000],
+            [1500, 1500, 3000, 3000],
+            [2000, 2000, 4000, 4000],
+            [1000, 1000, 4000, 4000],
+        ])
+        nrg = em._estimate_from_states(idle, freqs)
+
+        for i, (row_idle, row_freqs) in enumerate(zip(idle, freqs)):
+            cpus_active = row_idle == -1
+            deepest_possible = em._deepest_idle_idxs(cpus_active)
+            idle_states = [
+                node.idle_state_by_idx(max(min(i, j), 0))
+                for node, i, j in zip(em.cpu_nodes, deepest_possible, row_idle)
+            ]
+            expected = em.estimate_from_cpu_util(
+                cpu_utils=cpus_active * em.capacity_scale,
+                idle_states=idle_states,
+                freqs=row_freqs,
+            )
+            assert {
+                cpus: energy[i]
+                for cpus, energy in nrg.items()
+            } == expected
+
 
 class TestSerialization(StorageTestCase):
     """
@@ -0,0 +1,99 @@
+# SPDX-License-Identifier: Apache-2.0
+#
+# Copyright (C) 2021, Arm Limited and contributors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+from unittest import TestCase
+
+import numpy as np
+import pandas as pd
+
+from lisa.analysis.functions import _CallGraph
+from lisa.trace import Trace, MockTraceParser
+from lisa.platforms.platinfo import PlatformInfo
+
+
+class TestCallGraph(TestCase):
+    def _make_graph(self):
+        ENTRY = _CallGraph._EVENT.ENTRY
+        EXIT = _CallGraph._EVENT.EXIT
+        SET_TAG = _CallGraph._EVENT.SET_TAG
+        records = [
+            (1, ENTRY, 'a', None),
+            (2, ENTRY, 'b', None),
+            # Recursive call of "a", inlined in the first call
+            (3, ENTRY, 'a', None),
+            (4, ENTRY, 'c', None),
+            (4.5, SET_TAG, None, {'k': 1}),
+            (5, EXIT, 'c', None),
+            (6, EXIT, 'a', None),
+            (7, EXIT, 'b', None),
+            # Preempting "a"
+            (8, ENTRY, 'irq', None),
+            (9, EXIT, 'irq', None),
+            (10, EXIT, 'a', None),
+            # Missing exit event
+            (11, ENTRY, 'd', None),
+            (12, ENTRY, 'e', None),
+            (13, EXIT, 'e', None),
+        ]
+        df = pd.DataFrame.from_records(
+            records,
+            columns=['Time', 'event', 'func_name', 'tags'],
+            index='Time',
+        )
+        df['__cpu'] = 0
+        return _CallGraph.from_df(df, thread_root_functions=['irq'], ts_cols=None)
+
+    def test_calls(self):
+        calls = self._make_graph().calls
+        assert list(calls['func_name']) == ['a', 'c', 'd', 'e']
+        assert list(calls['entry_time']) == [1, 4, 11, 12]
+
+        np.testing.assert_array_equal(calls['self_time'], [7, 1, np.nan, 1])
+        np.testing.assert_array_equal(calls['cum_time'], [8, 1, np.nan, 1])
+
+    def test_tags(self):
+        calls = self._make_graph().calls
+        tags = [dict(tags) for tags in calls['tags']]
+        assert tags == [{'k': {1}}, {'k': {1}}, {}, {}]
+        assert list(calls['tagged_name']) == ['a (k=1)', 'c (k=1)', 'd', 'e']
+
+
+class TestResolveKsym(TestCase):
+    addr_map = {
+        0x300: 'baz',
+        0x100: 'foo',
+        0x200: 'bar',
+    }
+
+    def _make_trace(self):
+        plat_info = PlatformInfo({
+            'kernel': {
+                'symbols-address': self.addr_map,
+            },
+        })
+        return Trace(parser=MockTraceParser({}), plat_info=plat_info)
+
+    def _check(self, df):
+        expected = [None, 'foo', 'foo', 'bar', 'baz', 'baz']
+        assert df['func_name'].dtype.name == 'category'
+        assert list(df['func_name'].astype(object).where(df['func_name'].notna(), None)) == expected
+
+    def test_inexact(self):
+        df = pd.DataFrame(dict(ip=np.array([0x10, 0x100, 0x1ff, 0x200, 0x300, 0x400], dtype=np.uint64)))
+        analysis = self._make_trace().analysis.functions
+        self._check(analysis.df_resolve_ksym(df, 'ip', exact=False))
+        self._check(analysis.df_resolve_ksym(df, 'ip', addr_map=self.addr_map, exact=False))
@@ -0,0 +1,53 @@
+# SPDX-License-Identifier: Apache-2.0
+#
+# Copyright (C) 2021, Arm Limited and contributors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+from unittest import TestCase
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from lisa.pelt import simulate_pelt, pelt_step_response, PELT_WINDOW, PELT_SCALE
+
+
+class SimulatePeltCheck(TestCase):
+    def _step_activations(self, duration, step):
+        # Keep running for the whole duration, with a sample at every step
+        index = np.arange(0, duration, step)
+        return pd.Series(np.ones(len(index)), index=index)
+
+    def test_windowless_step_response(self):
+        activations = self._step_activations(0.5, 1e-3)
+        pelt = simulate_pelt(activations, windowless=True)
+
+        expected = [pelt_step_response(t) for t in pelt.index]
+        assert pelt.dropna().values == pytest.approx(expected[1:], rel=1e-9)
+
+    def test_windowed_step_response(self):
+        activations = self._step_activations(0.5, PELT_WINDOW / 3)
+        pelt = simulate_pelt(activations)
+
+        expected = [pelt_step_response(t) for t in pelt.index]
+        # Windowing induces some lag compared to the continuous response
+        assert pelt.dropna().values == pytest.approx(expected[1:], abs=0.02 * PELT_SCALE)
+
+    def test_windowed_long_sleep(self):
+        # A long sleep must decay the signal to 0 without any underflow issue
+        activations = pd.Series([1, 1, 0], index=[0, 0.5, 1000])
+        pelt = simulate_pelt(activations, init=PELT_SCALE)
+        assert pelt.iloc[-1] == pytest.approx(0)
+        assert not pelt.dropna().empty
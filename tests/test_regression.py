@@ -0,0 +1,179 @@
+# SPDX-License-Identifier: Apache-2.0
+#
+# Copyright (C) 2021, Arm Limited and contributors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import re
+import random
+import itertools
+from unittest import TestCase
+
+import pandas as pd
+
+from lisa.regression import RegressionResult, compute_regressions, compute_regressions_df
+from lisa.tests.base import Result, ResultBundle
+
+
+class FakeFrozVal:
+    """
+    Minimal stand-in for :class:`exekall.engine.FrozenExprVal`.
+    """
+    _UUID = itertools.count()
+
+    def __init__(self, id_, value):
+        self.id_ = id_
+        self.value = value
+        self.uuid = str(next(self._UUID))
+
+    def get_id(self, qual=True, with_tags=True):
+        assert not qual
+        assert with_tags
+        return self.id_
+
+
+class TestComputeRegressions(TestCase):
+    ID_LIST = [
+        'test1[board=b1]',
+        'test1[board=b2]',
+        'test2[board=b1]',
+        'test3[board=b1][kernel=k1]',
+    ]
+
+    def _make_froz_val_list(self, rng, id_list, nr_iter):
+        value_list = [
+            ResultBundle(Result.PASSED),
+            ResultBundle(Result.FAILED),
+            ResultBundle(Result.SKIPPED),
+            ResultBundle(Result.UNDECIDED),
+            True,
+            False,
+        ]
+        return [
+            FakeFrozVal(id_, rng.choice(value_list))
+            for id_ in id_list
+            for i in range(rng.randint(1, nr_iter))
+        ]
+
+    def _make_lists(self):
+        rng = random.Random(42)
+        old_list = self._make_froz_val_list(
+            rng,
+            self.ID_LIST + ['old_only[board=b1]'],
+            nr_iter=30,
+        )
+        new_list = self._make_froz_val_list(
+            rng,
+            self.ID_LIST + ['new_only[board=b1]'],
+            nr_iter=30,
+        )
+        # Only contains results that are neither passed nor failed
+        old_list.append(FakeFrozVal('skipped', ResultBundle(Result.PASSED)))
+        new_list.append(FakeFrozVal('skipped', ResultBundle(Result.SKIPPED)))
+
+        # Values carried from the old series are ignored
+        new_list.extend(old_list[:10])
+        return (old_list, new_list)
+
+    @staticmethod
+    def _get_ref_results(old_list, new_list, remove_tags, alpha):
+        old_uuids = {froz_val.uuid for froz_val in old_list}
+        new_list = [
+            froz_val
+            for froz_val in new_list
+            if froz_val.uuid not in old_uuids
+        ]
+
+        def group(froz_val_list):
+            groups = {}
+            for froz_val in froz_val_list:
+                id_ = froz_val.get_id(qual=False, with_tags=True)
+                for tag in remove_tags:
+                    id_ = re.sub(fr'\[{tag}=.*?\]', '', id_)
+                groups.setdefault(id_, []).append(froz_val.value)
+            return groups
+
+        old_groups = group(old_list)
+        new_groups = group(new_list)
+        return [
+            RegressionResult.from_result_list(
+                testcase_id=id_,
+                old_list=old_groups[id_],
+                new_list=new_groups[id_],
+                alpha=alpha,
+            )
+            for id_ in sorted(old_groups.keys() & new_groups.keys())
+        ]
+
+    def _check_df(self, remove_tags, alpha):
+        old_list, new_list = self._make_lists()
+        df = compute_regressions_df(
+            old_list,
+            new_list,
+            remove_tags=remove_tags,
+            alpha=alpha,
+        )
+
+        ref_list = self._get_ref_results(old_list, new_list, remove_tags, alpha)
+        assert ref_list
+        ref_df = pd.DataFrame.from_records(
+            [
+                (
+                    res.testcase_id,
+                    res.old_count.passed,
+                    res.old_count.failed,
+                    res.new_count.passed,
+                    res.new_count.failed,
+                    *res.failure_pc,
+                    res.failure_delta_pc,
+                    res.p_val,
+                    res.significant,
+                )
+                for res in ref_list
+            ],
+            columns=[
+                'testcase_id',
+                'old_passed',
+                'old_failed',
+                'new_passed',
+                'new_failed',
+                'old_failure_pc',
+                'new_failure_pc',
+                'failure_delta_pc',
+                'p_val',
+                'significant',
+            ],
+            index='testcase_id',
+        )
+
+        pd.testing.assert_frame_equal(df, ref_df, check_dtype=False)
+
+    def test_compute_regressions_df(self):
+        self._check_df(remove_tags=[], alpha=None)
+
+    def test_compute_regressions_df_remove_tags(self):
+        self._check_df(remove_tags=['board'], alpha=0.2)
+
+    def test_compute_regressions(self):
+        old_list, new_list = self._make_lists()
+        res_list = compute_regressions(old_list, new_list, remove_tags=['kernel'])
+        ref_list = self._get_ref_results(old_list, new_list, ['kernel'], alpha=None)
+
+        assert len(res_list) == len(ref_list)
+        for res, ref in zip(res_list, ref_list):
+            assert res.testcase_id == ref.testcase_id
+            assert res.old_count == ref.old_count
+            assert res.new_count == ref.new_count
+            assert res.p_val == ref.p_val
+            assert res.significant == ref.significant
@@ -0,0 +1,112 @@
+# SPDX-License-Identifier: Apache-2.0
+#
+# Copyright (C) 2021, Arm Limited and contributors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+from unittest import TestCase
+
+import pandas as pd
+
+from lisa.trace import Trace, MockTraceParser
+from lisa.wlgen.rta import RTAPhase, RunWload, SleepWload
+from lisa.platforms.platinfo import PlatformInfo
+
+
+class TestRTAAnalysis(TestCase):
+    def setUp(self):
+        wakeup_df = pd.DataFrame.from_records(
+            [
+                (0.5, 0, 0, 'swapper/0', 'task1-0', 100, 120, 0),
+                (0.6, 0, 0, 'swapper/0', 'task2-0', 200, 120, 0),
+            ],
+            columns=('Time', '__cpu', '__pid', '__comm', 'comm', 'pid', 'prio', 'target_cpu'),
+            index='Time',
+        )
+
+        def rtapp_loop(time, pid, comm, event, thread_loop, phase, phase_loop):
+            buf = f'rtapp_loop: event={event} thread_loop={thread_loop} phase={phase} phase_loop={phase_loop}'
+            return (time, 0, pid, comm, 'tracing_mark_write', buf.encode('ascii'))
+
+        print_df = pd.DataFrame.from_records(
+            [
+                rtapp_loop(1, 100, 'task1-0', 'start', 0, 0, 0),
+                rtapp_loop(2, 100, 'task1-0', 'end', 0, 0, 0),
+                rtapp_loop(3, 100, 'task1-0', 'start', 0, 1, 0),
+                rtapp_loop(3.5, 200, 'task2-0', 'start', 0, 0, 0),
+                rtapp_loop(4, 100, 'task1-0', 'end', 0, 1, 0),
+                rtapp_loop(5, 200, 'task2-0', 'end', 0, 0, 0),
+            ],
+            columns=('Time', '__cpu', '__pid', '__comm', 'ip', 'buf'),
+            index='Time',
+        )
+
+        plat_info = PlatformInfo({
+            'cpus-count': 1,
+            'numa-nodes-count': 1,
+            'rtapp': {
+                'calib': {0: 100},
+            },
+        })
+        self.trace = Trace(
+            parser=MockTraceParser(
+                {
+                    'sched_wakeup': wakeup_df,
+                    'print': print_df,
+                },
+                time_range=(0, 6),
+            ),
+            plat_info=plat_info,
+        )
+        self.profile = {
+            'task1': (
+                RTAPhase(prop_name='p1', prop_wload=RunWload(1)) +
+                RTAPhase(prop_name='p2', prop_wload=SleepWload(1), prop_meta={'from_test': True})
+            ),
+            'task2': RTAPhase(prop_name='q1', prop_wload=RunWload(1), prop_meta={'from_test': True}),
+        }
+
+    def test_df_rtapp_phases_properties(self):
+        df = self.trace.analysis.rta.df_rtapp_phases_properties(self.profile)
+        assert df.index.name == 'phase_id'
+        assert df.index.tolist() == [0, 1, 2]
+        assert df['task'].tolist() == ['task1', 'task1', 'task2']
+        assert df['phase'].tolist() == ['p1', 'p2', 'q1']
+        assert df['from_test'].tolist() == [False, True, True]
+        assert [props['name'] for props in df['properties']] == ['p1', 'p2', 'q1']
+
+    def test_df_rtapp_loop(self):
+        ana = self.trace.analysis.rta
+        df = ana.df_rtapp_loop(wlgen_profile=self.profile)
+        assert df['phase'].tolist() == ['p1', 'p1', 'p2', 'q1', 'p2', 'q1']
+        assert df['phase_id'].tolist() == [0, 0, 1, 2, 1, 2]
+        assert df['from_test'].tolist() == [False, False, True, True, True, True]
+
+        phases_df = ana.df_rtapp_phases_properties(self.profile)
+        assert df['properties'].tolist() == phases_df['properties'][df['phase_id']].tolist()
+
+    def test_df_rtapp_loop_no_properties(self):
+        ana = self.trace.analysis.rta
+        df = ana.df_rtapp_loop(wlgen_profile=self.profile, properties=False)
+        assert 'properties' not in df.columns
+        pd.testing.assert_frame_equal(
+            df,
+            ana.df_rtapp_loop(wlgen_profile=self.profile).drop(columns=['properties']),
+        )
+
+    def test_df_phases(self):
+        df = self.trace.analysis.rta.df_phases('task1-0', wlgen_profile=self.profile)
+        assert df['phase'].tolist() == ['p1', 'p2']
+        assert df['duration'].tolist() == [1, 1]
+        assert [props['name'] for props in df['properties']] == ['p1', 'p2']
@@ -0,0 +1,65 @@
+# SPDX-License-Identifier: Apache-2.0
+#
+# Copyright (C) 2020, ARM Limited and contributors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+from unittest import TestCase
+
+import pandas as pd
+import pytest
+
+from lisa.stats import Stats, series_mean_stats
+
+
+class TestStats(TestCase):
+    def _make_df(self):
+        return pd.DataFrame.from_records(
+            [
+                (kernel, metric, iteration, (i + 1) * value)
+                for i, kernel in enumerate(('kernel1', 'kernel2'))
+                for metric, values in (
+                    ('score1', [42, 43, 44, 47]),
+                    ('score2', [420, 421, 422]),
+                )
+                for iteration, value in enumerate(values)
+            ],
+            columns=['kernel', 'metric', 'iteration', 'value'],
+        )
+
+    def test_mean(self):
+        df = self._make_df()
+        stats = Stats(df, stats={'mean': None, 'std': None}).df
+
+        for (kernel, metric), group in df.groupby(['kernel', 'metric']):
+            mean, std, _, ci = series_mean_stats(group['value'], kind='arithmetic')
+            res = stats[(stats['kernel'] == kernel) & (stats['metric'] == metric)]
+            res = res.set_index('stat')
+            assert res.loc['mean', 'value'] == pytest.approx(mean)
+            assert res.loc['std', 'value'] == pytest.approx(std)
+            assert (res.loc['mean', 'ci_minus'], res.loc['mean', 'ci_plus']) == pytest.approx(ci)
+
+    def test_compare(self):
+        df = self._make_df()
+        stats = Stats(df, ref_group={'kernel': 'kernel1'}).df
+
+        assert set(stats['kernel']) == {'kernel2'}
+        stats = stats.set_index(['metric', 'stat'])
+        # All the values of kernel2 are doubled
+        for metric in ('score1', 'score2'):
+            assert stats.loc[(metric, 'mean'), 'value'] == pytest.approx(100)
+            assert stats.loc[(metric, 'median'), 'value'] == pytest.approx(100)
+            assert stats.loc[(metric, 'count'), 'value'] == pytest.approx(0)
+            assert stats.loc[(metric, 'mean'), 'unit'] == '%'
+            assert stats.loc[(metric, 'ks2samp_test'), 'unit'] == 'pval'
@@ -21,6 +21,14 @@ from unittest import TestCase
 from lisa.target import Target
 
 
+def _remote_add(x, y=2):
+    return x + y
+
+
+def _remote_raise():
+    raise KeyError('remote')
+
+
 class TargetEnvCheck(TestCase):
 
     def test_cli(self):
@@ -31,3 +39,26 @@ class TargetEnvCheck(TestCase):
         target = Target.from_cli(shlex.split(args))
 
         assert target.os is not None
+
+    def test_execute_python(self):
+        """
+        Test that remote functions are executed and batched correctly
+        """
+        args = "--kind host --password 'foobar'"
+        target = Target.from_cli(shlex.split(args))
+
+        assert target.execute_python(_remote_add, (1,), {}) == 3
+        assert target.remote_func()(_remote_add)(1, y=3) == 4
+        assert target.execute_python_batch([
+            (_remote_add, (1,), {}),
+            (_remote_add, (2,), {'y': 5}),
+        ]) == [3, 7]
+
+        with self.assertRaises(KeyError):
+            target.execute_python_batch([
+                (_remote_raise, (), {}),
+                (_remote_add, (1,), {}),
+            ])
+
+        # Keyword arguments not supported by the persistent interpreter
+        assert target.execute_python(_remote_add, (1,), {}, check_exit_code=True) == 3
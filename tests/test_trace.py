@@ -21,14 +21,17 @@ from unittest import TestCase
 import numpy as np
 import pandas as pd
 import copy
+import itertools
+import shutil
 
 import pytest
 
 from devlib.target import KernelVersion
 
-from lisa.trace import Trace, TxtTraceParser, TaskID, MockTraceParser
+from lisa.trace import Trace, TxtTraceParser, DatTraceParser, TaskID, MockTraceParser, SharedTraceCache, PandasDataDesc, TraceCache, TraceStream
 from lisa.datautils import df_squash
 from lisa.platforms.platinfo import PlatformInfo
+from lisa.analysis.tasks import TaskState
 from .utils import StorageTestCase, ASSET_DIR
 
 
@@ -373,6 +376,126 @@ class TestTrace(TraceTestCase):
         # Proxy check for detecting delta computation changes
         assert df.delta.sum() == pytest.approx(134.568219)
 
+    def test_df_tasks_residency(self):
+        ana = self.trace.analysis.tasks
+        df = ana.df_tasks_residency()
+        total = ana.df_tasks_total_residency()
+
+        # No task can spend more time than the trace lasts
+        per_task = df['duration'].groupby(level=['pid', 'comm']).sum()
+        assert (per_task <= self.trace.time_range + 1e-9).all()
+        assert total['Total'].sum() == pytest.approx(
+            df.xs(TaskState.TASK_ACTIVE, level='curr_state')['duration'].sum())
+
+        task = TaskID(pid=1642, comm='sh')
+        task_df = ana.df_task_total_residency(task)
+        assert task_df['runtime'].sum() == pytest.approx(total.loc[str(task), 'Total'])
+        assert list(task_df.index) == list(range(self.trace.cpus_count))
+
+
+class TestTraceCache(StorageTestCase):
+    def _make_df(self):
+        return pd.DataFrame(
+            dict(
+                a=np.arange(100),
+                b=np.linspace(0, 1, 100),
+                c=pd.Categorical(['foo', 'bar'] * 50),
+            ),
+            index=pd.Index(np.arange(100) / 10, name='Time'),
+        )
+
+    def test_swap_formats(self):
+        df = self._make_df()
+        for fmt in TraceCache.DATAFRAME_SWAP_FORMATS:
+            cache = TraceCache(swap_dir=self.res_dir)
+            # Pretend the other formats are too slow to be chosen
+            cache._swap_read_cost = {
+                _fmt: 0 if _fmt == fmt else 1
+                for _fmt in cache._swap_read_cost.keys()
+            }
+            pd_desc = PandasDataDesc(spec=dict(fmt=fmt))
+            cache.insert(pd_desc, df, write_swap=True, force_write_swap=True)
+            cache.evict(pd_desc)
+
+            swap_entry = cache._swap_content[pd_desc.normal_form]
+            assert swap_entry.fmt == fmt
+            pd.testing.assert_frame_equal(cache.fetch(pd_desc), df)
+
+    def test_swap_feather_inplace(self):
+        df = self._make_df()
+        cache = TraceCache(swap_dir=self.res_dir)
+        cache._swap_read_cost = {
+            fmt: 0 if fmt == 'feather' else 1
+            for fmt in cache._swap_read_cost.keys()
+        }
+        pd_desc = PandasDataDesc(spec=dict(fmt='feather'))
+        cache.insert(pd_desc, df, write_swap=True, force_write_swap=True)
+        cache.evict(pd_desc)
+
+        # Memory-mapped data is read-only, but a copy can be modified like
+        # any other dataframe without affecting the swap
+        swapped = cache.fetch(pd_desc, insert=False).copy()
+        swapped.loc[swapped.index[0], 'a'] = 42
+        swapped['b'] *= 2
+        assert swapped['a'].iloc[0] == 42
+        pd.testing.assert_frame_equal(cache.fetch(pd_desc, insert=False), df)
+
+    def test_swap_format_exploration(self):
+        cache = TraceCache(swap_dir=self.res_dir)
+        df = self._make_df()
+        fmts = set()
+        for i in range(len(TraceCache.DATAFRAME_SWAP_FORMATS)):
+            pd_desc = PandasDataDesc(spec=dict(i=i))
+            cache.insert(pd_desc, df, write_swap=True, force_write_swap=True)
+            cache.evict(pd_desc)
+            cache.fetch(pd_desc)
+            fmts.add(cache._swap_content[pd_desc.normal_form].fmt)
+
+        # All formats have been tried and their read cost measured
+        assert fmts == TraceCache.DATAFRAME_SWAP_FORMATS.keys()
+        assert None not in cache._swap_read_cost.values()
+
+    def test_mem_accounting(self):
+        df = self._make_df()
+        mem_usage = df.memory_usage().sum()
+        cache = TraceCache(max_mem_size=mem_usage * 3)
+        pd_descs = [
+            PandasDataDesc(spec=dict(event=f'event{i}'))
+            for i in range(4)
+        ]
+        for i, pd_desc in enumerate(pd_descs):
+            cache.insert(pd_desc, df, compute_cost=i + 1)
+
+        # The entry that was the cheapest to compute got evicted
+        assert pd_descs[0] not in cache._cache
+        assert cache._mem_usage == mem_usage * 3
+        assert cache.stats['evictions'] == 1
+
+        cache.clear_event('event1')
+        assert cache._mem_usage == mem_usage * 2
+
+        cache.fetch(pd_descs[2])
+        with pytest.raises(KeyError):
+            cache.fetch(pd_descs[0])
+        assert cache.stats['hits'] == 1
+        assert cache.stats['misses'] == 1
+
+    def test_lru_eviction(self):
+        df = self._make_df()
+        mem_usage = df.memory_usage().sum()
+        cache = TraceCache(max_mem_size=mem_usage * 2)
+        pd_descs = [
+            PandasDataDesc(spec=dict(i=i))
+            for i in range(3)
+        ]
+        cache.insert(pd_descs[0], df)
+        cache.insert(pd_descs[1], df)
+        # Entries with the same retention score are evicted in LRU order
+        cache.fetch(pd_descs[0])
+        cache.insert(pd_descs[2], df)
+
+        assert set(cache._cache.keys()) == {pd_descs[0], pd_descs[2]}
+
 
 class TestTraceView(TraceTestCase):
 
@@ -427,6 +550,30 @@ class TestTraceView(TraceTestCase):
 
         assert trace.time_range == pytest.approx(expected_duration)
 
+    def test_df_event_window(self):
+        trace = self.trace
+        df = trace.df_event('sched_switch')
+        windows = [
+            (80, 81),
+            # Window starting exactly on an event
+            (df.index[10], df.index[20]),
+            (trace.start - 1, trace.start + 1),
+            (trace.end - 1, trace.end + 1),
+        ]
+        for window in windows:
+            view = trace.get_view(window)
+            for signals_init, compress_signals_init in itertools.product([True, False], repeat=2):
+                kwargs = dict(
+                    signals_init=signals_init,
+                    compress_signals_init=compress_signals_init,
+                )
+                expected = trace.df_event('sched_switch', window=window, **kwargs)
+                pd.testing.assert_frame_equal(
+                    view.df_event('sched_switch', **kwargs),
+                    expected,
+                    check_categorical=False,
+                )
+
 
 class TestNestedTraceView(TestTraceView):
     def __init__(self, *args, **kwargs):
@@ -469,6 +616,236 @@ class TestTraceNoPlatform(TestTrace):
     def _get_plat_info(self, trace_name=None):
         return None
 
+class TestDatTraceParser(TraceTestCase):
+    def get_trace(self, trace_name):
+        trace_path = os.path.join(self.traces_dir, trace_name, 'trace.dat')
+        return Trace(
+            trace_path,
+            plat_info=self._get_plat_info(trace_name),
+            events=self.events,
+            parser=DatTraceParser,
+        )
+
+    def test_parse_event(self):
+        path = os.path.join(self.traces_dir, 'sched_load', 'trace.dat')
+        parser = DatTraceParser(path=path, events=['sched_switch'], needed_metadata={'time-range'})
+        df = parser.parse_event('sched_switch')
+        assert df.index.is_monotonic_increasing
+        assert df.index.is_unique
+        assert df.index[0] >= parser.get_metadata('time-range')[0]
+
+        fields = TxtTraceParser.EVENT_DESCS['sched_switch']['fields']
+        for field, dtype in fields.items():
+            assert df[field].dtype.name == dtype
+
+        assert set(df['next_comm']) >= {'swapper/0', 'kworker/2:1'}
+
+    def test_parallel(self):
+        path = os.path.join(self.traces_dir, 'sched_load', 'trace.dat')
+        events = ['sched_switch', 'sched_load_se']
+        ser = DatTraceParser(path=path, events=events)
+        par = DatTraceParser(path=path, events=events, nr_processes=3)
+        for event in events:
+            pd.testing.assert_frame_equal(
+                ser.parse_event(event),
+                par.parse_event(event),
+            )
+
+    def test_txt_equivalence(self):
+        """
+        Test that the events decoded from trace.dat are the same as the ones
+        parsed from its rendering by trace-cmd report
+        """
+        trace_dir = os.path.join(self.traces_dir, 'sched_load')
+        # Events with known fields, with the ones printed raw by
+        # TxtTraceParser.from_dat()
+        events = ['cpu_frequency', 'cpu_idle', 'print', 'sched_migrate_task', 'sched_switch']
+        # trace-cmd report -N -t -r cpu_frequency -r cpu_idle -r sched_migrate_task -r sched_switch
+        txt = TxtTraceParser.from_txt_file(
+            os.path.join(trace_dir, 'trace.dat.txt'),
+            events=events,
+            needed_metadata={'time-range'},
+        )
+        with DatTraceParser(
+            path=os.path.join(trace_dir, 'trace.dat'),
+            events=events,
+            needed_metadata={'time-range'},
+        ) as dat:
+            assert dat.get_metadata('time-range') == txt.get_metadata('time-range')
+            for event in events:
+                pd.testing.assert_frame_equal(
+                    txt.parse_event(event),
+                    dat.parse_event(event),
+                    check_like=True,
+                )
+
+        assert dat._mm.closed
+
+    def test_sched_load_signals(self):
+        """Test parsing sched_load_se events from EAS upstream integration"""
+        TestTrace._test_tasks_dfs(self, 'sched_load')
+
+
+class TestSharedTraceCache(TraceTestCase):
+    def _copy_trace(self, name):
+        trace_dir = os.path.join(self.res_dir, name)
+        os.makedirs(trace_dir)
+        path = os.path.join(trace_dir, 'trace.txt')
+        shutil.copy(self.trace_path, path)
+        return path
+
+    def _make_trace(self, path, cache_dir, **kwargs):
+        return Trace(
+            path,
+            plat_info=self.plat_info,
+            events=self.events,
+            parser=TxtTraceParser.from_txt_file,
+            shared_cache_dir=cache_dir,
+            **kwargs,
+        )
+
+    def _list_entries(self, cache_dir):
+        return sorted(
+            name
+            for name in os.listdir(cache_dir)
+            if not name.startswith('.')
+        )
+
+    def test_shared_across_paths(self):
+        cache_dir = os.path.join(self.res_dir, 'shared')
+        trace1 = self._make_trace(self._copy_trace('trace1'), cache_dir)
+        df1 = trace1.analysis.cpus.df_context_switches()
+
+        entries = self._list_entries(cache_dir)
+        assert len(entries) == 1
+
+        # A copy of the trace at another path, without any swap, reuses the
+        # result computed on the first one
+        trace2 = self._make_trace(self._copy_trace('trace2'), cache_dir, enable_swap=False)
+        df2 = trace2.analysis.cpus.df_context_switches()
+
+        assert self._list_entries(cache_dir) == entries
+        pd.testing.assert_frame_equal(df1, df2)
+
+    def test_eviction(self):
+        cache_dir = os.path.join(self.res_dir, 'shared')
+        trace = self._make_trace(self._copy_trace('trace'), cache_dir, max_shared_cache_size=1)
+        trace.analysis.cpus.df_context_switches()
+        assert self._list_entries(cache_dir) == []
+
+    def test_unserializable_desc(self):
+        cache = SharedTraceCache(os.path.join(self.res_dir, 'shared'))
+        pd_desc = PandasDataDesc(spec=dict(foo=object()))
+        df = pd.DataFrame(dict(a=[1, 2]))
+        cache.insert('md5', pd_desc, df)
+        with pytest.raises(KeyError):
+            cache.fetch('md5', pd_desc)
+
+
+class TestTraceStream(TraceTestCase):
+    stream_events = ['sched_switch', 'sched_wakeup']
+
+    def _read_trace(self):
+        with open(self.trace_path, 'rb') as f:
+            return f.read()
+
+    def _make_stream(self, **kwargs):
+        return TraceStream(events=self.stream_events, parser=TxtTraceParser, **kwargs)
+
+    def test_feed(self):
+        txt = self._read_trace()
+        stream = self._make_stream()
+        # Blocks are not aligned on line boundaries
+        block_size = 12345
+        for i in range(0, len(txt), block_size):
+            stream.feed(txt[i:i + block_size])
+
+        ref = TxtTraceParser(
+            lines=txt.splitlines(),
+            events=self.stream_events,
+            needed_metadata={'time-range'},
+        )
+        assert stream.time_range == ref.get_metadata('time-range')
+        for event in self.stream_events:
+            pd.testing.assert_frame_equal(
+                stream.df_event(event),
+                ref.parse_event(event),
+            )
+
+    def test_feed_no_event(self):
+        stream = self._make_stream()
+        assert not stream.feed(b'# this line is not an event\n')
+        assert stream.time_range == (None, None)
+
+    def test_feed_parser_error(self):
+        class BrokenParser(TxtTraceParser):
+            def __init__(self, *args, **kwargs):
+                raise ValueError('broken parser')
+
+        stream = TraceStream(events=self.stream_events, parser=BrokenParser)
+        with pytest.raises(ValueError, match='broken parser'):
+            stream.feed(self._read_trace())
+
+    def test_update(self):
+        txt = self._read_trace()
+        path = os.path.join(self.res_dir, 'trace_pipe.txt')
+        stream = self._make_stream(path=path)
+
+        split = len(txt) // 2
+        with open(path, 'wb') as f:
+            f.write(txt[:split])
+        assert stream.update()
+        _, end = stream.time_range
+        nr_rows = len(stream.df_event('sched_switch'))
+
+        with open(path, 'ab') as f:
+            f.write(txt[split:])
+        assert stream.update()
+        assert not stream.update()
+
+        df = stream.df_event('sched_switch')
+        assert len(df) > nr_rows
+        pd.testing.assert_frame_equal(
+            stream.df_event('sched_switch', window=(end, None)),
+            df.loc[end:],
+        )
+
+    def test_get_trace(self):
+        stream = self._make_stream()
+        stream.feed(self._read_trace())
+        start, end = stream.time_range
+        window = (end - 1, None)
+        trace = stream.get_trace(window=window)
+
+        assert trace.start == end - 1
+        assert trace.end == end
+        pd.testing.assert_frame_equal(
+            trace.df_event('sched_switch', raw=True),
+            stream.df_event('sched_switch', window=window),
+            # Trace turns comm columns into categories and renames the index
+            check_dtype=False,
+            check_categorical=False,
+            check_names=False,
+        )
+
+    def test_get_trace_reuse(self):
+        txt = self._read_trace()
+        split = txt.rindex(b'\n', 0, len(txt) // 2) + 1
+        stream = self._make_stream()
+        stream.feed(txt[:split])
+
+        window = (None, None)
+        trace = stream.get_trace(window=window)
+        # The trace and its cache are kept until new events are parsed
+        assert stream.get_trace(window=window) is trace
+        assert stream.get_trace(window=(0, None)) is not trace
+
+        stream.feed(txt[split:])
+        new_trace = stream.get_trace(window=window)
+        assert new_trace is not trace
+        assert new_trace.end > trace.end
+
+
 class TestMockTraceParser(TestCase):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
@@ -494,4 +871,66 @@ class TestMockTraceParser(TestCase):
         assert self.trace.start == 0
         assert self.trace.end == 42
 
+
+class TestParallelTxtTraceParser(TestCase):
+    events = ['sched_switch', 'sched_wakeup']
+
+    class SmallChunksTxtTraceParser(TxtTraceParser):
+        PARALLEL_CHUNK_SIZE = 1000
+
+    def _check_parallel(self, txt):
+        ser = TxtTraceParser.from_string(
+            txt,
+            events=self.events,
+            needed_metadata={'time-range'},
+        )
+        par = self.SmallChunksTxtTraceParser.from_string(
+            txt,
+            events=self.events,
+            needed_metadata={'time-range'},
+            nr_processes=3,
+        )
+        assert ser.get_metadata('time-range') == par.get_metadata('time-range')
+        assert ser.get_metadata('available-events') == par.get_metadata('available-events')
+        for event in self.events:
+            pd.testing.assert_frame_equal(
+                ser.parse_event(event),
+                par.parse_event(event),
+            )
+
+    def test_parallel_parse(self):
+        with open(os.path.join(ASSET_DIR, 'trace.txt'), 'rb') as f:
+            txt = f.read()
+        self._check_parallel(txt)
+
+    def test_parallel_parse_duplicates(self):
+        # Long runs of identical timestamps will cross chunks boundaries
+        lines = [
+            '          <idle>-0     [002]    76.211513: sched_wakeup:          comm=sh pid=1642 prio=120 success=1 target_cpu=2',
+            '              sh-1642  [002]    76.211513: sched_switch:          prev_comm=sh prev_pid=1642 prev_prio=120 prev_state=4096 next_comm=kworker/u12:1 next_pid=46 next_prio=120',
+        ] * 100
+        self._check_parallel('\n'.join(lines))
+
+    def test_parallel_parse_empty_chunk(self):
+        # A chunk without any event between two chunks sharing a timestamp
+        lines = [
+            '          <idle>-0     [002]    76.211513: sched_wakeup:          comm=sh pid=1642 prio=120 success=1 target_cpu=2',
+            '              sh-1642  [002]    76.211513: sched_switch:          prev_comm=sh prev_pid=1642 prev_prio=120 prev_state=4096 next_comm=kworker/u12:1 next_pid=46 next_prio=120',
+        ] * 10
+        junk = [
+            'this line is not an event',
+        ] * 200
+        self._check_parallel('\n'.join(lines + junk + lines))
+
+    def test_parallel_parse_trailing_empty_chunk(self):
+        # The last chunks do not contain any event
+        lines = [
+            '          <idle>-0     [002]    76.211513: sched_wakeup:          comm=sh pid=1642 prio=120 success=1 target_cpu=2',
+            '              sh-1642  [002]    82.888010: sched_switch:          prev_comm=sh prev_pid=1642 prev_prio=120 prev_state=4096 next_comm=kworker/u12:1 next_pid=46 next_prio=120',
+        ] * 10
+        junk = [
+            '# this line is not an event',
+        ] * 200
+        self._check_parallel('\n'.join(lines + junk))
+
 # vim :set tabstop=4 shiftwidth=4 textwidth=80 expandtab
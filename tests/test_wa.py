@@ -0,0 +1,97 @@
+# SPDX-License-Identifier: Apache-2.0
+#
+# Copyright (C) 2021, Arm Limited and contributors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import os
+from collections import namedtuple
+from concurrent.futures.process import BrokenProcessPool
+
+import pandas as pd
+
+from lisa.wa import WACollectorBase
+from .utils import StorageTestCase
+
+
+DummyJob = namedtuple('DummyJob', ['basepath', 'value'])
+
+
+class DummyCollector(WACollectorBase):
+    NAME = 'dummy'
+
+    @classmethod
+    def _get_job_df(cls, job):
+        if job.value == 'exit':
+            # Simulate a worker killed while loading the job
+            os._exit(1)
+        elif job.value == 'raise':
+            raise ValueError(job.value)
+        else:
+            return pd.DataFrame(dict(value=[job.value]))
+
+
+class TestWACollectorBase(StorageTestCase):
+
+    def _make_jobs(self, values):
+        jobs = []
+        for i, value in enumerate(values):
+            basepath = os.path.join(self.res_dir, str(i))
+            os.makedirs(basepath)
+            jobs.append(DummyJob(basepath=basepath, value=value))
+        return jobs
+
+    def _check_jobs_df(self, jobs, nr_processes):
+        collector = DummyCollector(wa_output=None, nr_processes=nr_processes)
+        results = list(collector._iter_jobs_df(jobs))
+
+        assert len(results) == len(jobs)
+        for job, res in zip(jobs, results):
+            if job.value == 'exit':
+                assert isinstance(res, BrokenProcessPool)
+            elif job.value == 'raise':
+                assert isinstance(res, ValueError)
+            else:
+                assert res['value'].tolist() == [job.value]
+
+    def test_jobs_df_order(self):
+        values = list(range(40))
+        values[13] = 'raise'
+        jobs = self._make_jobs(values)
+        for nr_processes in (1, 4):
+            self._check_jobs_df(jobs, nr_processes)
+
+    def test_jobs_df_truncated_cache(self):
+        jobs = self._make_jobs([1, 2])
+        collector = DummyCollector(wa_output=None, nr_processes=1)
+        results = list(collector._iter_jobs_df(jobs))
+        assert [df['value'].tolist() for df in results] == [[1], [2]]
+
+        # Simulate a process killed while writing the cache
+        cache_path, = [
+            os.path.join(jobs[0].basepath, name)
+            for name in os.listdir(jobs[0].basepath)
+        ]
+        with open(cache_path, 'r+b') as f:
+            f.truncate(os.path.getsize(cache_path) // 2)
+
+        self._check_jobs_df(jobs, nr_processes=1)
+        # The cache has been rewritten
+        assert pd.read_parquet(cache_path)['value'].tolist() == [1]
+
+    def test_jobs_df_worker_death(self):
+        values = list(range(40))
+        values[7] = 'exit'
+        values[13] = 'raise'
+        self._check_jobs_df(self._make_jobs(values), nr_processes=4)
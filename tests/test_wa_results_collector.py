@@ -0,0 +1,157 @@
+# SPDX-License-Identifier: Apache-2.0
+#
+# Copyright (C) 2021, Arm Limited and contributors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import os
+import json
+
+import pandas as pd
+
+import lisa.wa_results_collector
+from lisa.wa_results_collector import WaResultsCollector, _WaJob
+from .utils import StorageTestCase
+
+
+class IndexTestCollector(WaResultsCollector):
+    """
+    Collector only used to extract the extra metrics of jobs, recording the
+    jobs that are actually processed.
+    """
+    def __init__(self, index_path):
+        # pylint: disable=super-init-not-called
+        self.index_path = index_path
+        self.parse_traces = False
+        self.nr_processes = 1
+        self.processed = []
+
+    def _get_extra_job_metrics(self, job_dir, workload):
+        self.processed.append(job_dir)
+        return super()._get_extra_job_metrics(job_dir, workload)
+
+
+class TestWaResultsCollectorIndex(StorageTestCase):
+
+    def _make_job(self, name, durations):
+        job_dir = os.path.join(self.res_dir, name)
+        os.makedirs(job_dir, exist_ok=True)
+        with open(os.path.join(job_dir, 'result.json'), 'w') as f:
+            json.dump(
+                {
+                    'artifacts': [
+                        {'name': 'jankbench_results_csv', 'path': 'jankbench.csv'},
+                    ],
+                },
+                f
+            )
+
+        self._write_durations(job_dir, durations)
+        return _WaJob(job_dir=job_dir, workload='jankbench', iteration=1, id=name, tag=None, test=None)
+
+    @staticmethod
+    def _write_durations(job_dir, durations):
+        pd.DataFrame(dict(total_duration=durations)).to_csv(
+            os.path.join(job_dir, 'jankbench.csv'),
+            index=False,
+        )
+
+    def _get_extra_metrics(self, jobs):
+        collector = IndexTestCollector(os.path.join(self.res_dir, 'index.parquet'))
+        dfs = collector._get_jobs_extra_metrics(jobs)
+        return (collector.processed, dfs)
+
+    def _check_dfs(self, dfs, durations_list):
+        assert len(dfs) == len(durations_list)
+        for df, durations in zip(dfs, durations_list):
+            assert df['value'].tolist() == durations
+            assert set(df['metric']) == {'frame_total_duration'}
+
+    def test_index_hit(self):
+        jobs = [
+            self._make_job('job1', [1, 2, 3]),
+            self._make_job('job2', [4, 5]),
+        ]
+        processed, dfs = self._get_extra_metrics(jobs)
+        assert processed == [job.job_dir for job in jobs]
+
+        processed, indexed_dfs = self._get_extra_metrics(jobs)
+        assert processed == []
+        self._check_dfs(indexed_dfs, [[1, 2, 3], [4, 5]])
+        for df, indexed_df in zip(dfs, indexed_dfs):
+            pd.testing.assert_frame_equal(
+                df.reset_index(drop=True),
+                indexed_df,
+                check_dtype=False,
+            )
+
+    def test_index_invalidation(self):
+        job1 = self._make_job('job1', [1, 2, 3])
+        job2 = self._make_job('job2', [4, 5])
+        job3 = self._make_job('job3', [6])
+        jobs = [job1, job2, job3]
+        self._get_extra_metrics(jobs)
+
+        # Change the size of job1 files
+        self._write_durations(job1.job_dir, [1, 2, 3, 4])
+        # Change the modification time of job2 files
+        path = os.path.join(job2.job_dir, 'jankbench.csv')
+        self._write_durations(job2.job_dir, [7, 8])
+        stat = os.stat(path)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+        processed, dfs = self._get_extra_metrics(jobs)
+        assert processed == [job1.job_dir, job2.job_dir]
+        self._check_dfs(dfs, [[1, 2, 3, 4], [7, 8], [6]])
+
+        # The index has been updated with the new entries
+        processed, dfs = self._get_extra_metrics(jobs)
+        assert processed == []
+        self._check_dfs(dfs, [[1, 2, 3, 4], [7, 8], [6]])
+
+    def test_index_corrupted(self):
+        jobs = [
+            self._make_job('job1', [1, 2, 3]),
+            self._make_job('job2', [4, 5]),
+        ]
+        self._get_extra_metrics(jobs)
+
+        with open(os.path.join(self.res_dir, 'index.parquet'), 'wb') as f:
+            f.write(b'corrupted')
+
+        processed, dfs = self._get_extra_metrics(jobs)
+        assert processed == [job.job_dir for job in jobs]
+        self._check_dfs(dfs, [[1, 2, 3], [4, 5]])
+
+        # The index is rebuilt
+        processed, dfs = self._get_extra_metrics(jobs)
+        assert processed == []
+        self._check_dfs(dfs, [[1, 2, 3], [4, 5]])
+
+    def test_index_version(self):
+        jobs = [
+            self._make_job('job1', [1, 2, 3]),
+        ]
+        self._get_extra_metrics(jobs)
+
+        # Entries recorded by another version of LISA are not reused
+        version_token = lisa.wa_results_collector.VERSION_TOKEN
+        lisa.wa_results_collector.VERSION_TOKEN = f'{version_token}-other'
+        try:
+            processed, dfs = self._get_extra_metrics(jobs)
+        finally:
+            lisa.wa_results_collector.VERSION_TOKEN = version_token
+
+        assert processed == [job.job_dir for job in jobs]
+        self._check_dfs(dfs, [[1, 2, 3]])
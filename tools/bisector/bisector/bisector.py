@@ -2441,12 +2441,9 @@ class LISATestStep(ShellStep):
             ]
 
             if db_list:
-                with contextlib.suppress(FileNotFoundError):
-                    existing_db = ValueDB.from_path(export_db)
-                    db_list.append(existing_db)
-
+                # Only the new values will be written to the existing DB
                 merged_db = ValueDB.merge(db_list)
-                merged_db.to_path(export_db, optimize=False)
+                merged_db.to_path(export_db, optimize=False, append=True)
 
         return out
 
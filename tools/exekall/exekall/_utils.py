@@ -1072,6 +1072,9 @@ def capture_log(iterator):
         try:
             val = next(iterator)
         except StopIteration:
+            # Do not leak the handlers, they would slow down every subsequent
+            # logging call
+            teardown(handler_map)
             return
         else:
             log_map = teardown(handler_map)
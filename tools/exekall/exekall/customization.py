@@ -195,6 +195,24 @@ class AdaptorBase:
         """
         return db
 
+    @classmethod
+    def reload_value(cls, value, path=None):
+        """
+        Hook called when reloading the value of a
+        :class:`exekall.engine.FrozenExprVal` from a serialized
+        :class:`exekall.engine.ValueDB`. The returned value will be used.
+
+        :param value: Value that has just been deserialized.
+        :type value: object
+
+        :param path: Path of the file of the serialized database if available.
+        :type path: str or None
+
+        .. note:: Values are loaded lazily, so this hook can be called long
+            after :meth:`reload_db`.
+        """
+        return value
+
     def finalize_expr(self, expr):
         """
         Finalize an :class:`exekall.engine.ComputableExpression` right after
@@ -23,8 +23,12 @@ import copy
 import itertools
 import functools
 import lzma
+import os
+import shutil
+import zipfile
 import pathlib
 import contextlib
+import tempfile
 import pickle
 import pprint
 import pickletools
@@ -36,6 +40,9 @@ import datetime
 import io
 import typing
 import types
+import weakref
+import multiprocessing
+import concurrent.futures
 from operator import attrgetter
 
 import exekall._utils as utils
@@ -178,6 +185,10 @@ class ValueDB:
     # dumping speed.
     PICKLE_PROTOCOL = 4
 
+    # Header of the files in the legacy format, where the whole DB was a
+    # single LZMA compressed pickle
+    _LZMA_MAGIC = b'\xfd7zXZ\x00'
+
     def __init__(self, froz_val_seq_list, adaptor_cls=None):
         # Avoid storing duplicate FrozenExprVal sharing the same value/excep
         # UUID
@@ -268,11 +279,11 @@ class ValueDB:
             db.adaptor_cls
             for db in db_list
         }
-        if len(adaptor_cls_set - {None}) != 1:
+        if len(adaptor_cls_set - {None}) > 1:
             raise ValueError(f'Cannot merge ValueDB with different adaptor classes: {adaptor_cls_set}')
         # If None was used, assume it is compatible with anything
         adaptor_cls_set.discard(None)
-        adaptor_cls = utils.take_first(adaptor_cls_set)
+        adaptor_cls = adaptor_cls_set.pop() if adaptor_cls_set else None
 
         if roots_from is not None:
             db_list.append(roots_from)
@@ -304,7 +315,9 @@ class ValueDB:
         """
         Deserialize a :class:`ValueDB` from a file.
 
-        At the moment, it is assumed to be an LZMA compressed Pickle file.
+        The file can either be in the format written by :meth:`to_path`, in
+        which case the values are only loaded when accessed, or in the legacy
+        format of an LZMA compressed Pickle file.
 
         :param path: Path to the file containing the serialized
             :class:`ValueDB`.
@@ -323,13 +336,21 @@ class ValueDB:
                 relative_to = pathlib.Path(relative_to).parent
             path = pathlib.Path(relative_to, path)
 
-        with lzma.open(str(path), 'rb') as f:
-            # Disabling garbage collection while loading result in significant
-            # speed improvement, since it creates a lot of new objects in a
-            # very short amount of time.
-            with utils.disable_gc():
-                db = pickle.load(f)
-        assert isinstance(db, cls)
+        with open(str(path), 'rb') as f:
+            magic = f.read(len(cls._LZMA_MAGIC))
+
+        # Legacy format: the whole DB is pickled in one LZMA compressed file
+        if magic == cls._LZMA_MAGIC:
+            with lzma.open(str(path), 'rb') as f:
+                # Disabling garbage collection while loading result in
+                # significant speed improvement, since it creates a lot of new
+                # objects in a very short amount of time.
+                with utils.disable_gc():
+                    db = pickle.load(f)
+            assert isinstance(db, cls)
+            cls._call_adaptor_reload_values(db, path=path)
+        else:
+            db = _ValueDBArchive(path).load(cls)
 
         # Apply some post-processing on the DB with a known path
         cls._call_adaptor_reload(db, path=path)
@@ -344,6 +365,7 @@ class ValueDB:
         # Apply some post-processing on the DB that was just reloaded, with no
         # path since we don't even know if that method was invoked on something
         # serialized in a file.
+        cls._call_adaptor_reload_values(db, path=None)
         cls._call_adaptor_reload(db, path=None)
 
         return db
@@ -361,7 +383,14 @@ class ValueDB:
             db = adaptor_cls.reload_db(db, path=path)
         return db
 
-    def to_path(self, path, optimize=True):
+    @staticmethod
+    def _call_adaptor_reload_values(db, path):
+        adaptor_cls = db.adaptor_cls
+        if adaptor_cls:
+            for froz_val in db.get_all():
+                froz_val.value = adaptor_cls.reload_value(froz_val.value, path=path)
+
+    def to_path(self, path, optimize=True, append=False):
         """
         Write the DB to the given file.
 
@@ -372,20 +401,36 @@ class ValueDB:
             increase the dump time and memory consumption, but should speed-up
             loading/file size.
         :type optimize: bool
+
+        :param append: If ``True`` and ``path`` already exists, the DB is
+            merged with the existing one. The values already stored in the file
+            are not written again.
+        :type append: bool
+
+        The file is a Zip archive containing an index of the
+        :class:`FrozenExprVal` along with their IDs, tags and parameters, and
+        the value, exception and log of each :class:`FrozenExprVal` stored
+        separately. This allows :meth:`from_path` to only load the values that
+        are actually used.
+
+        .. note:: ``exekall run`` still names that file ``VALUE_DB.pickle.xz``
+            for compatibility, but it cannot be decompressed with ``xz``.
         """
-        protocol = self.PICKLE_PROTOCOL
+        path = pathlib.Path(path)
+        db = self
 
-        if optimize:
-            def dumper(f):
-                bytes_ = _ExceptionPickler.dump_bytestring(self, protocol=protocol)
-                bytes_ = pickletools.optimize(bytes_)
-                return f.write(bytes_)
-        else:
-            def dumper(f):
-                return _ExceptionPickler.dump_file(f, self, protocol=protocol)
+        if append and path.exists():
+            with open(str(path), 'rb') as f:
+                magic = f.read(len(self._LZMA_MAGIC))
+
+            # Files in the legacy format cannot be appended to
+            if magic == self._LZMA_MAGIC:
+                db = self.merge([self.from_path(path), self])
+            else:
+                _ValueDBArchive.write(path, db, optimize=optimize, append=True)
+                return
 
-        with lzma.open(str(path), 'wb') as f:
-            dumper(f)
+        _ValueDBArchive.write(path, db, optimize=optimize)
 
     @property
     @utils.once
@@ -654,6 +699,334 @@ class ValueDB:
         return self.get_by_predicate(predicate, **kwargs)
 
 
+class _ValueDBIndexPickler(_ExceptionPickler):
+    """
+    Pickler used for the index of a :class:`_ValueDBArchive`.
+
+    The value, exception and log of :class:`FrozenExprVal` are not pickled
+    with the rest of the object, but passed to ``write_blob``.
+
+    :param write_blob: Callable taking a :class:`FrozenExprVal` and returning
+        the name of the archive member storing its value, or ``None`` if the
+        value should be pickled in the index.
+    :type write_blob: collections.abc.Callable
+    """
+
+    def __init__(self, *args, write_blob, **kwargs):
+        self._write_blob = write_blob
+        super().__init__(*args, **kwargs)
+
+    def _get_reducer(self, cls):
+        if issubclass(cls, FrozenExprVal):
+            return self._reduce_froz_val
+        else:
+            return super()._get_reducer(cls)
+
+    def _reduce_froz_val(self, froz_val):
+        name = self._write_blob(froz_val)
+        if name is None:
+            return froz_val.__reduce_ex__(ValueDB.PICKLE_PROTOCOL)
+        else:
+            state = {
+                attr: val
+                for attr, val in froz_val.__dict__.items()
+                if attr not in FrozenExprVal._LAZY_ATTRS
+                and attr != '_lazy_loader'
+            }
+            return (
+                FrozenExprVal._from_lazy_state,
+                (froz_val.__class__, state, _ValueDBBlobName(name))
+            )
+
+    def persistent_id(self, obj):
+        if isinstance(obj, _ValueDBBlobName):
+            return str(obj)
+        else:
+            return None
+
+
+class _ValueDBBlobName(str):
+    """
+    Name of a member of :class:`_ValueDBArchive` storing the value of a
+    :class:`FrozenExprVal`.
+    """
+    pass
+
+
+class _ValueDBIndexUnpickler(pickle.Unpickler):
+    """
+    Unpickler for the index of a :class:`_ValueDBArchive`.
+    """
+
+    def __init__(self, *args, archive, **kwargs):
+        self._archive = archive
+        super().__init__(*args, **kwargs)
+
+    def persistent_load(self, pid):
+        return _FrozenExprValLoader(self._archive, pid)
+
+
+class _FrozenExprValLoader:
+    """
+    Load the value, exception and log of a :class:`FrozenExprVal` from a
+    :class:`_ValueDBArchive`.
+    """
+
+    def __init__(self, archive, name):
+        self.archive = archive
+        self.name = name
+
+    def read_bytes(self):
+        """
+        Read the serialized value, without deserializing it.
+        """
+        return self.archive.read(self.name)
+
+    def load(self):
+        state = pickle.loads(self.read_bytes())
+
+        adaptor_cls = self.archive.adaptor_cls
+        if adaptor_cls:
+            state['value'] = adaptor_cls.reload_value(
+                state['value'],
+                path=self.archive.path,
+            )
+
+        return state
+
+
+class _ValueDBArchive:
+    """
+    Zip archive storing a :class:`ValueDB`.
+
+    The archive contains:
+
+        * ``index/<n>.pickle``: shards of the index of the DB, i.e. the graph
+          of :class:`FrozenExprVal` without their value, exception and log.
+          Appending to an existing archive adds a new shard, and all the
+          shards are merged when loading.
+
+        * ``values/<uuid>.pickle``: value, exception and log of each
+          :class:`FrozenExprVal`. They are only loaded when accessed.
+
+    :param path: Path to the archive.
+    :type path: str or pathlib.Path
+
+    The archive is opened when needed and kept open so that reading values
+    does not parse the Zip central directory every time. Only
+    :attr:`MAX_OPEN_ARCHIVES` archives are kept open at once, the least
+    recently used being closed first. It will be re-opened from ``path`` if
+    needed, so the values loaded after the file was replaced will come from
+    the new file. It is also re-opened in processes forked after it was
+    opened, since sharing the file offset with the parent process would
+    corrupt concurrent reads.
+    """
+
+    INDEX_DIR = 'index'
+    VALUES_DIR = 'values'
+
+    # Values are stored separately so they are cheap to access, favor speed
+    # over compression ratio.
+    COMPRESSION = zipfile.ZIP_DEFLATED
+
+    MAX_OPEN_ARCHIVES = 64
+    """
+    Maximum number of archives kept open at the same time, to avoid running
+    out of file descriptors when loading a lot of DBs, e.g. with ``exekall
+    merge``.
+    """
+
+    _OPEN_ARCHIVES = OrderedDict()
+    """
+    Archives with an open file, in least recently used order.
+    """
+
+    def __init__(self, path):
+        self.path = pathlib.Path(path).resolve()
+        self.adaptor_cls = None
+        self._zipfile = None
+        self._finalizer = None
+        self._pid = None
+
+    def _get_zipfile(self):
+        open_archives = self._OPEN_ARCHIVES
+        key = id(self)
+
+        # The file was opened before forking the current process
+        if self._zipfile is not None and self._pid != os.getpid():
+            self.close()
+
+        if self._zipfile is None:
+            while len(open_archives) >= self.MAX_OPEN_ARCHIVES:
+                _, ref = open_archives.popitem(last=False)
+                archive = ref()
+                if archive is not None:
+                    archive.close()
+
+            zip_ = zipfile.ZipFile(str(self.path), 'r')
+            self._zipfile = zip_
+            self._pid = os.getpid()
+
+            def remove(ref):
+                if open_archives.get(key) is ref:
+                    del open_archives[key]
+
+            open_archives[key] = weakref.ref(self, remove)
+            # Close the file when the archive is garbage collected
+            self._finalizer = weakref.finalize(self, zip_.close)
+        else:
+            open_archives.move_to_end(key)
+
+        return self._zipfile
+
+    def close(self):
+        """
+        Close the archive file. It will be opened again if a value needs to be
+        loaded.
+        """
+        ref = self._OPEN_ARCHIVES.get(id(self))
+        if ref is not None and ref() is self:
+            del self._OPEN_ARCHIVES[id(self)]
+
+        if self._finalizer is not None:
+            self._finalizer()
+            self._finalizer = None
+        self._zipfile = None
+
+    def read(self, name):
+        return self._get_zipfile().read(name)
+
+    @classmethod
+    def _get_index_name_list(cls, zip_):
+        prefix = cls.INDEX_DIR + '/'
+        name_list = [
+            name
+            for name in zip_.namelist()
+            if name.startswith(prefix)
+        ]
+        return sorted(
+            name_list,
+            key=lambda name: int(pathlib.PurePosixPath(name).stem),
+        )
+
+    def load(self, db_cls):
+        """
+        Load the index of the archive.
+
+        :param db_cls: Subclass of :class:`ValueDB` to create.
+        :type db_cls: type
+        """
+        def load_shard(name):
+            f = io.BytesIO(self.read(name))
+            # Disabling garbage collection while loading result in significant
+            # speed improvement, since it creates a lot of new objects in a
+            # very short amount of time.
+            with utils.disable_gc():
+                dct = _ValueDBIndexUnpickler(f, archive=self).load()
+            return db_cls(
+                dct['froz_val_seq_list'],
+                adaptor_cls=dct['adaptor_cls'],
+            )
+
+        db_list = [
+            load_shard(name)
+            for name in self._get_index_name_list(self._get_zipfile())
+        ]
+        if len(db_list) == 1:
+            db, = db_list
+        else:
+            db = db_cls.merge(db_list)
+
+        self.adaptor_cls = db.adaptor_cls
+        return db
+
+    @classmethod
+    def write(cls, path, db, optimize=True, append=False):
+        """
+        Write a :class:`ValueDB` to an archive.
+
+        :param path: Path to the archive.
+        :type path: pathlib.Path
+
+        :param db: DB to write.
+        :type db: ValueDB
+
+        :param optimize: Optimize the pickled data.
+        :type optimize: bool
+
+        :param append: Append the DB to the existing archive as a new index
+            shard, rather than replacing it.
+        :type append: bool
+        """
+        protocol = ValueDB.PICKLE_PROTOCOL
+
+        def dump(obj, **kwargs):
+            bytes_ = _ValueDBIndexPickler.dump_bytestring(
+                obj,
+                protocol=protocol,
+                **kwargs,
+            )
+            if optimize:
+                bytes_ = pickletools.optimize(bytes_)
+            return bytes_
+
+        # Write to a temporary file first, so that values lazily loaded from
+        # the current file can still be copied to the new one, and so that the
+        # current file is left untouched if writing is interrupted.
+        tmp_path = path.with_name(f'.{path.name}.{utils.create_uuid()}')
+        try:
+            if append:
+                shutil.copyfile(str(path), str(tmp_path))
+                zip_ = zipfile.ZipFile(str(tmp_path), 'a', compression=cls.COMPRESSION)
+            else:
+                zip_ = zipfile.ZipFile(str(tmp_path), 'w', compression=cls.COMPRESSION)
+
+            with zip_:
+                name_set = set(zip_.namelist())
+
+                def write_blob(froz_val):
+                    # These values are tiny, and the same UUID can be shared
+                    # with the original FrozenExprVal
+                    if froz_val.uuid is None or isinstance(froz_val, PrunedFrozVal):
+                        return None
+
+                    name = f'{cls.VALUES_DIR}/{froz_val.uuid}.pickle'
+                    if name not in name_set:
+                        loader = froz_val.__dict__.get('_lazy_loader')
+                        # Avoid deserializing values that were not loaded
+                        if loader is None:
+                            bytes_ = dump(
+                                {
+                                    attr: getattr(froz_val, attr)
+                                    for attr in FrozenExprVal._LAZY_ATTRS
+                                },
+                                write_blob=lambda froz_val: None,
+                            )
+                        else:
+                            bytes_ = loader.read_bytes()
+
+                        zip_.writestr(name, bytes_)
+                        name_set.add(name)
+
+                    return name
+
+                index = dump(
+                    dict(
+                        adaptor_cls=db.adaptor_cls,
+                        froz_val_seq_list=db.froz_val_seq_list,
+                    ),
+                    write_blob=write_blob,
+                )
+                index_nr = len(cls._get_index_name_list(zip_))
+                zip_.writestr(f'{cls.INDEX_DIR}/{index_nr}.pickle', index)
+        except BaseException:
+            with contextlib.suppress(FileNotFoundError):
+                tmp_path.unlink()
+            raise
+        else:
+            os.replace(str(tmp_path), str(path))
+
+
 class ScriptValueDB:
     """
     Class tying together a generated script and a :class:`ValueDB`.
@@ -1648,6 +2021,9 @@ class ComputableExpression(ExpressionBase):
         self.uuid = utils.create_uuid()
         self.expr_val_seq_list = list()
         self.data = data if data is not None else ExprData()
+        # Index of expr_val_seq_list used by find_expr_val_seq_list(). It is
+        # built lazily, so that expr_val_seq_list can be freely modified.
+        self._expr_val_seq_index = (None, 0, {})
         super().__init__(op=op, param_map=param_map)
 
     @classmethod
@@ -1719,6 +2095,14 @@ class ComputableExpression(ExpressionBase):
 
         .. note:: ``param_map`` will be checked as a subset of the parameters.
         """
+        # Fast path for the lookup done when executing, which uses exactly
+        # the set of reusable parameters
+        reusable_param_list = self._get_reusable_param_list()
+        if param_map.keys() == set(reusable_param_list):
+            index = self._get_expr_val_seq_index()
+            key = self._get_expr_val_seq_key(reusable_param_list, param_map)
+            return list(index.get(key, []))
+
         def value_map(param_map):
             return ExprValParamMap(
                 # Extract the actual value from ExprVal
@@ -1737,6 +2121,62 @@ class ComputableExpression(ExpressionBase):
             if param_map.items() <= value_map(expr_val_seq.param_map).items()
         ]
 
+    def _get_reusable_param_list(self):
+        return [
+            param
+            for param, param_expr in self.param_map.items()
+            if param_expr.op.reusable
+        ]
+
+    @staticmethod
+    def _get_expr_val_seq_key(param_list, param_map):
+        """
+        Key of the index of :class:`ExprValSeq`, consistent with the
+        comparison by equality of the values done by
+        :meth:`find_expr_val_seq_list`.
+        """
+        def value_key(value):
+            try:
+                hash(value)
+            # Unhashable values can only be matched by identity, since equality
+            # is not reliable for them (e.g. arrays compare elementwise)
+            except TypeError:
+                return (False, id(value))
+            else:
+                return (True, value)
+
+        return tuple(
+            (param, value_key(param_map[param].value))
+            for param in param_list
+        )
+
+    def _get_expr_val_seq_index(self):
+        """
+        Get the index of ``expr_val_seq_list``, keyed by the values of the
+        reusable parameters.
+
+        The :class:`ExprValSeq` appended since the last call are added to the
+        index, and the index is rebuilt if the list itself was replaced.
+        """
+        indexed_list, indexed_nr, index = self._expr_val_seq_index
+        expr_val_seq_list = self.expr_val_seq_list
+        if indexed_list is not expr_val_seq_list:
+            indexed_nr = 0
+            index = {}
+
+        param_list = self._get_reusable_param_list()
+        for expr_val_seq in expr_val_seq_list[indexed_nr:]:
+            # Values that could not be computed because a parameter is missing
+            # would not match in any case
+            try:
+                key = self._get_expr_val_seq_key(param_list, expr_val_seq.param_map)
+            except KeyError:
+                continue
+            index.setdefault(key, []).append(expr_val_seq)
+
+        self._expr_val_seq_index = (expr_val_seq_list, len(expr_val_seq_list), index)
+        return index
+
     @classmethod
     def execute_all(cls, expr_list, *args, **kwargs):
         """
@@ -1756,6 +2196,266 @@ class ComputableExpression(ExpressionBase):
             for expr_val in comp_expr.execute(*args, **kwargs):
                 yield (comp_expr, expr_val)
 
+    @classmethod
+    def execute_parallel(cls, expr_list, jobs=None):
+        """
+        Execute the expressions of ``expr_list`` in a pool of processes.
+
+        Expressions sharing a subexpression (e.g. after Common Subexpression
+        Elimination) are executed in the same process, in the order they
+        appear in ``expr_list``. This ensures that reusable values are only
+        computed once and that non-reusable values are computed exactly like
+        :meth:`execute` would.
+
+        :param expr_list: List of expressions to execute
+        :type expr_list: list(ComputableExpression)
+
+        :param jobs: Maximum number of processes to use. If ``None``, the
+            number of CPUs is used.
+        :type jobs: int or None
+
+        :returns: An iterator of tuples ``(expr, execute)`` in the order of
+            ``expr_list``, where ``execute`` behaves like the :meth:`execute`
+            method of ``expr``. The values computed by the other processes are
+            replayed, including the calls to ``post_compute_cb`` and what was
+            written on the standard output and error by the worker process
+            while computing them.
+
+        .. note:: The :meth:`prepare_execute` is called prior to executing.
+
+        .. note:: Log records emitted by the worker processes are written to
+            the log files of the :mod:`logging` handlers when they are
+            emitted, so they may be interleaved differently than with
+            :meth:`execute`. Only the console output is replayed in order.
+
+        .. note:: The computed values and exceptions need to be serializable to
+            be sent back to the current process. If that fails, the group of
+            expressions is executed again in the current process.
+        """
+        expr_list = list(expr_list)
+        # prepare_execute() sets the ExprData of subexpressions shared between
+        # expressions to the one of the expression being prepared, so record
+        # the parameters of each expression to restore them when executing
+        # it, like execute() would.
+        param_map_snapshot_map = {}
+        for expr in expr_list:
+            expr.prepare_execute()
+            param_map_snapshot_map[expr] = cls._get_param_map_snapshot(expr)
+
+        group_list = [
+            [
+                (expr, param_map_snapshot_map[expr])
+                for expr in group
+            ]
+            for group in cls._get_independent_group_list(expr_list, param_map_snapshot_map)
+        ]
+        group_map = {
+            expr: i
+            for i, group in enumerate(group_list)
+            for expr, _ in group
+        }
+
+        def make_execute(replay):
+            def execute(post_compute_cb=None):
+                for output, expr_val, reused in replay:
+                    _StdStreamsCapture.replay(output)
+                    if expr_val is None:
+                        continue
+                    elif reused is None:
+                        yield expr_val
+                    elif post_compute_cb is not None:
+                        post_compute_cb(expr_val, reused=reused)
+            return execute
+
+        # The forked worker processes would otherwise inherit pending output
+        # and write it again
+        sys.stdout.flush()
+        sys.stderr.flush()
+
+        with concurrent.futures.ProcessPoolExecutor(
+            max_workers=jobs,
+            # The worker processes inherit the expressions, so they do not
+            # need to be serialized
+            mp_context=multiprocessing.get_context('fork'),
+            initializer=_init_execute_group_worker,
+            initargs=(group_list,),
+        ) as executor:
+            future_list = [
+                executor.submit(_execute_group_worker, i)
+                for i in range(len(group_list))
+            ]
+
+            execute_map = {}
+            for expr in expr_list:
+                i = group_map[expr]
+                if i not in execute_map:
+                    group = group_list[i]
+                    try:
+                        replay_list = cls._load_group(
+                            group,
+                            future_list[i].result(),
+                        )
+                    except Exception as e: # pylint: disable=broad-except
+                        utils.warn(f'Could not execute expressions in a separate process, executing them in the current process: {e}')
+                        execute_map[i] = {
+                            _expr: _expr.execute
+                            for _expr, _ in group
+                        }
+                    else:
+                        execute_map[i] = {
+                            _expr: make_execute(replay)
+                            for (_expr, _), replay in zip(group, replay_list)
+                        }
+
+                yield (expr, execute_map[i][expr])
+
+    @staticmethod
+    def _get_param_map_snapshot(expr):
+        """
+        Get the ``param_map`` of all the subexpressions of ``expr``, so they
+        can be restored with :meth:`_restore_param_map_snapshot`.
+
+        .. note:: :meth:`prepare_execute` replaces the ``param_map`` rather than
+            modifying it, so it does not need to be copied.
+        """
+        snapshot = OrderedDict()
+        def visit(_, subexpr):
+            snapshot[subexpr] = subexpr.param_map
+
+        expr.fold(visit, visit_once=True)
+        return snapshot
+
+    @staticmethod
+    def _restore_param_map_snapshot(snapshot):
+        for subexpr, param_map in snapshot.items():
+            subexpr.param_map = param_map
+
+    @classmethod
+    def _fold_snapshot(cls, expr, snapshot, f):
+        """
+        Call :meth:`fold` on ``expr`` after restoring its ``param_map``
+        snapshot.
+        """
+        cls._restore_param_map_snapshot(snapshot)
+        expr.fold(f, visit_once=True)
+
+    @classmethod
+    def _get_independent_group_list(cls, expr_list, param_map_snapshot_map):
+        """
+        Split ``expr_list`` into groups of expressions that do not share any
+        subexpression, in order of first appearance.
+        """
+        parent = list(range(len(expr_list)))
+
+        def find(i):
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        owner_map = {}
+        for i, expr in enumerate(expr_list):
+            def visit(_, subexpr):
+                j = find(owner_map.setdefault(subexpr, i))
+                k = find(i)
+                # Always keep the root of the first expression so the order
+                # of the groups follows the order of expr_list
+                parent[max(j, k)] = min(j, k)
+
+            cls._fold_snapshot(expr, param_map_snapshot_map[expr], visit)
+
+        group_map = OrderedDict()
+        for i, expr in enumerate(expr_list):
+            group_map.setdefault(find(i), []).append(expr)
+
+        return list(group_map.values())
+
+    @classmethod
+    def _get_group_obj_list(cls, group):
+        """
+        List of objects that are shared between the process executing a group
+        of expressions and the current process. They are not serialized with
+        the computed values, but referred to using their index in that list.
+        """
+        obj_map = OrderedDict()
+        def visit(_, expr):
+            for obj in (expr, expr.data):
+                obj_map.setdefault(id(obj), obj)
+
+        for expr, snapshot in group:
+            cls._fold_snapshot(expr, snapshot, visit)
+
+        return list(obj_map.values())
+
+    @classmethod
+    def _execute_group(cls, group):
+        """
+        Execute a group of expressions and return the serialized
+        :class:`ExprValSeq` of all the subexpressions, along with the values
+        and standard streams output needed to replay :meth:`execute`.
+        """
+        replay_list = []
+        # Reused values call the post_compute_cb of the expression that
+        # computed them, so always record in the replay of the expression
+        # being executed.
+        def post_compute_cb(expr_val, reused):
+            replay_list[-1].append((capture.read(), expr_val, reused))
+
+        with _StdStreamsCapture() as capture:
+            for expr, snapshot in group:
+                replay = []
+                replay_list.append(replay)
+                cls._restore_param_map_snapshot(snapshot)
+                for expr_val in expr._execute(post_compute_cb):
+                    replay.append((capture.read(), expr_val, None))
+
+                # Output written after the last value was computed
+                replay.append((capture.read(), None, None))
+
+        obj_list = cls._get_group_obj_list(group)
+        computable_expr_list = [
+            obj
+            for obj in obj_list
+            if isinstance(obj, ComputableExpression)
+        ]
+
+        # The execution is over, so drop what cannot be serialized
+        for expr in computable_expr_list:
+            for expr_val_seq in expr.expr_val_seq_list:
+                expr_val_seq.iterator = None
+                expr_val_seq.post_compute_cb = None
+
+        return _ExprValPickler.dump_bytestring(
+            (
+                [expr.expr_val_seq_list for expr in computable_expr_list],
+                replay_list,
+            ),
+            obj_list=obj_list,
+        )
+
+    @classmethod
+    def _load_group(cls, group, bytes_):
+        """
+        Load the values returned by :meth:`_execute_group` into the
+        expressions.
+        """
+        obj_list = cls._get_group_obj_list(group)
+        computable_expr_list = [
+            obj
+            for obj in obj_list
+            if isinstance(obj, ComputableExpression)
+        ]
+
+        expr_val_seq_list_list, replay_list = _ExprValUnpickler(
+            io.BytesIO(bytes_),
+            obj_list=obj_list,
+        ).load()
+
+        for expr, expr_val_seq_list in zip(computable_expr_list, expr_val_seq_list_list):
+            expr.expr_val_seq_list = expr_val_seq_list
+
+        return replay_list
+
     def _clone_consumer(self, consumer_expr_stack):
         expr = self
         if isinstance(expr.op, ConsumerOperator):
@@ -1922,6 +2622,124 @@ class ComputableExpression(ExpressionBase):
         ))
 
 
+class _ExprValPickler(_ExceptionPickler):
+    """
+    Pickler used to send :class:`ExprVal` computed in another process by
+    :meth:`ComputableExpression.execute_parallel`.
+
+    :param obj_list: List of objects to refer to using their index instead of
+        serializing them.
+    :type obj_list: list(object)
+    """
+    def __init__(self, *args, obj_list, **kwargs):
+        # The objects in obj_list are kept alive, so their id() are unique
+        self._obj_index_map = {
+            id(obj): i
+            for i, obj in enumerate(obj_list)
+        }
+        super().__init__(*args, **kwargs)
+
+    def persistent_id(self, obj):
+        return self._obj_index_map.get(id(obj))
+
+
+class _ExprValUnpickler(pickle.Unpickler):
+    """
+    Unpickler for the data serialized by :class:`_ExprValPickler`.
+    """
+    def __init__(self, *args, obj_list, **kwargs):
+        self._obj_list = obj_list
+        super().__init__(*args, **kwargs)
+
+    def persistent_load(self, pid):
+        return self._obj_list[pid]
+
+
+class _StdStreamsCapture:
+    """
+    Context manager capturing everything written on the standard output and
+    error file descriptors, including by subprocesses and :mod:`logging`
+    handlers that kept a reference to the original streams.
+
+    The output can be collected incrementally with :meth:`read`, and written
+    back with :meth:`replay`.
+    """
+    _FDS = (1, 2)
+
+    def __init__(self):
+        self._file_list = []
+        self._saved_fd_list = []
+        self._offset_list = []
+        self._saved_streams = None
+
+    @staticmethod
+    def _flush():
+        sys.stdout.flush()
+        sys.stderr.flush()
+
+    def __enter__(self):
+        self._flush()
+        # Python-level redirections (e.g. contextlib.redirect_stdout()) would
+        # bypass the file descriptors, so write to the original streams.
+        self._saved_streams = (sys.stdout, sys.stderr)
+        sys.stdout, sys.stderr = sys.__stdout__, sys.__stderr__
+        self._flush()
+
+        for fd in self._FDS:
+            f = tempfile.TemporaryFile()
+            self._file_list.append(f)
+            self._saved_fd_list.append(os.dup(fd))
+            self._offset_list.append(0)
+            os.dup2(f.fileno(), fd)
+        return self
+
+    def __exit__(self, *args, **kwargs):
+        self._flush()
+        for fd, saved_fd, f in zip(self._FDS, self._saved_fd_list, self._file_list):
+            os.dup2(saved_fd, fd)
+            os.close(saved_fd)
+            f.close()
+        sys.stdout, sys.stderr = self._saved_streams
+
+    def read(self):
+        """
+        Return a tuple of bytes written on each stream since the last call.
+        """
+        self._flush()
+        output = []
+        for i, f in enumerate(self._file_list):
+            offset = self._offset_list[i]
+            size = os.fstat(f.fileno()).st_size
+            # Do not use f.read() since the file offset is shared with the
+            # redirected file descriptor
+            output.append(os.pread(f.fileno(), size - offset, offset))
+            self._offset_list[i] = size
+        return tuple(output)
+
+    @classmethod
+    def replay(cls, output):
+        """
+        Write the output returned by :meth:`read` on the current standard
+        streams.
+        """
+        for stream, data in zip((sys.stdout, sys.stderr), output):
+            if data:
+                stream.write(data.decode(errors='replace'))
+                stream.flush()
+
+
+_EXECUTE_GROUP_LIST = None
+
+
+def _init_execute_group_worker(group_list):
+    global _EXECUTE_GROUP_LIST
+    _EXECUTE_GROUP_LIST = group_list
+
+
+def _execute_group_worker(i):
+    return ComputableExpression._execute_group(_EXECUTE_GROUP_LIST[i])
+
+
 class ClassContext:
     """
     Collect callables and types that put together will be used to create
@@ -3678,6 +4496,9 @@ class FrozenExprVal(ExprValBase):
 
     """
 
+    # Attributes that are loaded lazily when reloading a ValueDB
+    _LAZY_ATTRS = ('value', 'excep', 'log')
+
     def __init__(self,
         param_map, value, excep, uuid, duration, log,
         callable_qualname, callable_name, recorded_id_map,
@@ -3700,6 +4521,50 @@ class FrozenExprVal(ExprValBase):
         else:
             self.excep_tb = None
 
+    @staticmethod
+    def _from_lazy_state(cls, state, loader):
+        froz_val = cls.__new__(cls)
+        froz_val.__dict__.update(state)
+        froz_val._lazy_loader = loader
+        return froz_val
+
+    def _load_lazy_attrs(self):
+        try:
+            loader = self.__dict__.pop('_lazy_loader')
+        except KeyError:
+            return
+        else:
+            self.__dict__.update(loader.load())
+
+    def _make_lazy_attr(attr):
+        def getter(self):
+            try:
+                return self.__dict__[attr]
+            except KeyError:
+                self._load_lazy_attrs()
+                return self.__dict__[attr]
+
+        def setter(self, val):
+            self.__dict__[attr] = val
+
+        return property(getter, setter)
+
+    value = _make_lazy_attr('value')
+    excep = _make_lazy_attr('excep')
+    log = _make_lazy_attr('log')
+    del _make_lazy_attr
+
+    def __getstate__(self):
+        # Make sure the state is self-contained
+        self._load_lazy_attrs()
+        return self.__dict__
+
+    def __copy__(self):
+        # Share the values that are not loaded yet instead of loading them
+        new = self.__class__.__new__(self.__class__)
+        new.__dict__.update(self.__dict__)
+        return new
+
     @property
     def callable_(self):
         """
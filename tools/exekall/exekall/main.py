@@ -297,6 +297,9 @@ please run ``exekall run YOUR_SOURCES_OR_MODULES --help``.
     add_argument(run_advanced_group, '--pdb', action='store_true',
         help="""If an exception occurs in the code ran by ``exekall``, drops into a debugger shell.""")
 
+    add_argument(run_advanced_group, '--jobs', '-j', type=int, default=1,
+        help="""Number of processes used to execute the expressions. Expressions sharing a subexpression are executed by the same process. The computed values need to be serializable to be sent back to the main process. The console output of each expression is displayed once its values are received, but the log files are written by the worker processes as they go. This is ignored when --pdb is used.""")
+
     add_argument(run_advanced_group, '--log-level', default='info',
         choices=('debug', 'info', 'warn', 'error', 'critical'),
         help="""Change the default log level of the standard logging module.""")
@@ -737,6 +740,7 @@ def do_run(args, parser, run_parser, argv):
 
     verbose = args.verbose
     use_pdb = args.pdb or args.replay
+    jobs = args.jobs
     save_db = args.save_value_db
 
     iteration_nr = args.n
@@ -1024,6 +1028,7 @@ def do_run(args, parser, run_parser, argv):
         verbose=verbose,
         save_db=save_db,
         use_pdb=use_pdb,
+        jobs=jobs,
     )
 
     # If we reloaded a DB, merge it with the current DB so the outcome is a
@@ -1039,7 +1044,8 @@ def do_run(args, parser, run_parser, argv):
 
 
 def exec_expr_list(iteration_expr_list, adaptor, artifact_dir, testsession_uuid,
-                   hidden_callable_set, only_template_scripts, adaptor_cls, verbose, save_db, use_pdb):
+                   hidden_callable_set, only_template_scripts, adaptor_cls, verbose, save_db, use_pdb,
+                   jobs=1):
 
     if not only_template_scripts:
         with (artifact_dir / 'UUID').open('wt') as f:
@@ -1106,6 +1112,16 @@ def exec_expr_list(iteration_expr_list, adaptor, artifact_dir, testsession_uuid,
     if only_template_scripts:
         return 0
 
+    # The debugger needs the live traceback of the exceptions, which cannot be
+    # sent back from another process
+    if jobs > 1 and not use_pdb:
+        parallel_executor = engine.ComputableExpression.execute_parallel(
+            utils.flatten_seq(iteration_expr_list),
+            jobs=jobs,
+        )
+    else:
+        parallel_executor = None
+
     # Preserve the execution order, so the summary is displayed in the same
     # order
     result_map = collections.OrderedDict()
@@ -1200,7 +1216,12 @@ def exec_expr_list(iteration_expr_list, adaptor, artifact_dir, testsession_uuid,
                 return f'{duration}{cumulative}'
 
             # This returns an iterator
-            executor = expr.execute(log_expr_val)
+            if parallel_executor is None:
+                executor = expr.execute(log_expr_val)
+            else:
+                _expr, execute = next(parallel_executor)
+                assert _expr is expr
+                executor = execute(log_expr_val)
 
             out('')
             for result in utils.iterate_cb(executor, pre_line, flush_std_streams):
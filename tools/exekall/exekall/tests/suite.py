@@ -22,6 +22,13 @@ import functools
 import operator
 import contextlib
 import shutil
+import os
+import io
+import threading
+import tempfile
+import pathlib
+import zipfile
+import lzma
 
 import exekall.utils as utils
 import exekall.engine as engine
@@ -71,7 +78,9 @@ class Final:
     """
     Expressions built inside the test cases return instances of this class
     """
-    pass
+    def __init__(self):
+        # Record where the value was computed, to check parallel execution
+        self.pid = os.getpid()
 
 
 class TestCaseABC(abc.ABC):
@@ -149,11 +158,12 @@ class TestCaseABC(abc.ABC):
         self.dump_expr_layout()
 
     def dump_expr_layout(self):
-        folder = self.artifact_dir / 'tested_expr'
+        # Use a folder per test case, so they can be executed in parallel
+        folder = self.artifact_dir / 'tested_expr' / type(self).__qualname__
         # Wipe if already exists
         with contextlib.suppress(FileNotFoundError):
             shutil.rmtree(str(folder))
-        folder.mkdir()
+        folder.mkdir(parents=True)
 
         for expr in self.expr_list:
             id_ = expr.get_id(qual=False)
@@ -255,6 +265,20 @@ class TestCaseABC(abc.ABC):
                 self.check_excep(expr_val_list)
             yield computable_expr, expr_val_list
 
+    def execute_parallel(self, jobs=2):
+        """
+        Same as :meth:`execute` but using
+        :meth:`exekall.engine.ComputableExpression.execute_parallel`.
+        """
+        executor = engine.ComputableExpression.execute_parallel(
+            self.get_computable_expr_list(),
+            jobs=jobs,
+        )
+        for computable_expr, execute in executor:
+            expr_val_list = list(execute())
+            self.check_excep(expr_val_list)
+            yield computable_expr, expr_val_list
+
 
 class TestCaseBase(TestCaseABC):
     """
@@ -340,6 +364,38 @@ class NoExcepTestCase(TestCaseBase):
             for computable_expr, expr_val_list in self.execute()
         ]
 
+        self.compare_results(ref_list, new_list)
+
+    @TestCaseABC.test
+    def test_parallel(self):
+        """
+        Test that the expressions give the same values when executed in a pool
+        of processes, and that the relations between values are preserved.
+        """
+        ref_list = [
+            expr_val_list
+            for computable_expr, expr_val_list in self.execute()
+        ]
+
+        new_list = []
+        for computable_expr, expr_val_list in self.execute_parallel():
+            for expr_val in expr_val_list:
+                self.check_relations(expr_val)
+                TestResult.fail_if(
+                    expr_val.value.pid == os.getpid(),
+                    'Value computed in the main process',
+                    [computable_expr]
+                )
+            new_list.append(expr_val_list)
+
+        self.compare_results(ref_list, new_list)
+
+    @staticmethod
+    def compare_results(ref_list, new_list):
+        """
+        Compare two lists of lists of :class:`exekall.engine.ExprVal` computed
+        for the same expressions.
+        """
         TestResult.fail_if(
             len(new_list) != len(ref_list),
             'Different number of expressions when re-executing'
@@ -407,26 +463,32 @@ class NoExcepTestCase(TestCaseBase):
         """
         TestResult.skip_if(not self.VALUES_RELATIONS, 'no relations specified')
 
+        for computable_expr, expr_val_list in self.execute():
+            for expr_val in expr_val_list:
+                self.check_relations(expr_val)
+
+    def check_relations(self, expr_val):
+        """
+        Check that :attr:`VALUES_RELATIONS` are satisfied for ``expr_val``.
+        """
         def get_val(expr_val, path):
             if path:
                 return get_val(expr_val[path[0]], path[1:])
             else:
                 return expr_val.value
 
-        for computable_expr, expr_val_list in self.execute():
-            for expr_val in expr_val_list:
-                for description, path1, relation, path2 in self.VALUES_RELATIONS:
-                    TestResult.fail_if(
-                        not relation(
-                            get_val(expr_val, path1),
-                            get_val(expr_val, path2),
-                        ),
-                        'relations "{}" between {} and {} not satisfied'.format(
-                            description,
-                            '->'.join(path1),
-                            '->'.join(path2),
-                        )
-                    )
+        for description, path1, relation, path2 in self.VALUES_RELATIONS:
+            TestResult.fail_if(
+                not relation(
+                    get_val(expr_val, path1),
+                    get_val(expr_val, path2),
+                ),
+                'relations "{}" between {} and {} not satisfied'.format(
+                    description,
+                    '->'.join(path1),
+                    '->'.join(path2),
+                )
+            )
 
 
 class A:
@@ -658,3 +720,445 @@ class AssociatedTypesTestCase(NoExcepTestCase):
     }
     # no tags used
     EXPR_VAL_ID = EXPR_ID
+
+
+class Unpicklable(Final):
+    def __init__(self):
+        super().__init__()
+        self.lock = threading.Lock()
+
+
+def final_unpicklable(b: B) -> Unpicklable:
+    assert type(b) is B
+    return Unpicklable()
+
+
+class UnpicklableTestCase(NoExcepTestCase):
+    CALLABLES = {init, middle, final_unpicklable}
+    EXPR_ID = {
+        (('qual', True),): 'exekall.tests.suite.init:exekall.tests.suite.middle:exekall.tests.suite.final_unpicklable',
+        (('qual', False),): 'init:middle:final_unpicklable',
+    }
+    # no tags used
+    EXPR_VAL_ID = EXPR_ID
+
+    @TestCaseABC.test
+    def test_parallel(self):
+        """
+        Test that values that cannot be sent back from the worker processes
+        are computed in the current process.
+        """
+        ref_list = [
+            expr_val_list
+            for computable_expr, expr_val_list in self.execute()
+        ]
+
+        new_list = []
+        for computable_expr, expr_val_list in self.execute_parallel():
+            for expr_val in expr_val_list:
+                TestResult.fail_if(
+                    expr_val.value.pid != os.getpid(),
+                    'Value not computed in the main process',
+                    [computable_expr]
+                )
+            new_list.append(expr_val_list)
+
+        self.compare_results(ref_list, new_list)
+
+
+def final_output(b: B) -> Final:
+    assert type(b) is B
+    print('output of final_output')
+    return Final()
+
+
+class OutputTestCase(NoExcepTestCase):
+    CALLABLES = {init, middle, final_output}
+    EXPR_ID = {
+        (('qual', True),): 'exekall.tests.suite.init:exekall.tests.suite.middle:exekall.tests.suite.final_output',
+        (('qual', False),): 'init:middle:final_output',
+    }
+    # no tags used
+    EXPR_VAL_ID = EXPR_ID
+
+    @TestCaseABC.test
+    def test_parallel_output(self):
+        """
+        Test that the output of the values computed in the worker processes is
+        replayed in the current process.
+        """
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            list(self.execute_parallel())
+
+        TestResult.fail_if(
+            output.getvalue() != 'output of final_output\n',
+            f'Unexpected output: {output.getvalue()!r}'
+        )
+
+
+class Hashable:
+    """
+    Hashable type compared by value.
+    """
+    def __init__(self, x):
+        self.x = x
+
+    def __eq__(self, other):
+        return type(other) is type(self) and other.x == self.x
+
+    def __hash__(self):
+        return hash(self.x)
+
+
+class Unhashable:
+    """
+    Unhashable type whose instances all compare equal.
+    """
+    __hash__ = None
+
+    def __eq__(self, other):
+        return type(other) is type(self)
+
+
+def init_hashable() -> Hashable:
+    return Hashable(42)
+
+
+def init_unhashable() -> Unhashable:
+    return Unhashable()
+
+
+def final_reuse(h: Hashable, u: Unhashable) -> Final:
+    assert type(h) is Hashable
+    assert type(u) is Unhashable
+    return Final()
+
+
+class ReuseIndexTestCase(TestCaseABC):
+    CALLABLES = {init_hashable, init_unhashable, final_reuse}
+
+    @TestCaseABC.test
+    def test_reuse_index(self):
+        """
+        Test that computed values are looked up by equality of the hashable
+        parameters and by identity of the unhashable ones, and that the index
+        is rebuilt when ``expr_val_seq_list`` is replaced.
+        """
+        expr, = self.get_computable_expr_list()
+        self.check_excep(list(expr.execute()))
+        expr_val_seq, = expr.expr_val_seq_list
+        param_map = expr_val_seq.param_map
+        h = param_map['h'].value
+        u = param_map['u'].value
+
+        def find(**kwargs):
+            return expr.find_expr_val_seq_list({
+                param: engine.ExprVal(param_map[param].expr, {}, value=value)
+                for param, value in kwargs.items()
+            })
+
+        TestResult.fail_if(
+            find(h=Hashable(h.x), u=u) != [expr_val_seq],
+            'Equal hashable value was not reused'
+        )
+        TestResult.fail_if(
+            find(h=h, u=Unhashable()) != [],
+            'Unhashable value was matched by equality'
+        )
+
+        expr.expr_val_seq_list = []
+        TestResult.fail_if(
+            find(h=h, u=u) != [],
+            'Index was not rebuilt when expr_val_seq_list was replaced'
+        )
+
+        expr.expr_val_seq_list = [expr_val_seq]
+        TestResult.fail_if(
+            find(h=h, u=u) != [expr_val_seq],
+            'Index was not rebuilt when expr_val_seq_list was replaced'
+        )
+
+
+class ValueDBTestCase(TestCaseABC):
+    CALLABLES = {init, middle, middle2, middle3, final}
+
+    def make_db(self):
+        """
+        Execute the expressions and return a :class:`exekall.engine.ValueDB`
+        with the computed values.
+        """
+        expr_list = self.get_computable_expr_list()
+        for expr in expr_list:
+            self.check_excep(list(expr.execute()))
+
+        return engine.ValueDB(
+            engine.FrozenExprValSeq.from_expr_list(expr_list)
+        )
+
+    @staticmethod
+    def check_same_db(ref, db):
+        """
+        Check that ``db`` contains the same values as ``ref``.
+        """
+        def get_uuid_map(db):
+            return {
+                froz_val.uuid: froz_val
+                for froz_val in db.get_all()
+            }
+
+        ref_map = get_uuid_map(ref)
+        uuid_map = get_uuid_map(db)
+
+        TestResult.fail_if(
+            ref_map.keys() != uuid_map.keys(),
+            'Different UUIDs: expected {} but got {}'.format(
+                sorted(ref_map.keys()),
+                sorted(uuid_map.keys()),
+            )
+        )
+
+        for uuid_, ref_val in ref_map.items():
+            froz_val = uuid_map[uuid_]
+            ref_id = ref_val.get_id(qual=False, with_tags=True)
+            id_ = froz_val.get_id(qual=False, with_tags=True)
+            TestResult.fail_if(
+                id_ != ref_id,
+                f'Wrong ID: expected {ref_id} but got {id_}'
+            )
+            TestResult.fail_if(
+                type(froz_val.value) is not type(ref_val.value),
+                'Wrong value type for {}: expected {} but got {}'.format(
+                    id_,
+                    utils.get_name(type(ref_val.value)),
+                    utils.get_name(type(froz_val.value)),
+                )
+            )
+
+    @staticmethod
+    def get_member_list(path):
+        with zipfile.ZipFile(str(path)) as zip_:
+            return zip_.namelist()
+
+    @TestCaseABC.test
+    def test_archive_roundtrip(self):
+        """
+        Test that a DB written with :meth:`exekall.engine.ValueDB.to_path` is
+        reloaded identically, with values loaded lazily.
+        """
+        db = self.make_db()
+        with tempfile.TemporaryDirectory() as folder:
+            path = pathlib.Path(folder, utils.DB_FILENAME)
+            db.to_path(path)
+
+            TestResult.fail_if(
+                not zipfile.is_zipfile(str(path)),
+                'The DB is not a Zip archive'
+            )
+            member_list = self.get_member_list(path)
+            TestResult.fail_if(
+                len(member_list) != len(set(member_list)),
+                'Duplicated archive members'
+            )
+
+            reloaded = engine.ValueDB.from_path(path)
+            TestResult.fail_if(
+                not any(
+                    '_lazy_loader' in froz_val.__dict__
+                    for froz_val in reloaded.get_all()
+                ),
+                'Values were not loaded lazily'
+            )
+            self.check_same_db(db, reloaded)
+
+    @TestCaseABC.test
+    def test_archive_append(self):
+        """
+        Test that appending to an archive adds an index shard and only the
+        values that are not already stored.
+        """
+        db1 = self.make_db()
+        db2 = self.make_db()
+        with tempfile.TemporaryDirectory() as folder:
+            path = pathlib.Path(folder, utils.DB_FILENAME)
+            db1.to_path(path)
+            db2.to_path(path, append=True)
+
+            member_list = self.get_member_list(path)
+            index_list = [
+                name
+                for name in member_list
+                if name.startswith('index/')
+            ]
+            TestResult.fail_if(
+                len(index_list) != 2,
+                f'Wrong number of index shards: {index_list}'
+            )
+            self.check_same_db(
+                engine.ValueDB.merge([db1, db2]),
+                engine.ValueDB.from_path(path),
+            )
+
+            # Appending values that are already stored only adds an index
+            # shard
+            db1.to_path(path, append=True)
+            new_member_list = self.get_member_list(path)
+            TestResult.fail_if(
+                len(new_member_list) != len(member_list) + 1,
+                'Values already stored were written again'
+            )
+            self.check_same_db(
+                engine.ValueDB.merge([db1, db2]),
+                engine.ValueDB.from_path(path),
+            )
+
+    @TestCaseABC.test
+    def test_archive_append_interrupted(self):
+        """
+        Test that an archive is left untouched if appending to it fails.
+        """
+        class Interrupted(Exception):
+            pass
+
+        writestr = zipfile.ZipFile.writestr
+        def interrupted_writestr(zip_, name, *args, **kwargs):
+            # Interrupt after the values are written, before the index
+            if name.startswith(engine._ValueDBArchive.INDEX_DIR):
+                raise Interrupted()
+            return writestr(zip_, name, *args, **kwargs)
+
+        db = self.make_db()
+        with tempfile.TemporaryDirectory() as folder:
+            path = pathlib.Path(folder, utils.DB_FILENAME)
+            db.to_path(path)
+            content = path.read_bytes()
+
+            zipfile.ZipFile.writestr = interrupted_writestr
+            try:
+                self.make_db().to_path(path, append=True)
+            except Interrupted:
+                pass
+            else:
+                raise TestResult(TestResultStatus.FAILED, 'Appending was not interrupted')
+            finally:
+                zipfile.ZipFile.writestr = writestr
+
+            TestResult.fail_if(
+                path.read_bytes() != content,
+                'The archive was modified'
+            )
+            TestResult.fail_if(
+                os.listdir(folder) != [path.name],
+                f'Temporary files left behind: {os.listdir(folder)}'
+            )
+            self.check_same_db(db, engine.ValueDB.from_path(path))
+
+    @TestCaseABC.test
+    def test_archive_fork(self):
+        """
+        Test that an archive opened before forking is re-opened in the child
+        process, rather than sharing the file offset with the parent.
+        """
+        db = self.make_db()
+        with tempfile.TemporaryDirectory() as folder:
+            path = pathlib.Path(folder, utils.DB_FILENAME)
+            db.to_path(path)
+            reloaded = engine.ValueDB.from_path(path)
+            loader, *_ = [
+                froz_val.__dict__['_lazy_loader']
+                for froz_val in reloaded.get_all()
+                if '_lazy_loader' in froz_val.__dict__
+            ]
+            archive = loader.archive
+            zip_ = archive._get_zipfile()
+
+            pid = os.fork()
+            if not pid:
+                code = 1
+                try:
+                    for froz_val in reloaded.get_all():
+                        froz_val.value
+                    if archive._get_zipfile() is not zip_:
+                        code = 0
+                finally:
+                    os._exit(code)
+
+            _, status = os.waitpid(pid, 0)
+            TestResult.fail_if(
+                os.waitstatus_to_exitcode(status) != 0,
+                'The archive was not re-opened in the child process'
+            )
+            TestResult.fail_if(
+                archive._get_zipfile() is not zip_,
+                'The archive was re-opened in the parent process'
+            )
+            self.check_same_db(db, reloaded)
+
+    @TestCaseABC.test
+    def test_legacy_read(self):
+        """
+        Test that DBs in the legacy format of an LZMA compressed pickle can be
+        read, and appended to.
+        """
+        db1 = self.make_db()
+        db2 = self.make_db()
+        with tempfile.TemporaryDirectory() as folder:
+            path = pathlib.Path(folder, utils.DB_FILENAME)
+            with lzma.open(str(path), 'wb') as f:
+                engine._ExceptionPickler.dump_file(
+                    f, db1,
+                    protocol=engine.ValueDB.PICKLE_PROTOCOL,
+                )
+
+            self.check_same_db(db1, engine.ValueDB.from_path(path))
+
+            db2.to_path(path, append=True)
+            TestResult.fail_if(
+                not zipfile.is_zipfile(str(path)),
+                'The legacy DB was not converted to a Zip archive'
+            )
+            self.check_same_db(
+                engine.ValueDB.merge([db1, db2]),
+                engine.ValueDB.from_path(path),
+            )
+
+    @TestCaseABC.test
+    def test_archive_max_open(self):
+        """
+        Test that the number of open archives is bounded, and that values can
+        still be loaded from archives that were closed.
+        """
+        archive_cls = engine._ValueDBArchive
+        max_open = archive_cls.MAX_OPEN_ARCHIVES
+        archive_cls.MAX_OPEN_ARCHIVES = 2
+        try:
+            with tempfile.TemporaryDirectory() as folder:
+                db_list = [self.make_db() for i in range(4)]
+                path_list = [
+                    pathlib.Path(folder, f'{i}_{utils.DB_FILENAME}')
+                    for i in range(len(db_list))
+                ]
+                for db, path in zip(db_list, path_list):
+                    db.to_path(path)
+
+                reloaded_list = [
+                    engine.ValueDB.from_path(path)
+                    for path in path_list
+                ]
+                for db, reloaded in zip(db_list, reloaded_list):
+                    self.check_same_db(db, reloaded)
+                    TestResult.fail_if(
+                        len(archive_cls._OPEN_ARCHIVES) > 2,
+                        f'Too many open archives: {len(archive_cls._OPEN_ARCHIVES)}'
+                    )
+
+                # Merging copies the values of all archives
+                merged = engine.ValueDB.merge(reloaded_list)
+                merged_path = pathlib.Path(folder, utils.DB_FILENAME)
+                merged.to_path(merged_path)
+                self.check_same_db(
+                    engine.ValueDB.merge(db_list),
+                    engine.ValueDB.from_path(merged_path),
+                )
+        finally:
+            archive_cls.MAX_OPEN_ARCHIVES = max_open